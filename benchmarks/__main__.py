@@ -0,0 +1,8 @@
+import sys
+import multiprocessing
+from benchmarks.bench import main
+
+if __name__ == "__main__":
+    # The core tools start process pools; keep spawn-based platforms happy
+    multiprocessing.freeze_support()
+    sys.exit(main())
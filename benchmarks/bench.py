@@ -0,0 +1,389 @@
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+from benchmarks import corpora
+
+# Configuration defaults
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 10.0      # Percent slower before compare reports a regression
+RESULT_PREFIX = "BENCH_RESULT "
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIRST_TWO_WORDS = r'^([a-zA-Z0-9]+)[^a-zA-Z0-9]+([a-zA-Z0-9]+)'
+
+# --- CASES ---
+# Each case runs one core hot path on a fresh copy of its corpus ('data')
+# with an empty 'out' folder next to it, and returns (success, message).
+def _batch_process_images(data, out):
+    from core import general_tools
+    count = general_tools.batch_process_images(data, out, 0.5, 'jpeg', 85)
+    return count > 0, f"Processed {count} images."
+
+def _merge_pdfs_with_toc(data, out):
+    from core import pdf_merger
+    return pdf_merger.merge_pdfs_with_toc(data, os.path.join(out, "merged.pdf"), "Benchmark")
+
+def _extract_pages_as_images(data, out):
+    from core import pdf_extractor
+    pdfs = sorted(os.path.join(data, f) for f in os.listdir(data) if f.endswith('.pdf'))
+    count = pdf_extractor.extract_pages_as_images(pdfs, out)
+    return count == len(pdfs), f"Extracted {count} PDFs."
+
+def _create_compilation_pdf(data, out):
+    from core import pdf_processor
+    return pdf_processor.create_compilation_pdf(data)
+
+def _merge_svgs_to_grid(data, out):
+    from core import svg_processor
+    return svg_processor.merge_svgs_to_grid(data)
+
+def _organize_by_date(data, out):
+    from core import photo_organizer
+    return photo_organizer.organize_by_date(data)
+
+def _scan_extensions(data, out):
+    from core import general_tools
+    extensions = general_tools.scan_extensions(data)
+    return bool(extensions), f"{len(extensions)} extensions."
+
+def _warm_index(data):
+    from core import file_index, general_tools
+    file_index.enable()
+    general_tools.scan_extensions(data)
+
+def _scan_extensions_indexed(data, out):
+    # Timed part: the incremental refresh (one stat per folder) plus the query
+    from core import file_index, general_tools
+    file_index.get_index().refresh(data)
+    extensions = general_tools.scan_extensions(data)
+    return bool(extensions), f"{len(extensions)} extensions."
+
+def _sort_by_extension(data, out):
+    from core import structure_sorter
+    return structure_sorter.sort_by_extension([data])
+
+def _sort_by_name_pattern(data, out):
+    from core import pattern_sorter
+    return pattern_sorter.sort_by_name_pattern(data, FIRST_TWO_WORDS, 2)
+
+def _consolidate_single_files(data, out):
+    from core import structure_sorter
+    return structure_sorter.consolidate_single_files(data)
+
+# name: (corpus, function)
+CASES = {
+    "batch_process_images": ("images", _batch_process_images),
+    "merge_pdfs_with_toc": ("pdfs", _merge_pdfs_with_toc),
+    "extract_pages_as_images": ("pdfs", _extract_pages_as_images),
+    "create_compilation_pdf": ("images", _create_compilation_pdf),
+    "merge_svgs_to_grid": ("svgs", _merge_svgs_to_grid),
+    "organize_by_date": ("photos", _organize_by_date),
+    "scan_extensions": ("tree", _scan_extensions),
+    "scan_extensions_indexed": ("tree", _scan_extensions_indexed),
+    "sort_by_extension": ("tree", _sort_by_extension),
+    "sort_by_name_pattern": ("tree", _sort_by_name_pattern),
+    "consolidate_single_files": ("tree", _consolidate_single_files),
+}
+
+# case: untimed preparation run on the same copy first
+SETUP = {
+    "scan_extensions_indexed": _warm_index,
+}
+
+# --- MEASUREMENT (runs in a child process per case) ---
+def _peak_rss_mb():
+    """Peak resident set size of this process and its waited-for children."""
+    try:
+        import resource
+    except ImportError:
+        return _peak_rss_mb_windows()
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    try:
+        # Linux carries ru_maxrss over from the forking parent; VmHWM starts fresh at exec
+        with open('/proc/self/status') as f:
+            own = next(int(line.split()[1]) for line in f if line.startswith('VmHWM:'))
+    except (OSError, StopIteration, ValueError):
+        pass
+    peak = max(own, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in bytes on macOS, KB elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _peak_rss_mb_windows():
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                    ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                    ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                    ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                    ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+        return None
+    return counters.PeakWorkingSetSize / (1024 * 1024)
+
+def _children_cpu():
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+def run_worker(case, data, out):
+    """Times one case in this process and prints its measurements as one JSON line."""
+    func = CASES[case][1]
+    files = corpora.count_files(data)
+    os.makedirs(out, exist_ok=True)
+    if case in SETUP:
+        SETUP[case](data)
+
+    cpu_start, children_start = time.process_time(), _children_cpu()
+    wall_start = time.perf_counter()
+    try:
+        success, msg = func(data, out)
+    except Exception as e:
+        success, msg = False, f"{type(e).__name__}: {e}"
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start + _children_cpu() - children_start
+
+    result = {
+        'success': bool(success),
+        'message': str(msg).splitlines()[0] if msg else "",
+        'wall': round(wall, 4),
+        'cpu': round(cpu, 4),
+        'peak_rss_mb': round(_peak_rss_mb() or 0, 1),
+        'files': files,
+        'files_per_sec': round(files / wall, 1) if wall > 0 else None,
+    }
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+def _measure(case, corpus, work_root):
+    """Runs one case in a child process on a fresh copy of the corpus."""
+    work = tempfile.mkdtemp(prefix=f"{case}-", dir=work_root)
+    try:
+        data = os.path.join(work, "data")
+        corpora.clone_tree(os.path.join(corpus, "data"), data)
+        env = dict(os.environ)
+        # Journals, plans and thumbnail caches go to the scratch folder, not the user's profile
+        for var in ('XDG_STATE_HOME', 'XDG_CACHE_HOME', 'LOCALAPPDATA'):
+            env[var] = os.path.join(work, "profile")
+        env['PYTHONPATH'] = REPO_ROOT + os.pathsep + env.get('PYTHONPATH', '')
+        proc = subprocess.run([sys.executable, "-m", "benchmarks", "_worker", case, data, os.path.join(work, "out")],
+                              cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+        for line in reversed(proc.stdout.splitlines()):
+            if line.startswith(RESULT_PREFIX):
+                return json.loads(line[len(RESULT_PREFIX):])
+        return {'success': False, 'message': (proc.stderr.strip().splitlines() or ["No result."])[-1]}
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+def _summarize(runs):
+    """The run with the median wall time stands for the case; peak RSS is the worst seen."""
+    ok = [run for run in runs if run.get('success')]
+    if not ok:
+        return {'success': False, 'message': runs[-1].get('message', ""), 'runs': len(runs)}
+    median = sorted(ok, key=lambda run: run['wall'])[(len(ok) - 1) // 2]
+    summary = dict(median)
+    summary['peak_rss_mb'] = max(run['peak_rss_mb'] for run in ok)
+    summary['wall_min'] = min(run['wall'] for run in ok)
+    summary['wall_stdev'] = round(statistics.pstdev(run['wall'] for run in ok), 4)
+    summary['runs'] = len(ok)
+    return summary
+
+# --- HISTORY ---
+def default_history_path():
+    """Benchmark history lives next to the move journals."""
+    from core import move_journal
+    return os.path.join(os.path.dirname(move_journal.default_journal_dir()), 'benchmarks', 'history.json')
+
+def default_corpus_dir():
+    return os.path.join(tempfile.gettempdir(), "GraphicDesignSuite-bench", "corpora")
+
+def _git(*args):
+    try:
+        proc = subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True)
+    except OSError:
+        return None
+    return proc.stdout.strip() if proc.returncode == 0 else None
+
+def _environment():
+    from importlib import metadata
+    versions = {}
+    for package in ('Pillow', 'PyMuPDF', 'reportlab', 'pikepdf'):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'packages': versions,
+    }
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_history(path, history):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=1)
+    os.replace(tmp_path, path)
+
+def _find_entry(history, ref):
+    """ref is a list index ('-1' = latest) or a commit prefix (newest matching entry)."""
+    try:
+        return history[int(ref)]
+    except ValueError:
+        pass
+    except IndexError:
+        return None
+    for entry in reversed(history):
+        if (entry.get('commit') or "").startswith(ref) or entry.get('label') == ref:
+            return entry
+    return None
+
+# --- COMMANDS ---
+def run_benchmarks(cases, scales, repeat=DEFAULT_REPEAT, corpus_dir=None, seed=0):
+    """Runs every case at every scale. Returns {case: {scale: summary}}."""
+    corpus_dir = corpus_dir or default_corpus_dir()
+    work_root = os.path.normpath(corpus_dir) + "-work"
+    os.makedirs(work_root, exist_ok=True)
+    results = {}
+    for case in cases:
+        corpus_name = CASES[case][0]
+        for scale in scales:
+            corpus = corpora.corpus_path(corpus_dir, corpus_name, scale, seed)
+            runs = []
+            for n in range(repeat):
+                run = _measure(case, corpus, work_root)
+                runs.append(run)
+                if run.get('success'):
+                    print(f"{case} [{scale}] run {n + 1}/{repeat}: {run['wall']:.3f}s wall, {run['cpu']:.3f}s CPU, "
+                          f"{run['peak_rss_mb']:.0f} MB, {run['files_per_sec']} files/s")
+                else:
+                    print(f"{case} [{scale}] run {n + 1}/{repeat} failed: {run.get('message')}")
+            results.setdefault(case, {})[scale] = _summarize(runs)
+    return results
+
+def compare(old, new, threshold=DEFAULT_THRESHOLD):
+    """Prints wall time changes between two history entries. Returns the number of regressions."""
+    print(f"{'case':<26}{'scale':<8}{'old s':>10}{'new s':>10}{'change':>9}{'files/s':>10}")
+    regressions = 0
+    for case, scales in new['results'].items():
+        for scale, result in scales.items():
+            before = old['results'].get(case, {}).get(scale)
+            if not result.get('success') or not before or not before.get('success'):
+                print(f"{case:<26}{scale:<8}{'-':>10}{result.get('wall', '-'):>10}{'n/a':>9}")
+                continue
+            change = (result['wall'] - before['wall']) / before['wall'] * 100 if before['wall'] else 0.0
+            flag = ""
+            if change > threshold:
+                flag = "  SLOWER"
+                regressions += 1
+            elif change < -threshold:
+                flag = "  faster"
+            print(f"{case:<26}{scale:<8}{before['wall']:>10.3f}{result['wall']:>10.3f}{change:>+8.1f}%"
+                  f"{result['files_per_sec'] or 0:>10.1f}{flag}")
+    return regressions
+
+def _describe(index, entry):
+    commit = (entry.get('commit') or "no-git")[:10] + ("+" if entry.get('dirty') else "")
+    stamp = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['time']))
+    cases = sum(len(scales) for scales in entry['results'].values())
+    label = f"  {entry['label']}" if entry.get('label') else ""
+    return f"{index:>4}  {stamp}  {commit:<12}{cases:>4} results{label}"
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks for the core hot paths.")
+    parser.add_argument('--history', default=None, help="History file (default: next to the move journals)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('run', help="Run benchmarks and append the results to the history")
+    p.add_argument('--cases', default=",".join(CASES), help="Comma-separated case names")
+    p.add_argument('--scales', default="small", help=f"Comma-separated scales ({', '.join(corpora.SCALES)})")
+    p.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    p.add_argument('--seed', type=int, default=0, help="Corpus seed (same seed, same files)")
+    p.add_argument('--corpus-dir', default=None, help="Where generated corpora are cached")
+    p.add_argument('--label', default="", help="Free text stored with the results")
+    p.add_argument('--no-save', action='store_true', help="Print results without recording them")
+
+    p = sub.add_parser('compare', help="Compare two history entries (default: the last two)")
+    p.add_argument('old', nargs='?', default="-2", help="Index or commit prefix")
+    p.add_argument('new', nargs='?', default="-1", help="Index or commit prefix")
+    p.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="Percent slower that counts as a regression")
+
+    sub.add_parser('list', help="List recorded runs")
+    sub.add_parser('cases', help="List benchmark cases and their corpora")
+
+    p = sub.add_parser('_worker')
+    p.add_argument('case')
+    p.add_argument('data')
+    p.add_argument('out')
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == '_worker':
+        run_worker(args.case, args.data, args.out)
+        return 0
+
+    history_path = args.history or default_history_path()
+    if args.command == 'cases':
+        for case, (corpus, _) in CASES.items():
+            print(f"{case:<26}{corpus}")
+        return 0
+
+    history = load_history(history_path)
+    if args.command == 'list':
+        for index, entry in enumerate(history):
+            print(_describe(index, entry))
+        return 0
+
+    if args.command == 'compare':
+        old, new = _find_entry(history, args.old), _find_entry(history, args.new)
+        if not old or not new:
+            print("Need two recorded runs to compare (see 'list').")
+            return 2
+        return 1 if compare(old, new, args.threshold) else 0
+
+    cases = [case.strip() for case in args.cases.split(",") if case.strip()]
+    scales = [scale.strip() for scale in args.scales.split(",") if scale.strip()]
+    unknown = [case for case in cases if case not in CASES] + [scale for scale in scales if scale not in corpora.SCALES]
+    if unknown:
+        print(f"Unknown case or scale: {', '.join(unknown)}")
+        return 2
+
+    entry = {
+        'time': time.time(),
+        'commit': _git("rev-parse", "HEAD"),
+        'dirty': bool(_git("status", "--porcelain", "--untracked-files=no")),
+        'label': args.label,
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'environment': _environment(),
+        'results': run_benchmarks(cases, scales, args.repeat, args.corpus_dir, args.seed),
+    }
+    if not args.no_save:
+        history.append(entry)
+        save_history(history_path, history)
+        print(f"Results recorded in {history_path}")
+        if len(history) > 1:
+            compare(history[-2], entry)
+    failed = [case for case, scales in entry['results'].items() for result in scales.values() if not result.get('success')]
+    return 1 if failed else 0
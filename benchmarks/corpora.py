@@ -0,0 +1,155 @@
+import os
+import random
+import shutil
+
+# Corpus sizes per scale (multiplied by each corpus' base count)
+SCALES = {"small": 1, "medium": 5, "large": 25}
+
+IMAGE_SIZES = [(640, 480), (1920, 1080), (4000, 3000)]
+TREE_EXTENSIONS = ['psd', 'ai', 'pdf', 'jpg', 'png', 'svg', 'txt', 'indd', 'eps', '']
+TREE_PREFIXES = ['Acme', 'Brand', 'Catalog', 'Flyer', 'Logo', 'Poster', 'Social', 'Web']
+DONE_MARKER = ".complete"
+
+# --- GENERATORS ---
+def _image(rng, size):
+    """A gradient with random shapes on top: compresses like artwork, not like noise."""
+    from PIL import Image, ImageDraw
+    width, height = size
+    gradient = Image.linear_gradient('L')
+    img = Image.merge('RGB', (gradient.resize(size), gradient.rotate(90).resize(size), Image.new('L', size, rng.randrange(256))))
+    draw = ImageDraw.Draw(img)
+    for _ in range(40):
+        x, y = rng.randrange(width), rng.randrange(height)
+        w, h = rng.randrange(1, width // 4 + 2), rng.randrange(1, height // 4 + 2)
+        color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        if rng.random() < 0.5:
+            draw.rectangle([x, y, x + w, y + h], fill=color)
+        else:
+            draw.ellipse([x, y, x + w, y + h], outline=color, width=rng.randrange(1, 12))
+    return img
+
+def make_images(target, count, rng):
+    """JPEG and PNG files cycling through IMAGE_SIZES (JPEGs use .jpeg so batch_process_images picks them up)."""
+    for i in range(count):
+        img = _image(rng, IMAGE_SIZES[i % len(IMAGE_SIZES)])
+        if i % 2:
+            img.save(os.path.join(target, f"image_{i:05d}.png"))
+        else:
+            img.save(os.path.join(target, f"image_{i:05d}.jpeg"), quality=90)
+
+def make_pdfs(target, count, rng):
+    """Multi-page PDFs (5-20 pages) with text, vector shapes and one raster image each."""
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.utils import ImageReader
+    photo = ImageReader(_image(rng, (800, 600)))
+    for i in range(count):
+        # invariant=1 drops timestamps / random ids so the bytes are reproducible
+        c = canvas.Canvas(os.path.join(target, f"document_{i:04d}.pdf"), pagesize=letter, invariant=1)
+        for page in range(rng.randrange(5, 21)):
+            c.setFont('Helvetica-Bold', 24)
+            c.drawString(72, 720, f"Document {i} - Page {page + 1}")
+            c.setFont('Helvetica', 10)
+            for line in range(40):
+                c.drawString(72, 690 - line * 12, " ".join(rng.choice(TREE_PREFIXES) for _ in range(12)))
+            for _ in range(10):
+                c.setFillColorRGB(rng.random(), rng.random(), rng.random())
+                c.rect(rng.randrange(400), rng.randrange(200), rng.randrange(20, 200), rng.randrange(20, 100), fill=1, stroke=0)
+            if page == 0:
+                c.drawImage(photo, 72, 120, width=320, height=240)
+            c.showPage()
+        c.save()
+
+def make_svgs(target, count, rng):
+    """Icon-style SVGs; a third share the same gradient <defs> so dedupe_defs has work to do."""
+    for i in range(count):
+        shapes = []
+        for _ in range(rng.randrange(3, 12)):
+            color = f"#{rng.randrange(0x1000000):06x}"
+            if rng.random() < 0.5:
+                shapes.append(f'<circle cx="{rng.randrange(64)}" cy="{rng.randrange(64)}" r="{rng.randrange(2, 24)}" fill="{color}"/>')
+            else:
+                shapes.append(f'<path d="M{rng.randrange(64)} {rng.randrange(64)} L{rng.randrange(64)} {rng.randrange(64)} '
+                              f'L{rng.randrange(64)} {rng.randrange(64)} Z" fill="{color}"/>')
+        defs = ""
+        if i % 3 == 0:
+            defs = ('<defs><linearGradient id="shared"><stop offset="0" stop-color="#fff"/>'
+                    '<stop offset="1" stop-color="#000"/></linearGradient></defs>'
+                    '<rect width="64" height="64" fill="url(#shared)"/>')
+        with open(os.path.join(target, f"icon_{i:05d}.svg"), 'w', encoding='utf-8') as f:
+            f.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="64" height="64" viewBox="0 0 64 64">{defs}{"".join(shapes)}</svg>')
+
+def make_tree(target, count, rng):
+    """
+    A deep project-share style tree: 4 levels, names the pattern sorters can
+    group ('Brand_Spring_0012.psd'), mixed extensions, and a few folders that
+    hold a single file for consolidate_single_files.
+    """
+    folders = [target]
+    for depth in range(4):
+        for parent in list(folders):
+            for n in range(rng.randrange(1, 4)):
+                path = os.path.join(parent, f"level{depth}_{n}")
+                os.makedirs(path, exist_ok=True)
+                folders.append(path)
+    for i in range(count):
+        ext = rng.choice(TREE_EXTENSIONS)
+        name = f"{rng.choice(TREE_PREFIXES)}_{rng.choice(TREE_PREFIXES)}_{i:05d}" + (f".{ext}" if ext else "")
+        with open(os.path.join(rng.choice(folders), name), 'wb') as f:
+            f.write(rng.randbytes(rng.randrange(16, 4096)))
+    for i in range(max(1, count // 50)):
+        lonely = os.path.join(target, f"single_{i:04d}", "nested")
+        os.makedirs(lonely, exist_ok=True)
+        with open(os.path.join(lonely, f"Lonely_File_{i:04d}.txt"), 'wb') as f:
+            f.write(rng.randbytes(64))
+
+def make_photos(target, count, rng):
+    """Small JPEGs with EXIF DateTimeOriginal spread over three years, as a camera card would hold."""
+    for i in range(count):
+        img = _image(rng, (320, 240))
+        exif = img.getexif()
+        stamp = f"{rng.randrange(2021, 2024)}:{rng.randrange(1, 13):02d}:{rng.randrange(1, 29):02d} " \
+                f"{rng.randrange(24):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}"
+        exif[0x0132] = stamp                    # DateTime
+        exif.get_ifd(0x8769)[0x9003] = stamp    # DateTimeOriginal
+        exif[0x010F] = "BenchCam"               # Make
+        img.save(os.path.join(target, f"IMG_{i:05d}.jpg"), quality=85, exif=exif)
+
+# name: (generator, base file count at scale 1)
+CORPORA = {
+    "images": (make_images, 12),
+    "pdfs": (make_pdfs, 4),
+    "svgs": (make_svgs, 60),
+    "tree": (make_tree, 2000),
+    "photos": (make_photos, 40),
+}
+
+# --- CACHE ---
+def corpus_path(corpus_dir, name, scale, seed=0):
+    """Builds the corpus once per (name, scale, seed) and returns its folder; later calls reuse it."""
+    path = os.path.join(corpus_dir, f"{name}-{scale}-{seed}")
+    if os.path.exists(os.path.join(path, DONE_MARKER)):
+        return path
+    if os.path.exists(path):
+        shutil.rmtree(path)  # Left over from an interrupted build
+    data = os.path.join(path, "data")
+    os.makedirs(data)
+    generator, base = CORPORA[name]
+    generator(data, base * SCALES[scale], random.Random(f"{name}-{seed}"))
+    open(os.path.join(path, DONE_MARKER), 'w').close()
+    return path
+
+def clone_tree(src, dst):
+    """Copies a corpus for one run, hard-linking files where possible (the tools never write in place)."""
+    def link_or_copy(s, d):
+        try:
+            os.link(s, d)
+        except OSError:
+            shutil.copy2(s, d)
+    shutil.copytree(src, dst, copy_function=link_or_copy)
+
+def count_files(path):
+    total = 0
+    for _, _, files in os.walk(path):
+        total += len(files)
+    return total
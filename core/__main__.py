@@ -0,0 +1,8 @@
+import sys
+import multiprocessing
+from core.cli import main
+
+if __name__ == "__main__":
+    # Required for process pools in the frozen (PyInstaller) Windows build
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,508 @@
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import threading
+from core import general_tools, image_masker, move_journal, pattern_sorter, pdf_extractor, pdf_merger
+from core import pdf_processor, photo_organizer, renamer, structure_sorter, svg_processor, instrument, file_index
+from core import watch_folder, dedupe
+
+# Exit codes
+EXIT_OK = 0
+EXIT_FAILED = 1          # The job ran but reported failure
+EXIT_USAGE = 2           # Bad arguments (same code argparse uses)
+EXIT_INTERRUPTED = 130   # Ctrl+C / SIGTERM; journaled sorts continue with --resume
+
+# Configuration defaults
+PROGRESS_INTERVAL = 0.2  # Seconds between progress lines (the last one is always written)
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png')
+
+class JsonLinesReporter(object):
+    """Writes one JSON object per line: throttled 'progress' events and a final 'result'."""
+
+    def __init__(self, stream, command, interval=PROGRESS_INTERVAL):
+        self.stream = stream
+        self.command = command
+        self.interval = interval
+        self._last = 0.0
+        self._lock = threading.Lock()
+
+    def emit(self, event, **fields):
+        record = {'event': event, 'command': self.command, 'time': round(time.time(), 3)}
+        record.update(fields)
+        with self._lock:
+            self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.stream.flush()
+
+    def progress(self, *args):
+        """
+        progress_callback for any core function: (current, total, message, ...)
+        or the PDF tools' (percent[, message]).
+        """
+        if len(args) >= 3:
+            fields = {'current': args[0], 'total': args[1], 'message': str(args[2])}
+            if len(args) > 3:
+                fields['detail'] = list(args[3:])
+            final = args[0] >= args[1]
+        else:
+            fields = {'percent': round(float(args[0]), 1)}
+            if len(args) == 2:
+                fields['message'] = str(args[1])
+            final = args[0] >= 100
+
+        now = time.monotonic()
+        if not final and now - self._last < self.interval:
+            return
+        self._last = now
+        self.emit('progress', **fields)
+
+def _claim_stdout():
+    """
+    Keeps the real stdout for JSON lines and points file descriptor 1 (and
+    sys.stdout) at stderr, so print() calls in core code and worker
+    processes cannot break the JSON stream.
+    """
+    sys.stdout.flush()
+    json_stream = os.fdopen(os.dup(1), 'w', encoding='utf-8', buffering=1)
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+    return json_stream
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+def _resumable(job, root, args, progress, run):
+    """With --resume, continues the newest interrupted 'job' for 'root' instead of starting over."""
+    if args.resume and not args.dry_run:
+        path = move_journal.find_unfinished(job=job, root=root)
+        if path:
+            return move_journal.resume_job(path, workers=args.workers, progress_callback=progress)
+    return run()
+
+def _image_paths(path):
+    if os.path.isfile(path):
+        return [path]
+    return sorted(os.path.join(path, f) for f in os.listdir(path) if f.lower().endswith(IMAGE_EXTS))
+
+# --- COMMANDS ---
+# Each returns (success_boolean, message_string)
+def _cmd_resize_images(args, progress):
+    os.makedirs(args.dest, exist_ok=True)
+    count = general_tools.batch_process_images(args.source, args.dest, args.percent / 100, args.format, args.quality,
+                                               progress_callback=progress)
+    return True, f"Processed {count} images."
+
+def _cmd_split_grid(args, progress):
+    ok = general_tools.split_image_into_grid(args.image, tile_size=args.tile_size, grid_size=args.grid,
+                                             output_mode=args.mode, skip_empty=not args.keep_empty,
+                                             workers=args.workers, compress_level=args.compress_level)
+    return ok, "Image split into tiles." if ok else "Could not split the image (see stderr)."
+
+def _cmd_pyramid(args, progress):
+    return general_tools.generate_image_pyramid(args.image, args.out, tile_size=args.tile_size, layout=args.layout,
+                                                tile_format=args.format, quality=args.quality,
+                                                workers=args.workers, progress_callback=progress)
+
+def _cmd_gif_frames(args, progress):
+    count = general_tools.extract_gif_frames(args.input, args.out, os.path.isfile(args.input), progress_callback=progress,
+                                             workers=args.workers, skip_duplicates=args.skip_duplicates,
+                                             delta_frames=args.delta, compress_level=args.compress_level,
+                                             separate_folders=args.separate_folders)
+    return True, f"Extracted {count} frames."
+
+def _cmd_mask(args, progress):
+    return image_masker.batch_apply_mask(_image_paths(args.input), args.out, args.mode, args.antialias,
+                                         workers=args.workers, progress_callback=progress)
+
+def _cmd_merge_svgs(args, progress):
+    return svg_processor.merge_svgs_to_grid(args.folder, item_size=args.item_size, padding=args.padding,
+                                            columns=args.columns, progress_callback=progress,
+                                            dedupe_defs=not args.no_dedupe, layout=args.layout)
+
+def _cmd_rename(args, progress):
+    return renamer.rename_files_from_list(args.directory, args.names_file)
+
+def _cmd_merge_pdfs(args, progress):
+    return pdf_merger.merge_pdfs_with_toc(args.source, args.output, args.title, progress_callback=progress)
+
+def _cmd_extract_pages(args, progress):
+    count = pdf_extractor.extract_pages_as_images(args.pdfs, args.out, zoom=args.zoom)
+    return count == len(args.pdfs), f"Processed {count} of {len(args.pdfs)} PDFs."
+
+def _cmd_linearize(args, progress):
+    return pdf_processor.batch_linearize_pdfs(args.pdfs, progress_callback=progress)
+
+def _cmd_compile_pdf(args, progress):
+    func = pdf_processor.batch_create_pdfs if args.recursive else pdf_processor.create_compilation_pdf
+    return func(args.directory, args.orientation, not args.no_filenames, use_native_res=args.native_res,
+                progress_callback=progress, draft_size=args.draft_size)
+
+def _cmd_contact_sheet(args, progress):
+    return pdf_processor.create_contact_sheet_pdf(args.directory, args.cols, thumb_size=args.thumb_size)
+
+def _cmd_sort_extensions(args, progress):
+    run = lambda: structure_sorter.sort_by_extension(args.directories, centralize=args.centralize, progress_callback=progress,
+                                                     workers=args.workers, dry_run=args.dry_run)
+    return _resumable("sort_by_extension", args.directories[0], args, progress, run)
+
+def _cmd_sort_patterns(args, progress):
+    patterns = []
+    for spec in args.pattern:
+        name, sep, regex = spec.partition("=")
+        if not sep:
+            return False, f"Pattern '{spec}' must be NAME=REGEX."
+        patterns.append((name, regex))
+    run = lambda: pattern_sorter.sort_by_name_patterns(args.directory, patterns, args.min_files, args.ignore_spaces,
+                                                       args.char_count, progress_callback=progress,
+                                                       workers=args.workers, dry_run=args.dry_run)
+    return _resumable("sort_by_name_patterns", args.directory, args, progress, run)
+
+def _cmd_sort_similar(args, progress):
+    run = lambda: pattern_sorter.sort_by_similarity(args.directory, args.threshold, args.min_files, progress_callback=progress,
+                                                    workers=args.workers, dry_run=args.dry_run)
+    return _resumable("sort_by_similarity", args.directory, args, progress, run)
+
+def _cmd_consolidate(args, progress):
+    run = lambda: structure_sorter.consolidate_single_files(args.directory, dry_run=args.dry_run,
+                                                            remove_empty=not args.keep_empty, progress_callback=progress)
+    return _resumable("consolidate_single_files", args.directory, args, progress, run)
+
+def _cmd_delete_empty(args, progress):
+    return structure_sorter.delete_empty_folders(args.directory)
+
+def _cmd_organize_photos(args, progress):
+    run = lambda: photo_organizer.organize_by_date(args.directory, structure=args.structure, progress_cb=progress,
+                                                   rename_format=args.rename_format, recursive=args.recursive,
+                                                   copy_files=args.copy, test=args.dry_run,
+                                                   remove_duplicates=not args.keep_duplicates, day_begins=args.day_begins,
+                                                   keep_filename=args.keep_filename, workers=args.workers)
+    return _resumable("organize_by_date", args.directory, args, progress, run)
+
+def _cmd_extensions(args, progress):
+    exts = general_tools.scan_extensions(args.directory)
+    args.reporter.emit('extensions', directory=args.directory, extensions=exts)
+    return True, f"{len(exts)} extensions."
+
+def _cmd_index(args, progress):
+    index = file_index.get_index()
+    if args.action == "clear":
+        index.clear()
+        return True, "Index cleared."
+    if args.action == "refresh":
+        if not args.directory:
+            return False, "refresh needs a directory."
+        stats = index.refresh(args.directory, full=args.full, progress_callback=progress)
+        return True, f"Indexed {stats['dirs']} folders ({stats['rescanned']} re-read, {stats['removed']} removed)."
+    args.reporter.emit('index', **index.stats())
+    return True, "Index statistics written."
+
+def _cmd_watch(args, progress):
+    steps = [step for step, wanted in ((watch_folder.COMPRESS_PDFS, args.compress_pdfs),
+                                       (watch_folder.ORGANIZE_PHOTOS, args.organize_photos),
+                                       (watch_folder.SORT_EXTENSIONS, args.sort_extensions)) if wanted]
+    if not steps:
+        return False, "Choose at least one of --compress-pdfs, --organize-photos, --sort-extensions."
+    # Ctrl+C / SIGTERM finish the running batch and stop cleanly instead of unwinding it
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+
+    def batch_done(root, files, success, message):
+        args.reporter.emit('batch', root=root, files=len(files), ok=bool(success), message=message)
+
+    return watch_folder.watch_folders(args.directories, steps, recursive=args.recursive, settle=args.settle,
+                                      polling=args.poll, include_existing=args.existing,
+                                      photo_options={'structure': args.structure}, centralize=args.centralize,
+                                      workers=args.workers, stop_event=stop, progress_callback=progress,
+                                      batch_callback=batch_done)
+
+def _cmd_dedupe(args, progress):
+    def report(groups):
+        for group in groups:
+            args.reporter.emit('group', size=group['size'], hash=group['hash'], files=group['files'])
+
+    return dedupe.dedupe(args.directories, action=args.action, keep=args.keep, min_size=args.min_size,
+                         workers=args.workers, dry_run=args.dry_run, use_index=not args.no_cache,
+                         progress_callback=progress, groups_callback=report)
+
+def _cmd_resume(args, progress):
+    path = args.journal or move_journal.find_unfinished()
+    if not path:
+        return True, "No interrupted jobs found."
+    return move_journal.resume_job(path, workers=args.workers, progress_callback=progress)
+
+def _cmd_undo(args, progress):
+    path = args.journal or move_journal.find_undoable()
+    if not path:
+        return True, "No sorts to undo."
+    return move_journal.undo_job(path, workers=args.workers, progress_callback=progress)
+
+def _cmd_journals(args, progress):
+    paths = move_journal.list_journals()
+    for path in paths:
+        state = move_journal.load_journal(path)
+        args.reporter.emit('journal', path=path, job=state['job'], root=state['root'], moves=len(state['moves']),
+                      done=len(state['done']), failed=len(state['failed']), undone=len(state['undone']),
+                      finished=state['finished'])
+    return True, f"{len(paths)} journals."
+
+# --- ARGUMENTS ---
+def _add_workers(parser):
+    parser.add_argument("--workers", type=int, default=None, help="Parallel workers (default: per-operation)")
+
+def _add_dry_run(parser):
+    parser.add_argument("--dry-run", action="store_true", help="Only compute and save the move plan")
+
+def _add_resume(parser):
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the interrupted run for this folder if there is one, otherwise start normally")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m core", description="File Management Suite without the GUI. "
+                                     "Progress and results are written to stdout as JSON lines.")
+    parser.add_argument("--progress-interval", type=float, default=PROGRESS_INTERVAL,
+                        help="Minimum seconds between progress lines (0 = every update)")
+    parser.add_argument("--quiet", action="store_true", help="Only write the final result line")
+    parser.add_argument("--profile", action="store_true",
+                        help="Also write a cProfile dump and a folded-stack trace (see the result's stats)")
+    parser.add_argument("--index", action="store_true",
+                        help="Scan folders through the persistent file index (only changed folders are re-read)")
+    sub = parser.add_subparsers(dest="command", metavar="command")
+    sub.required = True
+
+    # Images
+    p = sub.add_parser("resize-images", help="Resize and convert every image in a folder")
+    p.add_argument("source")
+    p.add_argument("dest")
+    p.add_argument("--percent", type=float, default=50)
+    p.add_argument("--format", default="jpeg", choices=["jpeg", "png", "webp", "bmp", "gif", "tiff"])
+    p.add_argument("--quality", type=int, default=85)
+    p.set_defaults(func=_cmd_resize_images)
+
+    p = sub.add_parser("split-grid", help="Cut an image into tiles")
+    p.add_argument("image")
+    size = p.add_mutually_exclusive_group(required=True)
+    size.add_argument("--tile-size", type=int, nargs=2, metavar=("WIDTH", "HEIGHT"))
+    size.add_argument("--grid", type=int, nargs=2, metavar=("ROWS", "COLS"))
+    p.add_argument("--mode", default="files", choices=list(general_tools.TILE_OUTPUT_MODES))
+    p.add_argument("--keep-empty", action="store_true")
+    p.add_argument("--compress-level", type=int, default=6)
+    _add_workers(p)
+    p.set_defaults(func=_cmd_split_grid)
+
+    p = sub.add_parser("pyramid", help="Build a Deep Zoom / XYZ tile pyramid")
+    p.add_argument("image")
+    p.add_argument("--out", default=None)
+    p.add_argument("--tile-size", type=int, default=256)
+    p.add_argument("--layout", default="dzi", choices=list(general_tools.PYRAMID_LAYOUTS))
+    p.add_argument("--format", default="png", choices=["png", "jpg"])
+    p.add_argument("--quality", type=int, default=90)
+    _add_workers(p)
+    p.set_defaults(func=_cmd_pyramid)
+
+    p = sub.add_parser("gif-frames", help="Extract GIF frames to PNG (a GIF or a folder of GIFs)")
+    p.add_argument("input")
+    p.add_argument("out")
+    p.add_argument("--skip-duplicates", action="store_true")
+    p.add_argument("--delta", action="store_true", help="Write only the changed region of each frame")
+    p.add_argument("--compress-level", type=int, default=6)
+    p.add_argument("--separate-folders", action="store_true")
+    _add_workers(p)
+    p.set_defaults(func=_cmd_gif_frames)
+
+    p = sub.add_parser("mask", help="Apply a circular mask to an image or a folder of images")
+    p.add_argument("input")
+    p.add_argument("out")
+    p.add_argument("--mode", default="normal", choices=["normal", "inverted"])
+    p.add_argument("--antialias", action="store_true")
+    _add_workers(p)
+    p.set_defaults(func=_cmd_mask)
+
+    p = sub.add_parser("merge-svgs", help="Merge a folder of SVGs into one grid")
+    p.add_argument("folder")
+    p.add_argument("--item-size", type=int, default=svg_processor.DEFAULT_ITEM_SIZE)
+    p.add_argument("--padding", type=int, default=svg_processor.DEFAULT_PADDING)
+    p.add_argument("--columns", type=int, default=svg_processor.DEFAULT_COLUMNS)
+    p.add_argument("--layout", default="grid", choices=["grid", "fit", "pack"])
+    p.add_argument("--no-dedupe", action="store_true")
+    p.set_defaults(func=_cmd_merge_svgs)
+
+    p = sub.add_parser("rename", help="Rename files from a comma-separated list of names")
+    p.add_argument("directory")
+    p.add_argument("names_file")
+    p.set_defaults(func=_cmd_rename)
+
+    # PDFs
+    p = sub.add_parser("merge-pdfs", help="Merge PDFs with a clickable table of contents")
+    p.add_argument("source")
+    p.add_argument("output")
+    p.add_argument("--title", default="Compilation")
+    p.set_defaults(func=_cmd_merge_pdfs)
+
+    p = sub.add_parser("extract-pages", help="Render PDF pages to PNG")
+    p.add_argument("pdfs", nargs="+")
+    p.add_argument("--out", required=True)
+    p.add_argument("--zoom", type=float, default=2)
+    p.set_defaults(func=_cmd_extract_pages)
+
+    p = sub.add_parser("linearize", help="Linearize PDFs for fast web view")
+    p.add_argument("pdfs", nargs="+")
+    p.set_defaults(func=_cmd_linearize)
+
+    p = sub.add_parser("compile-pdf", help="Print a folder of images to a PDF")
+    p.add_argument("directory")
+    p.add_argument("--orientation", default="P", choices=["P", "L"])
+    p.add_argument("--no-filenames", action="store_true")
+    p.add_argument("--native-res", action="store_true")
+    p.add_argument("--recursive", action="store_true", help="One PDF per subfolder")
+    p.add_argument("--draft-size", type=int, default=None, help="Use cached thumbnails of this size")
+    p.set_defaults(func=_cmd_compile_pdf)
+
+    p = sub.add_parser("contact-sheet", help="Contact sheet PDF of a folder of images")
+    p.add_argument("directory")
+    p.add_argument("--cols", type=int, default=3)
+    p.add_argument("--thumb-size", type=int, default=None)
+    p.set_defaults(func=_cmd_contact_sheet)
+
+    # Sorting
+    p = sub.add_parser("sort-extensions", help="Move files into <EXT>_Files folders")
+    p.add_argument("directories", nargs="+")
+    p.add_argument("--centralize", action="store_true", help="Collect everything under the first folder")
+    _add_workers(p)
+    _add_dry_run(p)
+    _add_resume(p)
+    p.set_defaults(func=_cmd_sort_extensions)
+
+    p = sub.add_parser("sort-patterns", help="Group files into folders by regex patterns")
+    p.add_argument("directory")
+    p.add_argument("--pattern", action="append", required=True, metavar="NAME=REGEX",
+                   help="Repeat for several patterns; earlier ones win")
+    p.add_argument("--min-files", type=int, default=2)
+    p.add_argument("--ignore-spaces", action="store_true")
+    p.add_argument("--char-count", type=int, default=None)
+    _add_workers(p)
+    _add_dry_run(p)
+    _add_resume(p)
+    p.set_defaults(func=_cmd_sort_patterns)
+
+    p = sub.add_parser("sort-similar", help="Group files with similar names")
+    p.add_argument("directory")
+    p.add_argument("--threshold", type=float, default=0.6)
+    p.add_argument("--min-files", type=int, default=2)
+    _add_workers(p)
+    _add_dry_run(p)
+    _add_resume(p)
+    p.set_defaults(func=_cmd_sort_similar)
+
+    p = sub.add_parser("consolidate", help="Collapse single-file folders into Singles_Consolidated")
+    p.add_argument("directory")
+    p.add_argument("--keep-empty", action="store_true", help="Leave folders that were already empty")
+    p.set_defaults(workers=None)
+    _add_dry_run(p)
+    _add_resume(p)
+    p.set_defaults(func=_cmd_consolidate)
+
+    p = sub.add_parser("delete-empty", help="Delete empty folders")
+    p.add_argument("directory")
+    p.set_defaults(func=_cmd_delete_empty)
+
+    p = sub.add_parser("organize-photos", help="Sort photos into date folders using ExifTool")
+    p.add_argument("directory")
+    p.add_argument("--structure", default="%Y/%m-%b")
+    p.add_argument("--rename-format", default=None)
+    p.add_argument("--recursive", action="store_true")
+    p.add_argument("--copy", action="store_true")
+    p.add_argument("--keep-duplicates", action="store_true")
+    p.add_argument("--day-begins", type=int, default=0)
+    p.add_argument("--keep-filename", action="store_true")
+    _add_workers(p)
+    _add_dry_run(p)
+    _add_resume(p)
+    p.set_defaults(func=_cmd_organize_photos)
+
+    # Scanning, index and automation
+    p = sub.add_parser("extensions", help="List the file extensions found below a folder")
+    p.add_argument("directory")
+    p.set_defaults(func=_cmd_extensions)
+
+    p = sub.add_parser("index", help="Refresh, inspect or clear the persistent file index")
+    p.add_argument("action", choices=["refresh", "stats", "clear"])
+    p.add_argument("directory", nargs="?")
+    p.add_argument("--full", action="store_true", help="Re-read every folder, not only the changed ones")
+    p.set_defaults(func=_cmd_index)
+
+    p = sub.add_parser("watch", help="Watch hot folders and process new files as they arrive (until Ctrl+C / SIGTERM)")
+    p.add_argument("directories", nargs="+")
+    p.add_argument("--compress-pdfs", action="store_true", help="Compress new PDFs into compressed_pdfs/")
+    p.add_argument("--organize-photos", action="store_true", help="Move new dated files into date folders")
+    p.add_argument("--sort-extensions", action="store_true", help="Move the remaining new files into <EXT>_Files")
+    p.add_argument("--structure", default="%Y/%m-%b", help="Date folder structure for --organize-photos")
+    p.add_argument("--centralize", action="store_true", help="Sort files from subfolders into the watched folder's <EXT>_Files")
+    p.add_argument("--recursive", action="store_true", help="Also watch subfolders")
+    p.add_argument("--settle", type=float, default=watch_folder.SETTLE_SECONDS,
+                   help="Seconds a file must stay unchanged before it is processed")
+    p.add_argument("--poll", action="store_true", help="Poll the folders instead of using inotify")
+    p.add_argument("--existing", action="store_true", help="Also process the files already in the folders")
+    _add_workers(p)
+    p.set_defaults(func=_cmd_watch)
+
+    p = sub.add_parser("dedupe", help="Find files with identical content and optionally delete or link the copies")
+    p.add_argument("directories", nargs="+")
+    p.add_argument("--action", choices=dedupe.ACTIONS, default=dedupe.REPORT,
+                   help="What to do with all but one file of each group (default: only report)")
+    p.add_argument("--keep", choices=dedupe.KEEP_RULES, default=dedupe.KEEP_OLDEST, help="Which file of each group is kept")
+    p.add_argument("--min-size", type=int, default=dedupe.DEFAULT_MIN_SIZE, help="Ignore files smaller than this (bytes)")
+    p.add_argument("--no-cache", action="store_true", help="Do not read or store hashes in the file index")
+    p.add_argument("--workers", type=int, default=None, help=f"Parallel readers (default: {dedupe.DEFAULT_READERS})")
+    p.add_argument("--dry-run", action="store_true", help="Report what the action would do without touching files")
+    p.set_defaults(func=_cmd_dedupe)
+
+    # Journals
+    p = sub.add_parser("resume", help="Finish an interrupted sort (default: the newest one)")
+    p.add_argument("journal", nargs="?")
+    _add_workers(p)
+    p.set_defaults(func=_cmd_resume)
+
+    p = sub.add_parser("undo", help="Undo a sort (default: the newest one with applied moves)")
+    p.add_argument("journal", nargs="?")
+    _add_workers(p)
+    p.set_defaults(func=_cmd_undo)
+
+    p = sub.add_parser("journals", help="List move journals")
+    p.set_defaults(func=_cmd_journals)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    reporter = args.reporter = JsonLinesReporter(_claim_stdout(), args.command, args.progress_interval)
+    progress = None if args.quiet else reporter.progress
+    if args.index:
+        file_index.enable()
+    if hasattr(signal, 'SIGTERM'):
+        # Containers stop jobs with SIGTERM: unwind like Ctrl+C so journals are closed
+        signal.signal(signal.SIGTERM, _raise_interrupt)
+
+    start = time.perf_counter()
+    recording = instrument.recording(args.command, profile=args.profile)
+    stats = recording.recorder
+    try:
+        with recording:
+            success, msg = args.func(args, progress)
+    except KeyboardInterrupt:
+        reporter.emit('result', ok=False, message="Interrupted.", seconds=round(time.perf_counter() - start, 3),
+                      stats=stats.as_dict())
+        return EXIT_INTERRUPTED
+    except Exception as e:
+        reporter.emit('result', ok=False, message=f"{type(e).__name__}: {e}", seconds=round(time.perf_counter() - start, 3),
+                      stats=stats.as_dict())
+        return EXIT_FAILED
+
+    if not args.quiet:
+        # Human-readable copy on stderr; the JSON result carries the same numbers
+        print(stats.summary())
+    reporter.emit('result', ok=bool(success), message=msg, seconds=round(time.perf_counter() - start, 3),
+                  stats=stats.as_dict())
+    return EXIT_OK if success else EXIT_FAILED
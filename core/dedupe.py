@@ -0,0 +1,407 @@
+import os
+import sys
+import json
+import mmap
+import stat
+import time
+import errno
+import shutil
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from core import file_index, move_plan, instrument
+
+try:
+    import xxhash  # Optional: several times faster than BLAKE2 on fast disks
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
+
+# Configuration defaults
+PARTIAL_BYTES = 64 * 1024      # Read from the head and from the tail for the partial hash
+CHUNK_BYTES = 1024 * 1024      # Full-hash update size
+DEFAULT_READERS = 8            # Parallel readers (hashing releases the GIL)
+DEFAULT_MIN_SIZE = 1           # Empty files are never reported
+HASH_TAG = b"x3" if HAS_XXHASH else b"b2"
+DIGEST_SIZE = 16
+TEMP_SUFFIX = ".dedupe-tmp"
+FICLONE = 0x40049409           # ioctl(2): share extents on Btrfs / XFS / bcachefs
+
+# Actions
+REPORT = "report"
+DELETE = "delete"
+HARDLINK = "hardlink"
+REFLINK = "reflink"
+ACTIONS = (REPORT, DELETE, HARDLINK, REFLINK)
+
+# Which copy of each group is kept
+KEEP_OLDEST = "oldest"
+KEEP_NEWEST = "newest"
+KEEP_SHORTEST = "shortest"     # Shortest path, e.g. the copy nearest the root
+KEEP_FIRST = "first"           # First path in sort order
+KEEP_RULES = (KEEP_OLDEST, KEEP_NEWEST, KEEP_SHORTEST, KEEP_FIRST)
+
+def _new_hash():
+    return xxhash.xxh3_128() if HAS_XXHASH else hashlib.blake2b(digest_size=DIGEST_SIZE)
+
+def default_report_dir():
+    """Duplicate reports are saved with the dry-run plans."""
+    return move_plan.default_plan_dir()
+
+# --- HASHING ---
+def _partial_hash(path, size):
+    """Hash of the first and last PARTIAL_BYTES; for small files that is the whole file."""
+    h = _new_hash()
+    with open(path, 'rb') as f:
+        if size <= 2 * PARTIAL_BYTES:
+            data = f.read()
+        else:
+            data = f.read(PARTIAL_BYTES)
+            f.seek(size - PARTIAL_BYTES)
+            data += f.read(PARTIAL_BYTES)
+    h.update(data)
+    instrument.count('bytes_read', len(data))
+    return h.digest()
+
+def _full_hash(path, size):
+    """Hash of the whole file, read through mmap (plain reads where mmap is not possible)."""
+    h = _new_hash()
+    with open(path, 'rb') as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                if hasattr(m, 'madvise'):
+                    m.madvise(mmap.MADV_SEQUENTIAL)
+                with memoryview(m) as view:
+                    for offset in range(0, len(view), CHUNK_BYTES):
+                        h.update(view[offset:offset + CHUNK_BYTES])
+        except (OSError, ValueError):
+            # Empty file, pipe, or a network share without mmap support
+            f.seek(0)
+            for chunk in iter(lambda: f.read(CHUNK_BYTES), b""):
+                h.update(chunk)
+    instrument.count('bytes_read', size)
+    return h.digest()
+
+def _stored(value):
+    """(partial, full or None) from an index hash column written by this module, else None."""
+    if not value or value[:2] != HASH_TAG or len(value) not in (2 + DIGEST_SIZE, 2 + 2 * DIGEST_SIZE):
+        return None
+    return value[2:2 + DIGEST_SIZE], value[2 + DIGEST_SIZE:] or None
+
+class _Candidate(object):
+    __slots__ = ('path', 'size', 'mtime_ns', 'partial', 'full', 'dirty')
+
+    def __init__(self, path, size, mtime_ns):
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.partial = None
+        self.full = None
+        self.dirty = False          # Hashes computed this run, to be saved in the index
+
+def _groups(candidates, key):
+    """Buckets candidates by key(candidate); only buckets with two or more are kept."""
+    buckets = {}
+    for candidate in candidates:
+        buckets.setdefault(key(candidate), []).append(candidate)
+    return [bucket for bucket in buckets.values() if len(bucket) > 1]
+
+# --- FINDING ---
+def _list_files(roots, use_index, progress_callback):
+    """{path: (size, mtime_ns)} below the roots, and {path: stored hash} when the index is used."""
+    files, stored = {}, {}
+    if use_index:
+        index = file_index.get_index()
+        for root in roots:
+            index.refresh(root, progress_callback=progress_callback)
+            for path, size, mtime_ns in index.files(root):
+                files[path] = (size, mtime_ns)
+            stored.update(index.hashes(root))
+        return files, stored
+    for root in roots:
+        for dirpath, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path, follow_symlinks=False)
+                except OSError:
+                    continue
+                if stat.S_ISREG(st.st_mode):
+                    files[path] = (st.st_size, st.st_mtime_ns)
+    return files, stored
+
+def _lstat(path):
+    try:
+        return os.stat(path, follow_symlinks=False)
+    except OSError:
+        return None
+
+def _run_pool(pool, func, candidates, stage_name, progress_callback, stop_event):
+    """Runs func(candidate) for every candidate on the reader pool; failures drop the candidate."""
+    done = []
+    total = len(candidates)
+    for i, (candidate, ok) in enumerate(zip(candidates, pool.map(instrument.propagate(_guarded(func)), candidates))):
+        if stop_event and stop_event.is_set():
+            break
+        if ok:
+            done.append(candidate)
+        if progress_callback and (i % 100 == 0 or i + 1 == total):
+            progress_callback(i + 1, total, f"{stage_name} {os.path.basename(candidate.path)}")
+    return done
+
+def _guarded(func):
+    def run(candidate):
+        try:
+            func(candidate)
+            return True
+        except OSError as e:
+            print(f"Dedupe Error {candidate.path}: {e}")
+            return False
+    return run
+
+def find_duplicates(roots, min_size=DEFAULT_MIN_SIZE, workers=None, use_index=True, progress_callback=None, stop_event=None):
+    """
+    Finds files with identical content below 'roots' in stages, each one
+    reading only what the previous stage could not rule out:
+        1. group by size (from the file index or a walk, no file is opened);
+        2. hash the first and last 64 KB of same-size files;
+        3. hash the full content of files whose partial hashes still match.
+    Hashes are kept in the file index (use_index=True) and reused while the
+    file's size and mtime are unchanged. Hard links to the same file count
+    as one copy. Returns a list of groups, most wasted space first:
+        {'size': bytes, 'hash': hex, 'files': [paths], 'mtimes': [mtime_ns]}
+    """
+    roots = [os.path.abspath(root) for root in roots]
+    workers = workers or DEFAULT_READERS
+
+    # --- STAGE 1: SIZES ---
+    with instrument.stage("dedupe scan"):
+        files, stored = _list_files(roots, use_index, progress_callback)
+    instrument.count('files_scanned', len(files))
+    by_size = {}
+    for path, (size, _) in files.items():
+        if size >= min_size:
+            by_size.setdefault(size, []).append(path)
+    paths = [path for group in by_size.values() if len(group) > 1 for path in group]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Sizes from the index can be stale for files edited in place: stat the candidates
+        candidates = []
+        seen_inodes = set()
+        with instrument.stage("dedupe stat"):
+            for path, st in zip(paths, pool.map(_lstat, paths)):
+                if st is None or not stat.S_ISREG(st.st_mode):
+                    continue
+                inode = (st.st_dev, st.st_ino)
+                if inode in seen_inodes:
+                    continue  # Another name for a file already listed
+                seen_inodes.add(inode)
+                candidate = _Candidate(path, st.st_size, st.st_mtime_ns)
+                known = stored.get(path)
+                hashes = _stored(known[2]) if known and known[:2] == (st.st_size, st.st_mtime_ns) else None
+                if hashes:
+                    candidate.partial, candidate.full = hashes
+                    instrument.count('hash_cache_hits')
+                candidates.append(candidate)
+        size_groups = _groups(candidates, lambda c: c.size)
+
+        # --- STAGE 2: HEAD AND TAIL ---
+        def partial(candidate):
+            candidate.partial = _partial_hash(candidate.path, candidate.size)
+            candidate.dirty = True
+
+        todo = [c for group in size_groups for c in group if c.partial is None]
+        with instrument.stage("dedupe partial hash"):
+            _run_pool(pool, partial, todo, "Partial hash", progress_callback, stop_event)
+        instrument.count('files_partial_hashed', len(todo))
+        partial_groups = _groups([c for group in size_groups for c in group if c.partial is not None], lambda c: (c.size, c.partial))
+
+        # --- STAGE 3: FULL CONTENT ---
+        def full(candidate):
+            candidate.full = _full_hash(candidate.path, candidate.size)
+            candidate.dirty = True
+
+        for group in partial_groups:
+            if group[0].size <= 2 * PARTIAL_BYTES:
+                for c in group:
+                    c.full = c.partial  # The partial hash already covered every byte
+        todo = [c for group in partial_groups for c in group if c.full is None]
+        with instrument.stage("dedupe full hash"):
+            _run_pool(pool, full, todo, "Full hash", progress_callback, stop_event)
+        instrument.count('files_full_hashed', len(todo))
+        full_groups = _groups([c for group in partial_groups for c in group if c.full is not None], lambda c: (c.size, c.full))
+
+    # --- PERSIST ---
+    if use_index:
+        entries = []
+        for c in candidates:
+            if c.dirty and c.partial is not None:
+                full_digest = c.full if c.full is not None and c.size > 2 * PARTIAL_BYTES else b""
+                entries.append((c.path, c.size, c.mtime_ns, HASH_TAG + c.partial + full_digest))
+        if entries:
+            file_index.get_index().set_hashes(entries)
+
+    groups = []
+    for group in full_groups:
+        group.sort(key=lambda c: c.path)
+        groups.append({
+            'size': group[0].size,
+            'hash': group[0].full.hex(),
+            'files': [c.path for c in group],
+            'mtimes': [c.mtime_ns for c in group],
+        })
+    groups.sort(key=lambda g: (-g['size'] * (len(g['files']) - 1), g['files'][0]))
+    return groups
+
+def wasted_bytes(groups):
+    return sum(group['size'] * (len(group['files']) - 1) for group in groups)
+
+def save_report(groups, path=None):
+    """Writes the groups as JSON. Returns the path."""
+    if path is None:
+        os.makedirs(default_report_dir(), exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S') + f"{int(time.time() * 1000) % 1000:03d}"
+        path = os.path.join(default_report_dir(), f"{stamp}_duplicates.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'wasted_bytes': wasted_bytes(groups), 'groups': groups}, f, indent=1, ensure_ascii=False)
+    return path
+
+# --- ACTIONS ---
+def _keeper(group, keep):
+    indices = range(len(group['files']))
+    if keep == KEEP_NEWEST:
+        return max(indices, key=lambda i: (group['mtimes'][i], group['files'][i]))
+    if keep == KEEP_SHORTEST:
+        return min(indices, key=lambda i: (len(group['files'][i]), group['files'][i]))
+    if keep == KEEP_FIRST:
+        return min(indices, key=lambda i: group['files'][i])
+    return min(indices, key=lambda i: (group['mtimes'][i], group['files'][i]))
+
+def _reflink(src, dst):
+    """Creates dst sharing src's data blocks (copy-on-write). Raises OSError where unsupported."""
+    if sys.platform.startswith('linux'):
+        import fcntl
+        with open(src, 'rb') as s, open(dst, 'wb') as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+    elif sys.platform == 'darwin':
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        if libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) != 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code))
+    else:
+        raise OSError(errno.EOPNOTSUPP, "Reflinks are not supported on this platform")
+
+def _replace_with(keep_path, dup_path, action):
+    """Swaps dup_path for a hard link / reflink to keep_path through a temporary name, so a failure leaves it intact."""
+    tmp_path = dup_path + TEMP_SUFFIX
+    try:
+        if action == HARDLINK:
+            os.link(keep_path, tmp_path)
+        else:
+            _reflink(keep_path, tmp_path)
+            shutil.copystat(dup_path, tmp_path)
+        os.replace(tmp_path, dup_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def apply_action(groups, action, keep=KEEP_OLDEST, dry_run=False, progress_callback=None, stop_event=None):
+    """
+    Keeps one file per group (chosen by 'keep') and deletes the others or
+    replaces them with hard links / reflinks to it. Files whose size or
+    mtime changed since they were hashed are left alone.
+    Returns (success, message).
+    """
+    if action not in ACTIONS:
+        return False, f"Unknown action '{action}'."
+    if keep not in KEEP_RULES:
+        return False, f"Unknown keep rule '{keep}'."
+    if action == REPORT:
+        return True, ""
+
+    total = sum(len(group['files']) - 1 for group in groups)
+    done = freed = current = 0
+    errors = []
+    for group in groups:
+        if stop_event and stop_event.is_set():
+            break
+        keep_index = _keeper(group, keep)
+        keep_path = group['files'][keep_index]
+        keep_st = _lstat(keep_path)
+        for i, dup_path in enumerate(group['files']):
+            if i == keep_index:
+                continue
+            current += 1
+            if progress_callback:
+                progress_callback(current, total, os.path.basename(dup_path))
+            dup_st = _lstat(dup_path)
+            if keep_st is None or dup_st is None or (keep_st.st_size, keep_st.st_mtime_ns) != (group['size'], group['mtimes'][keep_index]) \
+                    or (dup_st.st_size, dup_st.st_mtime_ns) != (group['size'], group['mtimes'][i]):
+                errors.append(f"{dup_path}: changed since it was hashed, skipped")
+                continue
+            if action == HARDLINK and (dup_st.st_dev, dup_st.st_ino) == (keep_st.st_dev, keep_st.st_ino):
+                continue
+            if dry_run:
+                done += 1
+                freed += group['size']
+                continue
+            try:
+                if action == DELETE:
+                    os.remove(dup_path)
+                else:
+                    _replace_with(keep_path, dup_path, action)
+                done += 1
+                freed += group['size']
+            except OSError as e:
+                errors.append(f"{dup_path}: {e}")
+
+    if dry_run:
+        verb = {DELETE: "Would delete", HARDLINK: "Would hard-link", REFLINK: "Would reflink"}[action]
+    else:
+        verb = {DELETE: "Deleted", HARDLINK: "Hard-linked", REFLINK: "Reflinked"}[action]
+    msg = f"{verb} {done} duplicates, {freed / (1024 * 1024):.1f} MB {'to free' if dry_run else 'freed'}."
+    if errors:
+        msg += f"\n{len(errors)} skipped:\n" + "\n".join(errors[:20])
+        if len(errors) > 20:
+            msg += f"\n... and {len(errors) - 20} more"
+    return not errors, msg
+
+def dedupe(roots, action=REPORT, keep=KEEP_OLDEST, min_size=DEFAULT_MIN_SIZE, workers=None, dry_run=False,
+           use_index=True, progress_callback=None, stop_event=None, groups_callback=None):
+    """
+    Finds duplicates below 'roots', saves the report and applies 'action'.
+    groups_callback(groups) gets the groups before the action runs.
+    Returns (success, message).
+    """
+    for root in roots:
+        if not os.path.isdir(root):
+            return False, f"Not a folder: {root}"
+    if action not in ACTIONS:
+        return False, f"Unknown action '{action}'."
+
+    groups = find_duplicates(roots, min_size, workers, use_index, progress_callback, stop_event)
+    if stop_event and stop_event.is_set():
+        return False, "Duplicate search cancelled."
+    if not groups:
+        return True, "No duplicates found."
+
+    report_path = save_report(groups)
+    if groups_callback:
+        groups_callback(groups)
+    copies = sum(len(group['files']) - 1 for group in groups)
+    lines = [f"{len(groups)} groups of identical files, {copies} redundant copies, "
+             f"{wasted_bytes(groups) / (1024 * 1024):.1f} MB wasted."]
+    for group in groups[:10]:
+        lines.append(f"  {len(group['files'])} x {group['size'] / 1024:.0f}KB {os.path.basename(group['files'][0])}")
+    if len(groups) > 10:
+        lines.append(f"  ... and {len(groups) - 10} more groups")
+    lines.append(f"Full report saved to: {report_path}")
+
+    success, msg = apply_action(groups, action, keep, dry_run, progress_callback, stop_event)
+    if msg:
+        lines.append(msg)
+    return success, "\n".join(lines)
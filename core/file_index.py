@@ -0,0 +1,367 @@
+import os
+import stat
+import time
+import sqlite3
+import threading
+from core import instrument
+
+# Configuration defaults
+INDEX_FILE = "file_index.sqlite"
+SCHEMA_VERSION = 1
+MTIME_SLACK_NS = 2 * 10**9      # Folders changed this recently are rescanned next time (FAT has 2 s mtimes)
+COMMIT_EVERY = 500              # Folders rescanned per transaction
+PROGRESS_EVERY = 200            # Folders visited between progress updates
+SCAN_MAX_AGE = 60               # Seconds scan_extensions() trusts a refresh of the same folder
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,       -- os.path.normcase(path), used for lookups and subtree ranges
+    path TEXT NOT NULL,
+    parent INTEGER,
+    mtime_ns INTEGER NOT NULL       -- -1: rescan on the next refresh
+);
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs(parent);
+CREATE TABLE IF NOT EXISTS files (
+    dir INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    ext TEXT NOT NULL,              -- lower case without the dot, '' for none
+    hash BLOB,                      -- optional content hash, dropped when size or mtime change
+    PRIMARY KEY (dir, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS files_ext ON files(ext, dir);
+CREATE TABLE IF NOT EXISTS roots (
+    key TEXT PRIMARY KEY,
+    refreshed REAL NOT NULL
+);
+"""
+
+def default_index_path():
+    """Per-user cache folder (LOCALAPPDATA on Windows, XDG/~/.cache elsewhere)."""
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME')
+    if not base:
+        base = os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'FileManagementSuite', INDEX_FILE)
+
+def _key(path):
+    return os.path.normcase(path)
+
+def _subtree(column, key):
+    """SQL condition (and its parameters) matching 'key' and every folder below it."""
+    prefix = key if key.endswith(os.sep) else key + os.sep
+    upper = prefix[:-1] + chr(ord(os.sep) + 1)
+    return f"({column} = ? OR ({column} >= ? AND {column} < ?))", (key, prefix, upper)
+
+def _extension(name):
+    return os.path.splitext(name)[1].lstrip('.').lower()
+
+class FileIndex(object):
+    """
+    SQLite index of every file below the folders it has been asked about:
+    path, size, mtime, extension and an optional content hash.
+    refresh() stats each known folder and only lists the ones whose mtime
+    changed, so an unchanged tree costs one stat per folder instead of a
+    listing of every file. Files edited in place do not touch their folder's
+    mtime; their size / mtime are only updated by refresh(full=True).
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_index_path()
+        self._local = threading.local()
+        self._refresh_lock = threading.Lock()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                conn.executescript("DROP TABLE IF EXISTS dirs; DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS roots;")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    # --- UPDATING ---
+    def refresh(self, top, full=False, max_age=None, progress_callback=None):
+        """
+        Brings the index for 'top' up to date with the disk.
+        full: list every folder, not only the ones whose mtime changed.
+        max_age: skip the refresh if 'top' was refreshed less than this many seconds ago.
+        Returns {'dirs': visited, 'rescanned': n, 'skipped': n, 'removed': n}.
+        """
+        top = os.path.abspath(top)
+        top_key = _key(top)
+        stats = {'dirs': 0, 'rescanned': 0, 'skipped': 0, 'removed': 0}
+        with self._refresh_lock, instrument.stage("index refresh"):
+            conn = self._connect()
+            if max_age is not None and not full:
+                row = conn.execute("SELECT refreshed FROM roots WHERE key = ?", (top_key,)).fetchone()
+                if row and time.time() - row[0] < max_age:
+                    return stats
+
+            condition, params = _subtree("key", top_key)
+            known = {}
+            children = {}
+            for dir_id, key, path, parent, mtime_ns in conn.execute(
+                    f"SELECT id, key, path, parent, mtime_ns FROM dirs WHERE {condition}", params):
+                known[key] = (dir_id, mtime_ns, parent)
+                children.setdefault(parent, []).append(path)
+
+            stack = [(top, None)]
+            seen = set()
+            pending = 0
+            now_ns = time.time_ns()
+            while stack:
+                path, parent_id = stack.pop()
+                key = _key(path)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if not stat.S_ISDIR(st.st_mode):
+                    continue
+                seen.add(key)
+                stats['dirs'] += 1
+                if progress_callback and stats['dirs'] % PROGRESS_EVERY == 0:
+                    progress_callback(stats['dirs'], 0, f"Indexing {path}")
+
+                record = known.get(key)
+                if record and parent_id is not None and record[2] != parent_id:
+                    # Indexed on its own before its parent was
+                    conn.execute("UPDATE dirs SET parent = ? WHERE id = ?", (parent_id, record[0]))
+                if record and not full and record[1] == st.st_mtime_ns:
+                    stats['skipped'] += 1
+                    stack.extend((child, record[0]) for child in children.get(record[0], ()))
+                    continue
+
+                subdirs = self._rescan(conn, path, key, parent_id, record, st.st_mtime_ns, now_ns)
+                if subdirs is None:
+                    continue
+                dir_id, subdirs = subdirs
+                stats['rescanned'] += 1
+                stack.extend((sub, dir_id) for sub in subdirs)
+                pending += 1
+                if pending >= COMMIT_EVERY:
+                    conn.commit()
+                    pending = 0
+
+            # Folders that are gone (or no longer reachable from 'top')
+            for key, (dir_id, _, _) in known.items():
+                if key not in seen:
+                    conn.execute("DELETE FROM files WHERE dir = ?", (dir_id,))
+                    conn.execute("DELETE FROM dirs WHERE id = ?", (dir_id,))
+                    stats['removed'] += 1
+            if top_key not in seen:
+                conn.execute("DELETE FROM roots WHERE key = ?", (top_key,))
+            else:
+                conn.execute("INSERT OR REPLACE INTO roots (key, refreshed) VALUES (?, ?)", (top_key, time.time()))
+            conn.commit()
+
+        instrument.count('dirs_rescanned', stats['rescanned'])
+        instrument.count('dirs_skipped', stats['skipped'])
+        return stats
+
+    def _rescan(self, conn, path, key, parent_id, record, mtime_ns, now_ns):
+        """Replaces one folder's file rows with a fresh listing. Returns (dir_id, subfolder paths) or None."""
+        rows = []
+        subdirs = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir():
+                            # Links to folders are neither files nor followed, as with os.walk
+                            if not entry.is_symlink():
+                                subdirs.append(entry.path)
+                            continue
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    rows.append((entry.name, st.st_size, st.st_mtime_ns, _extension(entry.name)))
+        except OSError as e:
+            print(f"Index Error {path}: {e}")
+            return None
+        instrument.count('files_indexed', len(rows))
+
+        # A folder modified within the mtime granularity could change again without its mtime moving
+        stored_mtime = mtime_ns if now_ns - mtime_ns > MTIME_SLACK_NS else -1
+        if record:
+            dir_id = record[0]
+            conn.execute("UPDATE dirs SET path = ?, mtime_ns = ? WHERE id = ?", (path, stored_mtime, dir_id))
+            hashes = {name: (size, mtime, digest) for name, size, mtime, digest in conn.execute(
+                "SELECT name, size, mtime_ns, hash FROM files WHERE dir = ? AND hash IS NOT NULL", (dir_id,))}
+            conn.execute("DELETE FROM files WHERE dir = ?", (dir_id,))
+        else:
+            if parent_id is None:
+                parent = conn.execute("SELECT id FROM dirs WHERE key = ?", (_key(os.path.dirname(path)),)).fetchone()
+                parent_id = parent[0] if parent else None
+            dir_id = conn.execute("INSERT INTO dirs (key, path, parent, mtime_ns) VALUES (?, ?, ?, ?)",
+                                  (key, path, parent_id, stored_mtime)).lastrowid
+            hashes = {}
+
+        def with_hash(row):
+            name, size, mtime, ext = row
+            old = hashes.get(name)
+            keep = old[2] if old and old[0] == size and old[1] == mtime else None
+            return (dir_id, name, size, mtime, ext, keep)
+
+        conn.executemany("INSERT INTO files (dir, name, size, mtime_ns, ext, hash) VALUES (?, ?, ?, ?, ?, ?)",
+                         map(with_hash, rows))
+        return dir_id, subdirs
+
+    def clear(self):
+        conn = self._connect()
+        with self._refresh_lock:
+            conn.executescript("DELETE FROM files; DELETE FROM dirs; DELETE FROM roots;")
+            conn.commit()
+        conn.execute("VACUUM")
+
+    # --- QUERIES (call refresh() first) ---
+    def walk(self, top):
+        """
+        Same as os.walk(top) (top-down) but served from the index: yields
+        (dirpath, dirnames, filenames); removing names from dirnames prunes them.
+        """
+        top_key = _key(os.path.abspath(top))
+        conn = self._connect()
+        condition, params = _subtree("key", top_key)
+        paths = {}
+        children = {}
+        top_id = None
+        for dir_id, key, path, parent in conn.execute(f"SELECT id, key, path, parent FROM dirs WHERE {condition} ORDER BY key", params):
+            paths[dir_id] = path
+            if key == top_key:
+                top_id = dir_id
+            else:
+                children.setdefault(parent, []).append(dir_id)
+        if top_id is None:
+            return
+        files = {}
+        condition, params = _subtree("d.key", top_key)
+        for dir_id, name in conn.execute(
+                f"SELECT f.dir, f.name FROM files f JOIN dirs d ON d.id = f.dir WHERE {condition}", params):
+            files.setdefault(dir_id, []).append(name)
+
+        stack = [top_id]
+        while stack:
+            dir_id = stack.pop()
+            by_name = {os.path.basename(paths[child]): child for child in children.get(dir_id, ())}
+            dirnames = list(by_name)
+            yield paths[dir_id], dirnames, files.get(dir_id, [])
+            stack.extend(by_name[name] for name in reversed(dirnames) if name in by_name)
+
+    def files(self, top, extensions=None):
+        """
+        Yields (full_path, size, mtime_ns) for every indexed file below 'top'.
+        extensions: only these ('.jpg' or 'jpg', any case; '' for no extension).
+        """
+        condition, params = _subtree("d.key", _key(os.path.abspath(top)))
+        query = f"SELECT d.path, f.name, f.size, f.mtime_ns FROM files f JOIN dirs d ON d.id = f.dir WHERE {condition}"
+        if extensions is not None:
+            exts = sorted({ext.lstrip('.').lower() for ext in extensions})
+            query += f" AND f.ext IN ({', '.join('?' * len(exts))})"
+            params += tuple(exts)
+        for dirpath, name, size, mtime_ns in self._connect().execute(query, params):
+            yield os.path.join(dirpath, name), size, mtime_ns
+
+    def extensions(self, top):
+        """Sorted extensions ('' for none) of the indexed files below 'top'."""
+        conn = self._connect()
+        condition, params = _subtree("d.key", _key(os.path.abspath(top)))
+        in_scope = conn.execute(f"SELECT COUNT(*) FROM dirs d WHERE {condition}", params).fetchone()[0]
+        if in_scope < conn.execute("SELECT COUNT(*) FROM dirs").fetchone()[0]:
+            return [ext for ext, in conn.execute(
+                f"SELECT DISTINCT f.ext FROM files f JOIN dirs d ON d.id = f.dir WHERE {condition} ORDER BY f.ext", params)]
+        # 'top' covers the whole index: hop from one distinct extension to the
+        # next on the (ext, dir) index instead of reading every file row
+        found = []
+        ext = conn.execute("SELECT MIN(ext) FROM files").fetchone()[0]
+        while ext is not None:
+            found.append(ext)
+            ext = conn.execute("SELECT MIN(ext) FROM files WHERE ext > ?", (ext,)).fetchone()[0]
+        return found
+
+    def hashes(self, top):
+        """{full_path: (size, mtime_ns, hash)} for the hashed files below 'top'."""
+        condition, params = _subtree("d.key", _key(os.path.abspath(top)))
+        found = {}
+        for dirpath, name, size, mtime_ns, digest in self._connect().execute(
+                f"SELECT d.path, f.name, f.size, f.mtime_ns, f.hash FROM files f JOIN dirs d ON d.id = f.dir "
+                f"WHERE {condition} AND f.hash IS NOT NULL", params):
+            found[os.path.join(dirpath, name)] = (size, mtime_ns, digest)
+        return found
+
+    def lookup(self, path):
+        """(size, mtime_ns, hash) recorded for one file, or None."""
+        path = os.path.abspath(path)
+        return self._connect().execute(
+            "SELECT f.size, f.mtime_ns, f.hash FROM files f JOIN dirs d ON d.id = f.dir WHERE d.key = ? AND f.name = ?",
+            (_key(os.path.dirname(path)), os.path.basename(path))).fetchone()
+
+    def set_hashes(self, entries):
+        """
+        Stores content hashes: entries are (path, size, mtime_ns, hash). A hash
+        is only kept while the indexed size and mtime match the ones it was computed for.
+        """
+        conn = self._connect()
+        rows = []
+        for path, size, mtime_ns, digest in entries:
+            path = os.path.abspath(path)
+            rows.append((digest, _key(os.path.dirname(path)), os.path.basename(path), size, mtime_ns))
+        conn.executemany("UPDATE files SET hash = ? WHERE dir = (SELECT id FROM dirs WHERE key = ?) "
+                         "AND name = ? AND size = ? AND mtime_ns = ?", rows)
+        conn.commit()
+
+    def stats(self):
+        conn = self._connect()
+        return {
+            'path': self.path,
+            'roots': [key for key, in conn.execute("SELECT key FROM roots ORDER BY key")],
+            'dirs': conn.execute("SELECT COUNT(*) FROM dirs").fetchone()[0],
+            'files': conn.execute("SELECT COUNT(*) FROM files").fetchone()[0],
+            'hashed': conn.execute("SELECT COUNT(*) FROM files WHERE hash IS NOT NULL").fetchone()[0],
+            'bytes': os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+        }
+
+# --- SHARED INDEX ---
+# Scanners go through walk() / find_files() below; they only use the index
+# once it is enabled (Sorting Tools checkbox, or --index on the command line).
+_default_index = None
+_default_lock = threading.Lock()
+_enabled = False
+
+def enable(enabled=True):
+    global _enabled
+    _enabled = enabled
+
+def enabled():
+    return _enabled
+
+def get_index():
+    global _default_index
+    with _default_lock:
+        if _default_index is None:
+            _default_index = FileIndex()
+        return _default_index
+
+def walk(top, max_age=None):
+    """os.walk(top), served from the refreshed shared index when it is enabled."""
+    if not _enabled:
+        return os.walk(top)
+    index = get_index()
+    index.refresh(top, max_age=max_age)
+    return index.walk(top)
+
+def find_files(top, extensions, max_age=None):
+    """Full paths of the files below 'top' whose extension is in 'extensions' ('.ai', '.jpg', ...)."""
+    if _enabled:
+        index = get_index()
+        index.refresh(top, max_age=max_age)
+        return [path for path, _, _ in index.files(top, extensions)]
+    wanted = {ext.lstrip('.').lower() for ext in extensions}
+    return [os.path.join(root, name) for root, _, files in os.walk(top) for name in files if _extension(name) in wanted]
@@ -0,0 +1,263 @@
+import os
+import time
+import errno
+import shutil
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from core import instrument
+
+# Configuration defaults
+DEFAULT_COPY_WORKERS = 4              # Parallel cross-device copies
+COPY_CHUNK = 8 * 1024 * 1024          # Bytes per zero-copy syscall / buffered read
+PART_SUFFIX = ".part"                 # Temp name used while a copy is in flight
+
+def _copy_range(src_fd, dst_fd, size):
+    """Kernel-side copy. Returns False if neither copy_file_range nor sendfile is usable."""
+    for syscall in ('copy_file_range', 'sendfile'):
+        func = getattr(os, syscall, None)
+        if func is None:
+            continue
+        offset = 0
+        try:
+            while offset < size:
+                if syscall == 'copy_file_range':
+                    sent = func(src_fd, dst_fd, min(COPY_CHUNK, size - offset), offset, offset)
+                else:
+                    sent = func(dst_fd, src_fd, offset, min(COPY_CHUNK, size - offset))
+                if sent == 0:
+                    break
+                offset += sent
+            if offset == size:
+                return True
+        except OSError as e:
+            # Unsupported for this pair of filesystems: rewind and try the next method
+            if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF, errno.ENOTSOCK):
+                raise
+        os.lseek(dst_fd, 0, os.SEEK_SET)
+        os.ftruncate(dst_fd, 0)
+    return False
+
+def rename_no_replace(src, dst):
+    """
+    os.rename that raises FileExistsError instead of replacing an existing
+    dst. On POSIX this is a hard link plus unlink, so the check and the
+    rename are one atomic step; Windows renames never replace.
+    """
+    if os.name == 'nt':
+        os.rename(src, dst)
+        return
+    try:
+        os.link(src, dst, follow_symlinks=False)
+    except OSError as e:
+        if e.errno not in (errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EOPNOTSUPP):
+            raise
+        # No hard links on this filesystem (e.g. FAT, some shares): check, then rename
+        if os.path.lexists(dst):
+            raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), dst)
+        os.rename(src, dst)
+        return
+    os.remove(src)
+
+def copy_file(src, dst, remove_source=False, no_replace=False):
+    """
+    Copies src to dst (data + metadata) through a temp file, using zero-copy
+    syscalls where the OS offers them. The size is verified before the temp
+    file is renamed into place and, for moves, before the source is removed.
+    no_replace: fail with FileExistsError instead of replacing an existing dst.
+    Returns the number of bytes copied.
+    """
+    size = os.stat(src).st_size
+    tmp_path = dst + PART_SUFFIX
+    try:
+        with open(src, 'rb') as fsrc, open(tmp_path, 'wb') as fdst:
+            if not _copy_range(fsrc.fileno(), fdst.fileno(), size):
+                shutil.copyfileobj(fsrc, fdst, COPY_CHUNK)
+            fdst.flush()
+            copied = os.fstat(fdst.fileno()).st_size
+        if copied != size:
+            raise OSError(errno.EIO, f"Size mismatch after copy ({copied} of {size} bytes)", src)
+        shutil.copystat(src, tmp_path)
+        if no_replace:
+            rename_no_replace(tmp_path, dst)
+        else:
+            os.replace(tmp_path, dst)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    if remove_source:
+        os.remove(src)
+    return size
+
+class _DeviceCache(object):
+    """Remembers st_dev per directory so cross-device pairs skip the doomed rename."""
+
+    def __init__(self):
+        self._devices = {}
+
+    def device(self, directory):
+        if directory not in self._devices:
+            try:
+                self._devices[directory] = os.stat(directory).st_dev
+            except OSError:
+                self._devices[directory] = None
+        return self._devices[directory]
+
+    def same_device(self, src, dst):
+        src_dev = self.device(os.path.dirname(src) or '.')
+        dst_dev = self.device(os.path.dirname(dst) or '.')
+        return src_dev is None or dst_dev is None or src_dev == dst_dev
+
+def move_files(moves, workers=None, copy=False, progress_callback=None, stop_event=None, on_result=None, no_replace=False):
+    """
+    Moves (or copies) a batch of (source, destination) file pairs.
+    Same-device moves are a plain os.rename on the calling thread; cross-device
+    moves and copies run on a bounded thread pool. Destination folders are
+    created as needed. Destinations must already be unique (callers resolve
+    name collisions while planning).
+    Returns a stats dict: moved, renamed, copied, bytes, seconds, mb_per_sec,
+    failed (list of (source, destination, error)) and stopped.
+    on_result(index, ok, error) is called on this thread as each move settles
+    (the move journal uses it).
+    no_replace: a destination that exists when its move runs is left alone and
+    the move fails, checked atomically with the rename (undo uses this).
+    """
+    workers = workers or DEFAULT_COPY_WORKERS
+    total = len(moves)
+    stats = {'moved': 0, 'renamed': 0, 'copied': 0, 'bytes': 0, 'seconds': 0.0,
+             'mb_per_sec': 0.0, 'failed': [], 'stopped': False}
+    devices = _DeviceCache()
+    created_dirs = set()
+    done = 0
+    start = time.perf_counter()
+    copy_seconds_start = None
+
+    def report(index, src, error=None):
+        nonlocal done
+        done += 1
+        if on_result:
+            on_result(index, error is None, error)
+        if progress_callback:
+            progress_callback(done, total, os.path.basename(src))
+
+    def fail(index, src, dst, e):
+        print(f"Move Error {src}: {e}")
+        stats['failed'].append((src, dst, str(e)))
+        report(index, src, str(e))
+
+    def finish(future):
+        index, src, dst = pending.pop(future)
+        try:
+            nbytes = future.result()
+        except Exception as e:
+            fail(index, src, dst, e)
+            return
+        stats['moved'] += 1
+        stats['copied'] += 1
+        stats['bytes'] += nbytes
+        report(index, src)
+
+    pending = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for index, (src, dst) in enumerate(moves):
+            if stop_event and stop_event.is_set():
+                stats['stopped'] = True
+                break
+
+            dst_dir = os.path.dirname(dst)
+            if dst_dir and dst_dir not in created_dirs:
+                try:
+                    os.makedirs(dst_dir, exist_ok=True)
+                except OSError as e:
+                    fail(index, src, dst, e)
+                    continue
+                created_dirs.add(dst_dir)
+
+            # --- RENAME FAST PATH ---
+            if not copy and devices.same_device(src, dst):
+                try:
+                    if no_replace:
+                        rename_no_replace(src, dst)
+                    else:
+                        os.rename(src, dst)
+                    stats['moved'] += 1
+                    stats['renamed'] += 1
+                    report(index, src)
+                    continue
+                except OSError as e:
+                    if e.errno != errno.EXDEV:
+                        fail(index, src, dst, e)
+                        continue
+                    # Different filesystem after all (e.g. a bind mount): copy instead
+
+            # --- POOLED COPY ---
+            if copy_seconds_start is None:
+                copy_seconds_start = time.perf_counter()
+            future = executor.submit(copy_file, src, dst, not copy, no_replace)
+            pending[future] = (index, src, dst)
+
+            # Keep the queue bounded so huge batches don't pile up futures
+            if len(pending) >= workers * 2:
+                completed, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for future in completed:
+                    finish(future)
+
+        if stats['stopped']:
+            for future in list(pending):
+                if future.cancel():
+                    pending.pop(future)
+
+        while pending:
+            completed, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in completed:
+                finish(future)
+
+    stats['seconds'] = time.perf_counter() - start
+    instrument.add_time("move files", stats['seconds'])
+    instrument.count('files_renamed', stats['renamed'])
+    instrument.count('files_copied', stats['copied'])
+    instrument.count('bytes_written', stats['bytes'])
+    if copy_seconds_start is not None:
+        copy_seconds = time.perf_counter() - copy_seconds_start
+        if copy_seconds > 0:
+            stats['mb_per_sec'] = stats['bytes'] / (1024 * 1024) / copy_seconds
+    return stats
+
+def describe_throughput(stats):
+    """One-line summary of the copy traffic, or '' when every move was a rename."""
+    if not stats['copied']:
+        return ""
+    return f"Copied {stats['copied']} files ({stats['bytes'] / (1024 * 1024):.1f} MB) at {stats['mb_per_sec']:.1f} MB/s."
+
+def unique_name(taken, file_name, fmt="{base}_{counter}{ext}", start=1):
+    """
+    Returns a name for 'file_name' that is not in the set 'taken' (compared
+    with os.path.normcase) and records it there.
+    """
+    base, ext = os.path.splitext(file_name)
+    candidate = file_name
+    counter = start
+    while os.path.normcase(candidate) in taken:
+        candidate = fmt.format(base=base, counter=counter, ext=ext)
+        counter += 1
+    taken.add(os.path.normcase(candidate))
+    return candidate
+
+class NameIndex(object):
+    """Lazily lists each destination folder once and tracks names claimed since."""
+
+    def __init__(self):
+        self._folders = {}
+
+    def taken(self, folder):
+        if folder not in self._folders:
+            try:
+                self._folders[folder] = {os.path.normcase(name) for name in os.listdir(folder)}
+            except OSError:
+                self._folders[folder] = set()
+        return self._folders[folder]
+
+    def claim(self, folder, file_name, fmt="{base}_{counter}{ext}", start=1):
+        return unique_name(self.taken(folder), file_name, fmt, start)
@@ -1,10 +1,15 @@
 import os
-import shutil
+import json
+import math
 import hashlib
-from PIL import Image
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from core import file_mover, move_plan, instrument, file_index
 
 # --- IMAGE BATCHING LOGIC ---
 def batch_process_images(source_dir, dest_dir, percentage, output_format, quality, progress_callback=None):
+    from PIL import Image
     supported_formats = ["jpeg", "png", "webp", "bmp", "gif", "tiff"]
     image_files = [f for f in os.listdir(source_dir) if f.lower().endswith(tuple(f".{fmt}" for fmt in supported_formats))]
     total_files = len(image_files)
@@ -15,10 +20,12 @@ def batch_process_images(source_dir, dest_dir, percentage, output_format, qualit
 
         try:
             img_path = os.path.join(source_dir, filename)
-            img = Image.open(img_path)
+            instrument.count('bytes_read', os.path.getsize(img_path))
+            with instrument.stage("decode + resize"):
+                img = Image.open(img_path)
 
-            new_size = (int(img.width * percentage), int(img.height * percentage))
-            img = img.resize(new_size, Image.LANCZOS)
+                new_size = (int(img.width * percentage), int(img.height * percentage))
+                img = img.resize(new_size, Image.LANCZOS)
 
             base_name = os.path.splitext(filename)[0]
             output_filename = f"{base_name}.{output_format.lower()}"
@@ -30,10 +37,12 @@ def batch_process_images(source_dir, dest_dir, percentage, output_format, qualit
                 output_filename = f"{base_name}({counter}).{output_format.lower()}"
                 output_path = os.path.join(dest_dir, output_filename)
 
-            if output_format.lower() in ['jpeg', 'webp']:
-                img.save(output_path, quality=quality, optimize=True)
-            else:
-                img.save(output_path)
+            with instrument.stage("encode"):
+                if output_format.lower() in ['jpeg', 'webp']:
+                    img.save(output_path, quality=quality, optimize=True)
+                else:
+                    img.save(output_path)
+            instrument.count('bytes_written', os.path.getsize(output_path))
         except Exception as e:
             print(f"Error processing {filename}: {e}")
     return total_files
@@ -41,16 +50,80 @@ def batch_process_images(source_dir, dest_dir, percentage, output_format, qualit
 # --- SPLITTER LOGIC ---
 def get_image_files_in_directory(dir_path):
     supported_formats = [".png", ".jpg", ".jpeg", ".gif", ".bmp"]
-    image_files = []
-    for root, _, files in os.walk(dir_path):
-        for filename in files:
-            if any(filename.lower().endswith(fmt) for fmt in supported_formats):
-                image_files.append(os.path.join(root, filename))
-    return image_files
-
-def split_image_into_grid(image_path, tile_size=None, grid_size=None):
+    return file_index.find_files(dir_path, supported_formats)
+
+TILE_OUTPUT_MODES = ("files", "atlas", "tileset")
+
+def _has_alpha(img):
+    return img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info
+
+def _cut_tile(img, x, y, tile_width, tile_height, pad=True):
+    """Crops one tile as RGBA; edge tiles are padded with transparency to the full tile size."""
+    from PIL import Image
+    box = (x, y, min(x + tile_width, img.width), min(y + tile_height, img.height))
+    tile = img.crop(box).convert('RGBA')
+    if pad and tile.size != (tile_width, tile_height):
+        padded = Image.new('RGBA', (tile_width, tile_height), (0, 0, 0, 0))
+        padded.paste(tile, (0, 0))
+        tile = padded
+    return tile
+
+def _cut_tile_row(img, y, tile_width, tile_height, check_empty, save_dir=None, compress_level=6):
+    """
+    Worker: cuts one row of tiles. Tiles are saved straight away when 'save_dir'
+    is set, otherwise (x, digest, tile) is returned for deduplication.
+    """
+    results = []
+    for x in range(0, img.width, tile_width):
+        tile = _cut_tile(img, x, y, tile_width, tile_height)
+
+        # A tile is empty when its alpha never rises above 0
+        if check_empty and tile.getchannel('A').getextrema()[1] == 0:
+            continue
+
+        if save_dir:
+            tile.save(os.path.join(save_dir, f"tile_{x}_{y}.png"), compress_level=compress_level)
+            instrument.count('tiles_written')
+            results.append((x, None, None))
+        else:
+            digest = hashlib.blake2b(tile.tobytes(), digest_size=16).digest()
+            results.append((x, digest, tile))
+    return results
+
+def _write_atlas(output_dir, tiles, tile_width, tile_height, index):
+    """Packs the unique tiles into a square-ish atlas.png and writes atlas.json."""
+    from PIL import Image
+    columns = max(1, math.ceil(math.sqrt(len(tiles))))
+    rows = max(1, math.ceil(len(tiles) / columns))
+    atlas = Image.new('RGBA', (columns * tile_width, rows * tile_height), (0, 0, 0, 0))
+
+    rects = []
+    for i, tile in enumerate(tiles):
+        ax, ay = (i % columns) * tile_width, (i // columns) * tile_height
+        atlas.paste(tile, (ax, ay))
+        rects.append([ax, ay, tile_width, tile_height])
+
+    atlas.save(os.path.join(output_dir, "atlas.png"))
+    index["atlas"] = "atlas.png"
+    index["tiles"] = rects
+    with open(os.path.join(output_dir, "atlas.json"), 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+
+def split_image_into_grid(image_path, tile_size=None, grid_size=None, output_mode="files", skip_empty=True, workers=None, compress_level=6):
+    """
+    Cuts an image into tiles, one row of tiles per worker thread.
+    output_mode: 'files'   - one tile_<x>_<y>.png per non-empty tile
+                 'atlas'   - unique tiles packed into atlas.png + atlas.json index
+                 'tileset' - unique tiles saved once + tileset.json placement map
+    The source stays decoded in its own mode; only one tile per worker is RGBA at a time.
+    """
+    from PIL import Image
     try:
-        with Image.open(image_path).convert("RGBA") as img:
+        if output_mode not in TILE_OUTPUT_MODES:
+            raise ValueError(f"Unknown output mode '{output_mode}'.")
+
+        with Image.open(image_path) as img:
+            img.load()
             img_width, img_height = img.size
 
             if grid_size:
@@ -68,111 +141,434 @@ def split_image_into_grid(image_path, tile_size=None, grid_size=None):
             image_name = os.path.splitext(os.path.basename(image_path))[0]
             output_dir = os.path.join(os.path.dirname(image_path), f"output_tiles_{image_name}")
             os.makedirs(output_dir, exist_ok=True)
-            
-            for y in range(0, img_height, tile_height):
-                for x in range(0, img_width, tile_width):
-                    left, upper = x, y
-                    right, lower = x + tile_width, y + tile_height
-                    tile = img.crop((left, upper, right, lower))
-
-                    if tile.getbbox():
-                        tile_name = f"tile_{x}_{y}.png"
-                        tile.save(os.path.join(output_dir, tile_name))
+
+            # Opaque sources can never produce an empty tile
+            check_empty = skip_empty and _has_alpha(img)
+            save_dir = output_dir if output_mode == "files" else None
+
+            unique = {}        # digest -> unique tile index
+            unique_tiles = []  # Kept in memory for the atlas only
+            placements = []    # [x, y, unique tile index]
+
+            def collect(y, row):
+                for x, digest, tile in row:
+                    if digest is None:
+                        continue
+                    if digest not in unique:
+                        unique[digest] = len(unique)
+                        if output_mode == "tileset":
+                            tile.save(os.path.join(output_dir, f"tile_{unique[digest]:05d}.png"), compress_level=compress_level)
+                        else:
+                            unique_tiles.append(tile)
+                    placements.append([x, y, unique[digest]])
+
+            workers = workers or os.cpu_count() or 1
+            cut_row = instrument.propagate(_cut_tile_row)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # Keep only a few rows in flight so finished tiles never pile up in memory
+                pending = deque()
+                for y in range(0, img_height, tile_height):
+                    pending.append((y, executor.submit(cut_row, img, y, tile_width, tile_height, check_empty, save_dir, compress_level)))
+                    if len(pending) >= workers * 2:
+                        row_y, future = pending.popleft()
+                        collect(row_y, future.result())
+                while pending:
+                    row_y, future = pending.popleft()
+                    collect(row_y, future.result())
+
+            index = {"source": os.path.basename(image_path), "image_size": [img_width, img_height],
+                     "tile_size": [tile_width, tile_height], "placements": placements}
+            if output_mode == "tileset":
+                index["tiles"] = [f"tile_{i:05d}.png" for i in range(len(unique))]
+                with open(os.path.join(output_dir, "tileset.json"), 'w', encoding='utf-8') as f:
+                    json.dump(index, f)
+            elif output_mode == "atlas":
+                _write_atlas(output_dir, unique_tiles, tile_width, tile_height, index)
             return True
     except Exception as e:
         print(f"Error splitting '{os.path.basename(image_path)}': {e}")
         return False
 
+# --- PYRAMID LOGIC ---
+PYRAMID_LAYOUTS = ("dzi", "xyz")
+
+def _pyramid_level_sizes(width, height):
+    """Image size at every Deep Zoom level; index 0 is 1x1, the last is full size."""
+    sizes = [(width, height)]
+    while sizes[-1] != (1, 1):
+        w, h = sizes[-1]
+        sizes.append((max(1, math.ceil(w / 2)), max(1, math.ceil(h / 2))))
+    sizes.reverse()
+    return sizes
+
+def _save_pyramid_tile(tile, path, tile_format, quality):
+    """Writes through a temp file so an interrupted run never leaves a truncated tile behind."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{threading.get_ident()}.tmp"
+    if tile_format == "jpg":
+        tile.convert('RGB').save(temp_path, "JPEG", quality=quality)
+    else:
+        tile.save(temp_path, "PNG")
+    os.replace(temp_path, path)
+    instrument.count('tiles_written')
+
+def _pyramid_source_row(img, row, tile_size, tile_path, tile_format, quality):
+    """Worker: cuts one row of full-resolution tiles that are not on disk yet."""
+    y = row * tile_size
+    for col in range(math.ceil(img.width / tile_size)):
+        path = tile_path(col, row)
+        if not os.path.exists(path):
+            tile = _cut_tile(img, col * tile_size, y, tile_size, tile_size, pad=False)
+            _save_pyramid_tile(tile, path, tile_format, quality)
+
+def _pyramid_reduce_row(row, upper_size, tile_size, upper_path, tile_path, tile_format, quality):
+    """Worker: builds one row of a level by 2x2-downsampling the tiles of the level above."""
+    from PIL import Image
+    upper_width, upper_height = upper_size
+    upper_cols = math.ceil(upper_width / tile_size)
+    upper_rows = math.ceil(upper_height / tile_size)
+    canvas_mode = 'RGB' if tile_format == "jpg" else 'RGBA'
+
+    for col in range(math.ceil(math.ceil(upper_width / 2) / tile_size)):
+        path = tile_path(col, row)
+        if os.path.exists(path):
+            continue
+
+        x0, y0 = 2 * col * tile_size, 2 * row * tile_size
+        canvas = Image.new(canvas_mode, (min(2 * tile_size, upper_width - x0), min(2 * tile_size, upper_height - y0)))
+        for dy in (0, 1):
+            for dx in (0, 1):
+                child_col, child_row = 2 * col + dx, 2 * row + dy
+                if child_col < upper_cols and child_row < upper_rows:
+                    with Image.open(upper_path(child_col, child_row)) as child:
+                        canvas.paste(child.convert(canvas_mode), (dx * tile_size, dy * tile_size))
+
+        # reduce() rounds odd sizes up, matching ceil(size / 2) of the level below
+        _save_pyramid_tile(canvas.reduce(2), path, tile_format, quality)
+
+def _import_pil_unlimited():
+    """
+    Imports Pillow with the decompression-bomb limit off: large scans are the
+    whole point of the pyramid tiler. The limit is process-wide, so it is
+    only ever lifted, never restored, and jobs running alongside never see it
+    switch back and forth.
+    """
+    from PIL import Image
+    Image.MAX_IMAGE_PIXELS = None
+    return Image
+
+def generate_image_pyramid(image_path, output_dir=None, tile_size=256, layout="dzi", tile_format="png", quality=90, workers=None, progress_callback=None):
+    """
+    Builds a multi-resolution tile pyramid for web viewers.
+    layout: 'dzi' - <name>.dzi + <name>_files/<level>/<col>_<row>.<ext> (Deep Zoom, levels down to 1x1)
+            'xyz' - <name>_tiles/<z>/<x>/<y>.<ext> + metadata.json (z=0 is the first level that fits in one tile)
+    Only the full-resolution level reads the source; every lower level is made by
+    2x2-downsampling the tiles above it. Tiles already on disk are skipped, so an
+    interrupted run resumes where it stopped (and skips decoding the source if the
+    top level is complete).
+    progress_callback: function(levels_done, total_levels, message)
+    Returns: (success_boolean, message_string)
+    """
+    Image = _import_pil_unlimited()
+    if layout not in PYRAMID_LAYOUTS:
+        return False, f"Unknown pyramid layout '{layout}'."
+    if tile_format not in ("png", "jpg"):
+        return False, f"Unknown tile format '{tile_format}'."
+    if not os.path.isfile(image_path):
+        return False, "Invalid image file."
+
+    image_name = os.path.splitext(os.path.basename(image_path))[0]
+    output_dir = output_dir or os.path.dirname(image_path)
+
+    try:
+        with Image.open(image_path) as img:
+            width, height = img.size  # Header only, no decode yet
+    except Exception as e:
+        return False, f"Pyramid Error: {e}"
+
+    sizes = _pyramid_level_sizes(width, height)
+    max_level = len(sizes) - 1
+    if layout == "dzi":
+        min_level = 0
+        tiles_root = os.path.join(output_dir, f"{image_name}_files")
+        level_path = lambda level: (lambda col, row: os.path.join(tiles_root, str(level), f"{col}_{row}.{tile_format}"))
+    else:
+        min_level = max(level for level, (w, h) in enumerate(sizes) if w <= tile_size and h <= tile_size)
+        tiles_root = os.path.join(output_dir, f"{image_name}_tiles")
+        level_path = lambda level: (lambda col, row: os.path.join(tiles_root, str(level - min_level), str(col), f"{row}.{tile_format}"))
+
+    total_levels = max_level - min_level + 1
+    workers = workers or os.cpu_count() or 1
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Full resolution, straight from the source
+            top_path = level_path(max_level)
+            top_rows = range(math.ceil(height / tile_size))
+            top_cols = range(math.ceil(width / tile_size))
+            if progress_callback:
+                progress_callback(0, total_levels, f"Cutting level {max_level} ({width}x{height})")
+
+            if not all(os.path.exists(top_path(c, r)) for r in top_rows for c in top_cols):
+                with Image.open(image_path) as img:
+                    img.load()
+                    list(executor.map(instrument.propagate(lambda r: _pyramid_source_row(img, r, tile_size, top_path, tile_format, quality)), top_rows))
+
+            # Every lower level from the one above it
+            for done, level in enumerate(range(max_level - 1, min_level - 1, -1), start=1):
+                if progress_callback:
+                    progress_callback(done, total_levels, f"Building level {level} ({sizes[level][0]}x{sizes[level][1]})")
+                rows = range(math.ceil(sizes[level][1] / tile_size))
+                upper_path, this_path = level_path(level + 1), level_path(level)
+                list(executor.map(instrument.propagate(lambda r: _pyramid_reduce_row(r, sizes[level + 1], tile_size, upper_path, this_path, tile_format, quality)), rows))
+    except Exception as e:
+        return False, f"Pyramid Error: {e}. Run again to resume."
+
+    if layout == "dzi":
+        descriptor = os.path.join(output_dir, f"{image_name}.dzi")
+        with open(descriptor, 'w', encoding='utf-8') as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                    f'<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" Format="{tile_format}" Overlap="0" TileSize="{tile_size}">'
+                    f'<Size Width="{width}" Height="{height}"/></Image>\n')
+    else:
+        descriptor = os.path.join(tiles_root, "metadata.json")
+        with open(descriptor, 'w', encoding='utf-8') as f:
+            json.dump({"width": width, "height": height, "tile_size": tile_size, "format": tile_format,
+                       "min_zoom": 0, "max_zoom": max_level - min_level}, f)
+
+    if progress_callback:
+        progress_callback(total_levels, total_levels, "Done!")
+    return True, f"Pyramid with {total_levels} levels saved to: {descriptor}"
+
 # --- GIF LOGIC ---
-def extract_gif_frames(input_path, output_dir, is_single_file, progress_callback=None):
+def _diff_bbox(previous, current):
+    """Bounding box of the pixels (colour or alpha) that changed between two RGBA frames."""
+    from PIL import ImageChops
+    boxes = [band.getbbox() for band in ImageChops.difference(previous, current).split()]
+    boxes = [b for b in boxes if b]
+    if not boxes:
+        return None
+    return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+            max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+def _extract_single_gif(gif_path, output_dir, skip_duplicates=False, delta_frames=False, compress_level=6, frame_callback=None):
+    """
+    Extracts the frames of one GIF. Runs in a worker process for folder jobs.
+    skip_duplicates: frames whose pixels hash the same as an earlier frame are not written.
+    delta_frames: after the first frame, only the region that changed is written.
+    A '<name>_manifest.json' (index, file, bbox, delay, duplicate_of) is written
+    whenever either option is on, so the animation can be rebuilt.
+    Returns: (frames_written, error_message_or_None)
+    """
+    from PIL import Image
+    gif_base = os.path.splitext(os.path.basename(gif_path))[0]
+    frames_written = 0
+    manifest = []
+    seen_hashes = {}
+    previous = None
+
+    try:
+        with Image.open(gif_path) as im:
+            total_frames_in_gif = getattr(im, 'n_frames', 1)
+            for i in range(total_frames_in_gif):
+                im.seek(i)
+                entry = {"index": i, "file": None, "bbox": [0, 0, im.width, im.height],
+                         "delay": im.info.get('duration', 0), "duplicate_of": None}
+
+                if skip_duplicates or delta_frames:
+                    frame = im.convert('RGBA')
+                else:
+                    frame = im
+
+                if skip_duplicates:
+                    digest = hashlib.blake2b(frame.tobytes(), digest_size=16).digest()
+                    entry["duplicate_of"] = seen_hashes.get(digest)
+
+                to_save = frame
+                if entry["duplicate_of"] is None and delta_frames and previous is not None:
+                    bbox = _diff_bbox(previous, frame)
+                    if bbox is None:
+                        # Same as the previous frame: point at the file that frame actually reuses
+                        previous_entry = manifest[-1]
+                        entry["duplicate_of"] = previous_entry["duplicate_of"] if previous_entry["duplicate_of"] is not None else i - 1
+                    else:
+                        entry["bbox"] = list(bbox)
+                        to_save = frame.crop(bbox)
+
+                if entry["duplicate_of"] is None:
+                    frame_filename = f"{gif_base}_frame_{i:04d}.png"
+                    to_save.save(os.path.join(output_dir, frame_filename), compress_level=compress_level)
+                    entry["file"] = frame_filename
+                    frames_written += 1
+                    # Only full frames can stand in for a later duplicate, never a delta crop
+                    if skip_duplicates and to_save is frame:
+                        seen_hashes.setdefault(digest, i)
+
+                if delta_frames:
+                    previous = frame
+                manifest.append(entry)
+
+                if frame_callback:
+                    frame_callback(i + 1, total_frames_in_gif)
+
+        if skip_duplicates or delta_frames:
+            with open(os.path.join(output_dir, f"{gif_base}_manifest.json"), 'w', encoding='utf-8') as f:
+                json.dump({"source": os.path.basename(gif_path), "size": [im.width, im.height], "frames": manifest}, f, indent=1)
+
+        return frames_written, None
+    except Exception as e:
+        return frames_written, f"Error extracting frames from {gif_path}: {e}"
+
+def extract_gif_frames(input_path, output_dir, is_single_file, progress_callback=None, workers=None, skip_duplicates=False, delta_frames=False, compress_level=6, separate_folders=False):
+    """
+    Extracts GIF frames to PNG. Folders of GIFs are spread over a process pool.
+    compress_level: PNG zlib level (0-9); 1 keeps big jobs I/O-bound instead of zlib-bound.
+    separate_folders: write each GIF's frames to output_dir/<gif name>/.
+    progress_callback: function(gif_index, total_gifs, gif_filename, frame, total_frames)
+    """
     extracted_frames_count = 0
     gif_paths = []
 
     if is_single_file:
         gif_paths = [input_path]
     else:
-        for root, _, files in os.walk(input_path):
-            for f in files:
-                if f.lower().endswith('.gif'):
-                    gif_paths.append(os.path.join(root, f))
-    
+        gif_paths = file_index.find_files(input_path, ['.gif'])
+
+    def target_dir(gif_path):
+        if not separate_folders:
+            return output_dir
+        folder = os.path.join(output_dir, os.path.splitext(os.path.basename(gif_path))[0])
+        os.makedirs(folder, exist_ok=True)
+        return folder
+
+    options = (skip_duplicates, delta_frames, compress_level)
     total_gifs = len(gif_paths)
-    for idx, gif_path in enumerate(gif_paths):
-        try:
+    workers = workers or os.cpu_count() or 1
+
+    if total_gifs <= 1 or workers == 1:
+        # In-process: keeps per-frame progress reporting
+        for idx, gif_path in enumerate(gif_paths):
             gif_filename = os.path.basename(gif_path)
-            with Image.open(gif_path) as im:
-                total_frames_in_gif = im.n_frames
-                for i in range(total_frames_in_gif):
-                    im.seek(i)
-                    frame_filename = f"{os.path.splitext(gif_filename)[0]}_frame_{i:04d}.png"
-                    frame_path = os.path.join(output_dir, frame_filename)
-                    im.save(frame_path)
-                    extracted_frames_count += 1
-                    if progress_callback:
-                        progress_callback(idx + 1, total_gifs, gif_filename, i + 1, total_frames_in_gif)
-        except Exception as e:
-            print(f"Error extracting frames from {gif_path}: {e}")
+            cb = None
+            if progress_callback:
+                cb = lambda frame, total, idx=idx, name=gif_filename: progress_callback(idx + 1, total_gifs, name, frame, total)
+            count, error = _extract_single_gif(gif_path, target_dir(gif_path), *options, frame_callback=cb)
+            extracted_frames_count += count
+            if error:
+                print(error)
+        return extracted_frames_count
+
+    with ProcessPoolExecutor(max_workers=min(workers, total_gifs)) as executor:
+        futures = {executor.submit(_extract_single_gif, path, target_dir(path), *options): path for path in gif_paths}
+        for done, future in enumerate(as_completed(futures), start=1):
+            count, error = future.result()
+            extracted_frames_count += count
+            if error:
+                print(error)
+            if progress_callback:
+                progress_callback(done, total_gifs, os.path.basename(futures[future]), count, count)
 
     return extracted_frames_count
 
 # --- SORTER LOGIC ---
+UNIQUE_NAME_FORMAT = "{base}({counter}){ext}"
+
 def scan_extensions(source_dir):
+    if file_index.enabled():
+        # Listing extensions tolerates a view up to SCAN_MAX_AGE old; the sorts themselves always refresh
+        index = file_index.get_index()
+        index.refresh(source_dir, max_age=file_index.SCAN_MAX_AGE)
+        return sorted(ext or "no_extension" for ext in index.extensions(source_dir))
     unique_extensions = set()
-    for root, _, files in os.walk(source_dir):
-        for file_name in files:
-            _, file_extension = os.path.splitext(file_name)
-            file_extension = file_extension.lstrip('.').lower()
-            if not file_extension:
-                unique_extensions.add("no_extension")
-            else:
-                unique_extensions.add(file_extension)
+    for _, file_name in _walk_files(source_dir, set()):
+        unique_extensions.add(_extension_key(file_name))
     return sorted(list(unique_extensions))
 
-def sort_files(source_dir, selected_ext, progress_callback=None):
-    if selected_ext == "no_extension":
-        destination_folder_name = "no_extension"
-    else:
-        destination_folder_name = f"{selected_ext}_files"
-    destination_folder = os.path.join(source_dir, destination_folder_name)
+def _extension_key(file_name):
+    _, file_extension = os.path.splitext(file_name)
+    return file_extension.lstrip('.').lower() or "no_extension"
 
-    os.makedirs(destination_folder, exist_ok=True)
+def _destination_folder_name(ext):
+    return "no_extension" if ext == "no_extension" else f"{ext}_files"
 
-    files_to_move_info = []
-    for root, _, files in os.walk(source_dir):
-        if os.path.abspath(root) == os.path.abspath(destination_folder):
-            continue
-        for file_name in files:
-            full_original_path = os.path.join(root, file_name)
-            _, file_extension = os.path.splitext(file_name)
-            file_extension = file_extension.lstrip('.').lower()
-
-            if (selected_ext == "no_extension" and not file_extension) or \
-               (selected_ext != "no_extension" and file_extension == selected_ext):
-                files_to_move_info.append((full_original_path, file_name))
-    
-    total_files = len(files_to_move_info)
-    moved_count = 0
-    skipped_count = 0
-    
-    for i, (original_full_path, file_name_only) in enumerate(files_to_move_info):
-        if progress_callback:
-            progress_callback(i + 1, total_files, file_name_only)
-        
+def _walk_files(source_dir, skip_dirs):
+    """Yields (full_path, file_name) for every file below source_dir using os.scandir (or the file index)."""
+    if file_index.enabled():
+        for root, dirs, files in file_index.walk(source_dir):
+            dirs[:] = [d for d in dirs if os.path.abspath(os.path.join(root, d)) not in skip_dirs]
+            instrument.count('files_scanned', len(files))
+            for file_name in files:
+                yield os.path.join(root, file_name), file_name
+        return
+    stack = [source_dir]
+    while stack:
+        current = stack.pop()
+        files = 0
         try:
-            unique_filename = _get_unique_filename(destination_folder, file_name_only)
-            destination_path = os.path.join(destination_folder, unique_filename)
-            shutil.move(original_full_path, destination_path)
-            moved_count += 1
-        except Exception:
-            skipped_count += 1
-    
-    return moved_count, skipped_count
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        # Like os.walk: links to folders are folders, but are not followed
+                        if not entry.is_symlink() and os.path.abspath(entry.path) not in skip_dirs:
+                            stack.append(entry.path)
+                    else:
+                        files += 1
+                        yield entry.path, entry.name
+            # Counted per folder, not per file, to keep the walk loop lean
+            instrument.count('files_scanned', files)
+        except OSError as e:
+            print(f"Scan Error {current}: {e}")
+
+def plan_sort_files(source_dir, selected_exts):
+    """
+    Planning half of sort_files_by_extensions: one walk of the tree, files
+    bucketed by extension, unique destination names resolved in memory.
+    Nothing on disk is changed. Returns a MovePlan.
+    """
+    selected = {ext.lstrip('.').lower() for ext in selected_exts}
+    destinations = {ext: os.path.join(source_dir, _destination_folder_name(ext)) for ext in selected}
+    skip_dirs = {os.path.abspath(folder) for folder in destinations.values()}
+
+    # 1. One traversal, bucketed by extension
+    buckets = {ext: [] for ext in selected}
+    for full_path, file_name in _walk_files(source_dir, skip_dirs):
+        ext = _extension_key(file_name)
+        if ext in buckets:
+            buckets[ext].append((full_path, file_name))
+
+    # 2. Unique destinations per bucket
+    plan = move_plan.MovePlan("sort_files", source_dir)
+    names = file_mover.NameIndex()
+    for ext in sorted(buckets):
+        destination_folder = destinations[ext]
+        for original_full_path, file_name_only in buckets[ext]:
+            unique_filename = names.claim(destination_folder, file_name_only, UNIQUE_NAME_FORMAT)
+            plan.add(original_full_path, os.path.join(destination_folder, unique_filename), f"extension {ext}")
+    return plan
+
+def sort_files_by_extensions(source_dir, selected_exts, progress_callback=None, workers=None):
+    """
+    Moves every file whose extension is in 'selected_exts' into '<ext>_files'
+    (or 'no_extension') under source_dir, using a single walk of the tree.
+    Cross-device moves are copied in parallel by file_mover ('workers' copies).
+    Returns: (moved_count, skipped_count, per_extension) where per_extension
+    maps each extension to {'moved': n, 'skipped': n}.
+    """
+    plan = plan_sort_files(source_dir, selected_exts)
+    stats = plan.execute(workers=workers, progress_callback=progress_callback)
 
-def _get_unique_filename(destination_folder, original_filename):
-    base_name, extension = os.path.splitext(original_filename)
-    counter = 0
-    new_filename = original_filename
-    while os.path.exists(os.path.join(destination_folder, new_filename)):
-        counter += 1
-        new_filename = f"{base_name}({counter}){extension}"
-    return new_filename
\ No newline at end of file
+    per_extension = {ext.lstrip('.').lower(): {'moved': 0, 'skipped': 0} for ext in selected_exts}
+    failed = {src for src, _, _ in stats['failed']}
+    for src in plan.sources:
+        per_extension[_extension_key(src)]['skipped' if src in failed else 'moved'] += 1
+
+    skipped_count = len(stats['failed'])
+    return len(plan) - skipped_count, skipped_count, per_extension
+
+def sort_files(source_dir, selected_ext, progress_callback=None):
+    moved_count, skipped_count, _ = sort_files_by_extensions(source_dir, [selected_ext], progress_callback)
+    return moved_count, skipped_count
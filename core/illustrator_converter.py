@@ -1,5 +1,6 @@
 import os
 import shutil
+from core import file_index
 try:
     import win32com.client
     import pythoncom  # Required for threading
@@ -44,11 +45,7 @@ def batch_convert_to_svg(source_dir, output_dir, archive_dir, progress_callback=
         ai_app.UserInteractionLevel = -1 # aiDontDisplayAlerts
         
         # Collect Files
-        ai_files = []
-        for root, _, files in os.walk(source_dir):
-            for f in files:
-                if f.lower().endswith('.ai'):
-                    ai_files.append(os.path.join(root, f))
+        ai_files = file_index.find_files(source_dir, ['.ai'])
         
         total_files = len(ai_files)
         if total_files == 0:
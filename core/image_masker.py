@@ -1,44 +1,118 @@
 import os
-from PIL import Image, ImageDraw
+import functools
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-def apply_mask(image_path, output_dir, mode="normal"):
+# Masks are reused across images of the same size (the common case for a folder);
+# only the last one is kept, so a worker holds at most one image plus its mask
+MASK_CACHE_SIZE = 1
+# Anti-aliased edges are drawn at up to 4x and box-filtered down
+SUPERSAMPLE = 4
+MAX_SUPERSAMPLE_PIXELS = 64000000
+
+@functools.lru_cache(maxsize=MASK_CACHE_SIZE)
+def get_mask(width, height, mode="normal", antialias=False):
+    """
+    Returns an 'L' ellipse mask (255 = Opaque, 0 = Transparent).
+    mode: 'normal' (Keep Center) or 'inverted' (Keep Outside)
+    The returned image is shared through the cache, so do not modify it.
+    """
+    from PIL import Image, ImageDraw
+    background, fill = (0, 255) if mode == "normal" else (255, 0)
+
+    scale = 1
+    if antialias:
+        # Stay below the pixel budget on very large images
+        scale = SUPERSAMPLE
+        while scale > 1 and width * height * scale * scale > MAX_SUPERSAMPLE_PIXELS:
+            scale -= 1
+
+    mask = Image.new('L', (width * scale, height * scale), background)
+    draw = ImageDraw.Draw(mask)
+    draw.ellipse((0, 0, width * scale, height * scale), fill=fill)
+
+    if scale > 1:
+        mask = mask.reduce(scale)
+    return mask
+
+def _apply_alpha(img, mask):
+    """Applies 'mask' to the alpha channel without allocating a second full-size canvas."""
+    from PIL import ImageChops
+    if img.mode in ('RGB', 'L'):
+        # No existing alpha: putalpha adds the band in place
+        img.putalpha(mask)
+        return img
+
+    if img.mode not in ('RGBA', 'LA'):
+        img = img.convert('RGBA')
+
+    # Keep pixels that were already transparent transparent
+    img.putalpha(ImageChops.multiply(img.getchannel('A'), mask))
+    return img
+
+def apply_mask(image_path, output_dir, mode="normal", antialias=False):
     """
     mode: 'normal' (Keep Center) or 'inverted' (Keep Outside)
+    antialias (bool): Smooth the ellipse edge by supersampling the mask.
     """
+    from PIL import Image
     try:
-        img = Image.open(image_path).convert("RGBA")
-        width, height = img.size
-        
-        # 0 = Transparent, 255 = Opaque
-        if mode == "normal":
-            # Start Black (Transparent), Draw White Circle (Opaque)
-            mask = Image.new('L', (width, height), 0) 
-            draw = ImageDraw.Draw(mask)
-            draw.ellipse((0, 0, width, height), fill=255)
-            
-            # Composite: Keep pixels where mask is white
-            result = Image.composite(img, Image.new("RGBA", img.size, (0,0,0,0)), mask)
-            
-        else: # inverted
-            # Start White (Opaque), Draw Black Circle (Transparent)
-            mask = Image.new('L', (width, height), 255)
-            draw = ImageDraw.Draw(mask)
-            draw.ellipse((0, 0, width, height), fill=0)
-            
-            # Apply directly to alpha channel
-            result = img.copy()
-            result.putalpha(mask)
-
-        # Save
-        base_name = os.path.basename(image_path)
-        name, _ = os.path.splitext(base_name)
-        suffix = "circular" if mode == "normal" else "inverted"
-        
-        output_filename = f"{name}_{suffix}.png"
-        output_path = os.path.join(output_dir, output_filename)
-        
-        result.save(output_path)
+        with Image.open(image_path) as img:
+            img.load()
+            mask = get_mask(img.width, img.height, mode, antialias)
+            result = _apply_alpha(img, mask)
+
+            # Save
+            base_name = os.path.basename(image_path)
+            name, _ = os.path.splitext(base_name)
+            suffix = "circular" if mode == "normal" else "inverted"
+
+            output_filename = f"{name}_{suffix}.png"
+            output_path = os.path.join(output_dir, output_filename)
+
+            result.save(output_path)
         return True
     except Exception as e:
         print(f"Mask Error {image_path}: {e}")
-        return False
\ No newline at end of file
+        return False
+
+def batch_apply_mask(image_paths, output_dir, mode="normal", antialias=False, workers=None, progress_callback=None, stop_event=None):
+    """
+    Masks many images on a process pool. Each worker holds one decoded image
+    (plus its cached mask) at a time.
+    Returns: (success_boolean, message_string)
+    """
+    total_files = len(image_paths)
+    if total_files == 0:
+        return False, "No images found to process."
+
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    success_count = 0
+    done = 0
+    stopped = False
+
+    with ProcessPoolExecutor(max_workers=min(workers, total_files)) as executor:
+        futures = {executor.submit(apply_mask, path, output_dir, mode, antialias): path for path in image_paths}
+
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            done += 1
+            if future.result():
+                success_count += 1
+
+            if progress_callback:
+                progress_callback(done, total_files, os.path.basename(futures[future]))
+
+            if stop_event and stop_event.is_set() and not stopped:
+                stopped = True
+                for pending in futures:
+                    pending.cancel()
+
+    if stopped:
+        return False, f"Masking stopped by user. {success_count} of {total_files} images were completed."
+
+    result_msg = f"Processed {success_count}/{total_files} images."
+    if success_count < total_files:
+        result_msg += f"\n{total_files - success_count} images failed (see console)."
+    return True, result_msg
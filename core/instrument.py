@@ -0,0 +1,291 @@
+import os
+import sys
+import time
+import threading
+import functools
+import contextvars
+from collections import Counter
+
+# Configuration defaults
+SAMPLE_INTERVAL = 0.005        # Seconds between stack samples while profiling
+SUMMARY_STAGES = 12            # Stages listed in a summary (slowest first)
+BYTE_COUNTERS = ('bytes_read', 'bytes_written')
+SECOND_COUNTERS = ('subprocess_wait',)
+
+# The Recorder collecting for the current job. Context variables follow the
+# job into threads started with propagate(); with no recorder active every
+# count() / stage() call is one ContextVar lookup and nothing else.
+_current = contextvars.ContextVar('instrument_recorder', default=None)
+_profiling = False
+
+def enable_profiling(enabled=True):
+    """Opt-in: jobs recorded from now on also write a cProfile dump and a folded-stack trace."""
+    global _profiling
+    _profiling = enabled
+
+def profiling_enabled():
+    return _profiling
+
+def default_profile_dir():
+    """Profile dumps live next to the move journals."""
+    from core import move_journal
+    return os.path.join(os.path.dirname(move_journal.default_journal_dir()), 'profiles')
+
+class Recorder(object):
+    """Per-stage wall time and named counters for one job."""
+
+    def __init__(self, name):
+        self.name = name
+        self.stages = {}            # stage -> [seconds, calls]
+        self.counters = Counter()
+        self.started = time.perf_counter()
+        self.elapsed = None
+        self.profile_paths = []
+        self._lock = threading.Lock()
+
+    def add_time(self, stage, seconds):
+        with self._lock:
+            entry = self.stages.get(stage)
+            if entry is None:
+                self.stages[stage] = [seconds, 1]
+            else:
+                entry[0] += seconds
+                entry[1] += 1
+
+    def add(self, counter, amount=1):
+        with self._lock:
+            self.counters[counter] += amount
+
+    def summary(self):
+        """Multi-line text: total time, slowest stages, counters."""
+        elapsed = self.elapsed if self.elapsed is not None else time.perf_counter() - self.started
+        lines = [f"{self.name}: {elapsed:.2f}s"]
+        with self._lock:
+            stages = sorted(self.stages.items(), key=lambda item: -item[1][0])
+            counters = sorted(self.counters.items())
+        for stage, (seconds, calls) in stages[:SUMMARY_STAGES]:
+            share = f" ({seconds / elapsed * 100:.0f}%)" if elapsed > 0 else ""
+            lines.append(f"  {stage}: {seconds:.2f}s{share}, {calls} call{'s' if calls != 1 else ''}")
+        if len(stages) > SUMMARY_STAGES:
+            lines.append(f"  ... and {len(stages) - SUMMARY_STAGES} more stages")
+        if counters:
+            lines.append("  " + ", ".join(f"{name}={_format_counter(name, value)}" for name, value in counters))
+        for path in self.profile_paths:
+            lines.append(f"  profile: {path}")
+        return "\n".join(lines)
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'elapsed': round(self.elapsed if self.elapsed is not None else time.perf_counter() - self.started, 4),
+                'stages': {stage: {'seconds': round(seconds, 4), 'calls': calls} for stage, (seconds, calls) in self.stages.items()},
+                'counters': dict(self.counters),
+                'profiles': list(self.profile_paths),
+            }
+
+def _format_counter(name, value):
+    if name in BYTE_COUNTERS:
+        return f"{value / (1024 * 1024):.1f}MB"
+    if name in SECOND_COUNTERS:
+        return f"{value:.2f}s"
+    return str(value)
+
+# --- RECORDING HOOKS (called from core) ---
+def count(counter, amount=1):
+    """Adds to a counter of the current job (no-op when nothing is recording)."""
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.add(counter, amount)
+
+class _Stage(object):
+    __slots__ = ('recorder', 'name', 'start')
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.recorder.add_time(self.name, time.perf_counter() - self.start)
+        return False
+
+class _NullStage(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+def stage(name):
+    """Context manager that adds its wall time to the named stage of the current job."""
+    recorder = _current.get()
+    if recorder is None:
+        return _NULL_STAGE
+    return _Stage(recorder, name)
+
+def timed(name):
+    """Decorator form of stage() for whole functions."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = _current.get()
+            if recorder is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                recorder.add_time(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+def add_time(name, seconds):
+    """Adds an already measured duration to a stage of the current job."""
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.add_time(name, seconds)
+
+class _Phases(object):
+    """Consecutive stages of one long function: next() closes the running stage and opens another."""
+    __slots__ = ('recorder', 'name', 'start')
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+        self.name = None
+
+    def next(self, name):
+        now = time.perf_counter()
+        if self.name is not None:
+            self.recorder.add_time(self.name, now - self.start)
+        self.name, self.start = name, now
+
+    def end(self):
+        self.next(None)
+
+class _NullPhases(object):
+    __slots__ = ()
+
+    def next(self, name):
+        pass
+
+    def end(self):
+        pass
+
+_NULL_PHASES = _NullPhases()
+
+def phases():
+    """Phase clock for the current job (no-op when nothing is recording)."""
+    recorder = _current.get()
+    if recorder is None:
+        return _NULL_PHASES
+    return _Phases(recorder)
+
+def propagate(func):
+    """Wraps func so it records into the current job when run on a pool thread."""
+    if _current.get() is None:
+        return func
+    return _bind(contextvars.copy_context(), func)
+
+def _bind(context, func):
+    def run(*args, **kwargs):
+        # A Context can only be entered by one thread at a time; give each call its own copy
+        return context.copy().run(func, *args, **kwargs)
+    return run
+
+# --- JOBS ---
+class _Sampler(threading.Thread):
+    """Samples every thread's Python stack; writes Brendan Gregg's folded format for flamegraph.pl / speedscope."""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        super().__init__(daemon=True, name="instrument-sampler")
+        self.interval = interval
+        self.stacks = Counter()
+        self._done = threading.Event()
+
+    def run(self):
+        own = threading.get_ident()
+        while not self._done.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(names))] += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, samples in self.stacks.most_common():
+                f.write(f"{stack} {samples}\n")
+
+class recording(object):
+    """
+    Records stages and counters for one job:
+        with instrument.recording("Merge PDFs") as rec:
+            ...
+        print(rec.summary())
+    With profiling enabled the calling thread runs under cProfile (.prof, for
+    pstats / snakeviz) and all threads are sampled into a .folded trace.
+    """
+
+    def __init__(self, name, profile=None):
+        self.recorder = Recorder(name)
+        self.profile = _profiling if profile is None else profile
+        self._token = None
+        self._profiler = None
+        self._sampler = None
+
+    def __enter__(self):
+        self._token = _current.set(self.recorder)
+        if self.profile:
+            import cProfile
+            self._sampler = _Sampler()
+            self._sampler.start()
+            self._profiler = cProfile.Profile()
+            try:
+                self._profiler.enable()
+            except ValueError:
+                # Another job is already under cProfile; this one still gets the sampled trace
+                self._profiler = None
+        return self.recorder
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._sampler:
+            if self._profiler:
+                self._profiler.disable()
+            self._sampler.stop()
+            self._dump()
+        _current.reset(self._token)
+        self.recorder.elapsed = time.perf_counter() - self.recorder.started
+        return False
+
+    def _dump(self):
+        try:
+            os.makedirs(default_profile_dir(), exist_ok=True)
+            safe_name = "".join(c if c.isalnum() else "_" for c in self.recorder.name)
+            stamp = time.strftime('%Y%m%d-%H%M%S') + f"{int(time.time() * 1000) % 1000:03d}"
+            base = os.path.join(default_profile_dir(), f"{stamp}_{safe_name}")
+            self._sampler.write(base + ".folded")
+            self.recorder.profile_paths = [base + ".folded"]
+            if self._profiler:
+                self._profiler.dump_stats(base + ".prof")
+                self.recorder.profile_paths.insert(0, base + ".prof")
+        except OSError as e:
+            print(f"Profile Dump Error: {e}")
+
+def current():
+    """The Recorder of the job running in this context, or None."""
+    return _current.get()
@@ -0,0 +1,346 @@
+import os
+import time
+import inspect
+import itertools
+import threading
+from core import instrument
+
+# Resource classes
+CPU = "cpu"     # Decoding, encoding, compressing: limited by cores
+IO = "io"       # Moving, copying, scanning, Illustrator automation: limited by disks
+
+# Priorities (lower runs first)
+HIGH = 0
+NORMAL = 1
+LOW = 2
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+PAUSED = "paused"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+# Configuration defaults
+DEFAULT_IO_JOBS = 2            # I/O-bound jobs running at once
+FINISHED_JOBS_KEPT = 50        # Finished jobs still listed by jobs()
+PROGRESS_NOTIFY_INTERVAL = 0.1 # Seconds between progress notifications per job
+
+class JobCancelled(BaseException):
+    """
+    Raised from a cancelled job's progress callback. A BaseException so the
+    per-file 'except Exception' handlers in core do not swallow it.
+    """
+
+class CancelToken(object):
+    """
+    Cancel and pause flags for one job. It can be passed wherever core takes
+    a stop_event: is_set() reports cancellation and, while the job is paused,
+    blocks until it is resumed or cancelled, so anything that polls its
+    stop_event between files can be paused as well.
+    """
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+
+    def cancel(self):
+        self._cancelled.set()
+        self._running.set()  # Wake a paused job so it can stop
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set() and not self.cancelled
+
+    def wait_if_paused(self):
+        self._running.wait()
+
+    # --- stop_event compatibility ---
+    def is_set(self):
+        self.wait_if_paused()
+        return self._cancelled.is_set()
+
+    def set(self):
+        self.cancel()
+
+class Job(object):
+    """One submitted operation and its state, as shown in the job queue."""
+
+    def __init__(self, job_id, name, func, args, kwargs, resource, workers, priority, on_done):
+        self.id = job_id
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.resource = resource
+        self.requested = workers
+        self.priority = priority
+        self.on_done = on_done
+        self.token = CancelToken()
+        self.state = QUEUED
+        self.workers = 0            # Workers granted from the budget while running
+        self.current = 0
+        self.total = 0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.stats = None           # instrument.Recorder with the job's stage timings and counters
+        self.summary = ""
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.done_event = threading.Event()
+        self._engine = None
+        self._last_notify = 0.0
+
+    @property
+    def stop_event(self):
+        return self.token
+
+    def progress(self, callback=None, raise_on_cancel=True):
+        """
+        Wraps a progress_callback for core functions. Each update records the
+        job's progress, waits while the job is paused and, once it is
+        cancelled, raises JobCancelled (pass raise_on_cancel=False when the
+        function also gets the stop_event and should stop on its own).
+        """
+        def wrapped(*args):
+            self.token.wait_if_paused()
+            if raise_on_cancel and self.token.cancelled:
+                raise JobCancelled()
+            self._record(args)
+            if callback:
+                callback(*args)
+        return wrapped
+
+    def _record(self, args):
+        if len(args) >= 3:
+            self.current, self.total, self.message = args[0], args[1], str(args[2])
+        elif args:
+            # (percent[, message]) style callbacks
+            self.current, self.total = args[0], 100
+            self.message = str(args[1]) if len(args) > 1 else self.message
+        now = time.monotonic()
+        if self._engine and now - self._last_notify >= PROGRESS_NOTIFY_INTERVAL:
+            self._last_notify = now
+            self._engine._notify(self)
+
+    def wait(self, timeout=None):
+        return self.done_event.wait(timeout)
+
+def _parameters(func):
+    try:
+        return inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return {}
+
+class JobEngine(object):
+    """
+    Central scheduler for every long-running operation. Jobs wait in a
+    priority queue until their resource class has budget: CPU jobs are
+    granted workers out of a global pool (os.cpu_count() by default) and get
+    them as their 'workers' argument; I/O jobs take one of a few I/O slots.
+    Each job runs on its own daemon thread with a CancelToken.
+    """
+
+    def __init__(self, cpu_workers=None, io_jobs=DEFAULT_IO_JOBS):
+        self.budget = {CPU: cpu_workers or os.cpu_count() or 1, IO: io_jobs}
+        self._free = dict(self.budget)
+        self._lock = threading.RLock()
+        self._queue = []
+        self._jobs = []
+        self._ids = itertools.count(1)
+        self._listeners = []
+
+    # --- SUBMISSION ---
+    def submit(self, name, func, *args, resource=CPU, workers=None, priority=NORMAL, on_done=None, **kwargs):
+        """
+        Queues func(*args, **kwargs). If func takes a 'job' argument it gets the
+        Job and wires up its own cancellation / progress; otherwise the
+        engine fills in 'stop_event', 'workers' (CPU jobs) and wraps
+        'progress_callback' / 'progress_cb' when func accepts them.
+        workers: CPU workers wanted (default: the whole budget).
+        on_done(job) runs on the job's thread when it finishes.
+        Returns the Job.
+        """
+        if resource not in self.budget:
+            raise ValueError(f"Unknown resource class '{resource}'.")
+        job = Job(next(self._ids), name, func, args, kwargs, resource, workers, priority, on_done)
+        job._engine = self
+        with self._lock:
+            self._jobs.append(job)
+            self._queue.append(job)
+        self._notify(job)
+        self._dispatch()
+        return job
+
+    def _dispatch(self):
+        """Starts queued jobs, highest priority first, while their resource class has budget."""
+        started = []
+        with self._lock:
+            for job in sorted(self._queue, key=lambda j: (j.priority, j.id)):
+                if job.token.paused or self._free[job.resource] < 1:
+                    continue
+                if job.resource == CPU:
+                    wanted = job.requested or self.budget[CPU]
+                    job.workers = max(1, min(wanted, self._free[CPU]))
+                else:
+                    job.workers = 1
+                self._free[job.resource] -= job.workers
+                self._queue.remove(job)
+                job.state = RUNNING
+                job.started = time.time()
+                started.append(job)
+        for job in started:
+            threading.Thread(target=self._run, args=(job,), daemon=True, name=f"job-{job.id}").start()
+            self._notify(job)
+
+    def _call_kwargs(self, job):
+        params = _parameters(job.func)
+        kwargs = dict(job.kwargs)
+        if 'job' in params:
+            kwargs['job'] = job
+            return kwargs
+        if 'stop_event' in params and kwargs.get('stop_event') is None:
+            kwargs['stop_event'] = job.token
+        if job.resource == CPU and 'workers' in params and kwargs.get('workers') is None:
+            kwargs['workers'] = job.workers
+        for name in ('progress_callback', 'progress_cb'):
+            if name in params:
+                kwargs[name] = job.progress(kwargs.get(name), raise_on_cancel='stop_event' not in params)
+        return kwargs
+
+    def _run(self, job):
+        recording = instrument.recording(job.name)
+        job.stats = recording.recorder
+        try:
+            with recording:
+                job.result = job.func(*job.args, **self._call_kwargs(job))
+            job.state = CANCELLED if job.token.cancelled else DONE
+        except JobCancelled:
+            job.state = CANCELLED
+        except Exception as e:
+            print(f"Job Error {job.name}: {e}")
+            job.error = str(e)
+            job.state = FAILED
+        finally:
+            job.finished = time.time()
+            job.summary = job.stats.summary()
+            print(f"Job {job.state}: {job.summary}")
+            with self._lock:
+                self._free[job.resource] += job.workers
+            self._finish(job)
+
+    def _finish(self, job):
+        with self._lock:
+            finished = [j for j in self._jobs if j.state in FINISHED_STATES]
+            for old in finished[:max(0, len(finished) - FINISHED_JOBS_KEPT)]:
+                self._jobs.remove(old)
+        job.done_event.set()
+        self._notify(job)
+        if job.on_done:
+            try:
+                job.on_done(job)
+            except Exception as e:
+                print(f"Job Callback Error {job.name}: {e}")
+        self._dispatch()
+
+    # --- CONTROL ---
+    def get(self, job_id):
+        """The Job with this id, or None once it has dropped out of the list."""
+        with self._lock:
+            for job in self._jobs:
+                if job.id == job_id:
+                    return job
+        return None
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is None or job.state in FINISHED_STATES:
+            return False
+        job.token.cancel()
+        with self._lock:
+            queued = job in self._queue
+            if queued:
+                self._queue.remove(job)
+                job.state = CANCELLED
+                job.finished = time.time()
+        if queued:
+            self._finish(job)
+        return True
+
+    def pause(self, job_id):
+        """Running jobs stop at their next progress update / stop_event check; queued jobs are held back."""
+        job = self.get(job_id)
+        if job is None or job.state in FINISHED_STATES:
+            return False
+        job.token.pause()
+        if job.state == RUNNING:
+            job.state = PAUSED
+        self._notify(job)
+        return True
+
+    def resume(self, job_id):
+        job = self.get(job_id)
+        if job is None or job.state in FINISHED_STATES:
+            return False
+        job.token.resume()
+        if job.state == PAUSED:
+            job.state = RUNNING
+        self._notify(job)
+        self._dispatch()
+        return True
+
+    # --- QUEUE VIEW ---
+    def jobs(self):
+        """Queued, running and recently finished jobs, oldest first."""
+        with self._lock:
+            return list(self._jobs)
+
+    def usage(self):
+        """{resource: (in_use, budget)}"""
+        with self._lock:
+            return {resource: (self.budget[resource] - self._free[resource], self.budget[resource]) for resource in self.budget}
+
+    def subscribe(self, listener):
+        """listener(job) is called from worker threads whenever a job changes state or reports progress."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _notify(self, job):
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(job)
+            except Exception as e:
+                print(f"Job Listener Error: {e}")
+
+_default_engine = None
+_default_lock = threading.Lock()
+
+def get_engine():
+    """The process-wide engine every tab submits to."""
+    global _default_engine
+    with _default_lock:
+        if _default_engine is None:
+            _default_engine = JobEngine()
+        return _default_engine
@@ -0,0 +1,361 @@
+import os
+import json
+import time
+from core import file_mover, instrument
+
+# Configuration defaults
+FSYNC_EVERY = 512          # Records buffered before a flush + fsync
+FSYNC_INTERVAL = 1.0       # ...or seconds, whichever comes first
+JOURNAL_EXT = ".jsonl"
+TAIL_BYTES = 4096          # Read from the end of a journal to find its last record
+FINISHED_JOURNALS_KEPT = 50  # Finished journals kept for undo; older ones are pruned
+
+def default_journal_dir():
+    """Per-user folder (LOCALAPPDATA on Windows, XDG/~/.local/state elsewhere)."""
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_STATE_HOME')
+    if not base:
+        base = os.path.join(os.path.expanduser('~'), '.local', 'state')
+    return os.path.join(base, 'FileManagementSuite', 'journals')
+
+class MoveJournal(object):
+    """
+    Append-only record of one sorting job: a 'begin' line, one 'plan' line per
+    move, then 'done' / 'fail' / 'undone' lines as moves are applied or rolled
+    back ('undo_fail' when the original path is taken), an 'end' line, and an
+    'undo_end' line after each undo. Writes are buffered and fsynced in
+    batches; the plan itself is fsynced before the first file moves.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        torn = _ends_mid_line(path)
+        self._file = open(path, 'a', encoding='utf-8')
+        if torn:
+            # Reopened after a crash mid-write: end the torn line so the next record stays readable
+            self._file.write("\n")
+        self._buffer = []
+        self._last_sync = time.monotonic()
+
+    @classmethod
+    def create(cls, job, root, copy=False, journal_dir=None):
+        journal_dir = journal_dir or default_journal_dir()
+        os.makedirs(journal_dir, exist_ok=True)
+        prune_journals(journal_dir)
+        stamp = time.strftime('%Y%m%d-%H%M%S') + f"{int(time.time() * 1000) % 1000:03d}"
+        name = f"{stamp}_{job}_{os.getpid()}{JOURNAL_EXT}"
+        journal = cls(os.path.join(journal_dir, name))
+        journal._write({'op': 'begin', 'job': job, 'root': os.path.abspath(root), 'copy': copy, 'time': time.time()})
+        return journal
+
+    def _write(self, record):
+        self._buffer.append(json.dumps(record, ensure_ascii=False))
+        if len(self._buffer) >= FSYNC_EVERY or time.monotonic() - self._last_sync >= FSYNC_INTERVAL:
+            self.commit()
+
+    def commit(self):
+        """Flushes buffered records and fsyncs them to disk."""
+        if self._buffer:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._buffer = []
+        with instrument.stage("journal fsync"):
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._last_sync = time.monotonic()
+
+    def plan(self, moves):
+        for index, (src, dst) in enumerate(moves):
+            self._write({'op': 'plan', 'i': index, 'src': src, 'dst': dst})
+        # Marks the plan as complete; nothing moves until this is on disk
+        self._write({'op': 'planned', 'count': len(moves)})
+        self.commit()
+
+    def record(self, index, ok, error=None):
+        """Result hook for file_mover.move_files."""
+        if ok:
+            self._write({'op': 'done', 'i': index})
+        else:
+            self._write({'op': 'fail', 'i': index, 'error': error})
+
+    def record_undo(self, index, ok, error=None):
+        if ok:
+            self._write({'op': 'undone', 'i': index})
+        else:
+            self._write({'op': 'undo_fail', 'i': index, 'error': error})
+
+    def record_undo_end(self, remaining, finished):
+        """Closes an undo run; prune_journals reads it from the tail to tell whether anything is left to undo."""
+        self._write({'op': 'undo_end', 'remaining': remaining, 'finished': finished})
+
+    def close(self, finished=True):
+        if finished:
+            self._buffer.append(json.dumps({'op': 'end', 'time': time.time()}))
+        self.commit()
+        self._file.close()
+
+def _ends_mid_line(path):
+    """True if the file is non-empty and its last byte is not a newline."""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return False
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+    except OSError:
+        return False
+
+def _read_last(path, tail_bytes=TAIL_BYTES):
+    """The last complete record of a journal, read from its tail only; {} if there is none."""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - tail_bytes))
+            lines = f.read().split(b"\n")
+    except OSError:
+        return {}
+    for line in reversed(lines):
+        try:
+            return json.loads(line)
+        except ValueError:
+            continue
+    return {}
+
+def load_journal(path):
+    """
+    Reads a journal back. A torn last line (crash mid-write) is ignored.
+    Returns a dict: job, root, copy, moves, planned, done, failed, undone, undo_failed, finished.
+    """
+    state = {'job': None, 'root': None, 'copy': False, 'moves': [], 'planned': False, 'done': set(),
+             'failed': {}, 'undone': set(), 'undo_failed': {}, 'finished': False, 'path': path}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            op = record.get('op')
+            if op == 'begin':
+                state['job'] = record['job']
+                state['root'] = record['root']
+                state['copy'] = record.get('copy', False)
+            elif op == 'plan':
+                state['moves'].append((record['src'], record['dst']))
+            elif op == 'planned':
+                state['planned'] = True
+            elif op == 'done':
+                state['done'].add(record['i'])
+                state['failed'].pop(record['i'], None)
+            elif op == 'fail':
+                state['failed'][record['i']] = record.get('error')
+            elif op == 'undone':
+                state['undone'].add(record['i'])
+                state['undo_failed'].pop(record['i'], None)
+            elif op == 'undo_fail':
+                state['undo_failed'][record['i']] = record.get('error')
+            elif op == 'end':
+                state['finished'] = True
+    return state
+
+def list_journals(journal_dir=None):
+    """Journal paths, newest first."""
+    journal_dir = journal_dir or default_journal_dir()
+    if not os.path.isdir(journal_dir):
+        return []
+    paths = [os.path.join(journal_dir, name) for name in os.listdir(journal_dir) if name.endswith(JOURNAL_EXT)]
+    return sorted(paths, reverse=True)
+
+def _read_begin(path):
+    """The 'begin' record (first line) of a journal, without reading the rest; {} if unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            record = json.loads(f.readline())
+    except (OSError, ValueError):
+        return {}
+    return record if record.get('op') == 'begin' else {}
+
+def find_unfinished(journal_dir=None, job=None, root=None):
+    """Newest journal whose job never reached its 'end' record, or None. Optionally limited to one job / root folder."""
+    for path in list_journals(journal_dir):
+        # Filter on the first line before parsing the whole journal
+        begin = _read_begin(path)
+        if job and begin.get('job') != job:
+            continue
+        if root and os.path.normcase(begin.get('root') or '') != os.path.normcase(os.path.abspath(root)):
+            continue
+        if not load_journal(path)['finished']:
+            return path
+    return None
+
+def _pending_undo(state):
+    """Applied moves not undone yet, leaving out those whose undo already failed (retry with undo_job(path))."""
+    return state['done'] - state['undone'] - set(state['undo_failed'])
+
+def find_undoable(journal_dir=None):
+    """Newest journal with applied moves that have not been undone, or None."""
+    for path in list_journals(journal_dir):
+        if _pending_undo(load_journal(path)):
+            return path
+    return None
+
+def prune_journals(journal_dir=None, keep=FINISHED_JOURNALS_KEPT):
+    """
+    Deletes finished journals that have nothing left to undo, and finished
+    journals beyond the newest 'keep'. Unfinished journals stay resumable.
+    Only each journal's last record is read ('end', or the 'undo_end' an undo
+    leaves), so this stays cheap however long the journals are.
+    Returns the number of journals deleted.
+    """
+    kept = removed = 0
+    for path in list_journals(journal_dir):
+        last = _read_last(path)
+        if last.get('op') == 'end':
+            pending = True
+        elif last.get('op') == 'undo_end' and last.get('finished'):
+            pending = last.get('remaining', 1) > 0
+        else:
+            continue  # Running, interrupted, or interrupted while undoing
+        if pending and kept < keep:
+            kept += 1
+            continue
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError as e:
+            print(f"Journal Prune Error {path}: {e}")
+    return removed
+
+# --- EXECUTION ---
+def run_moves(job, root, moves, copy=False, workers=None, progress_callback=None, stop_event=None, journal_dir=None):
+    """
+    Journals 'moves' (fsynced before anything is touched) and applies them
+    through file_mover. This is what every sorter calls.
+    Returns the file_mover stats dict, plus 'journal' (the journal path).
+    """
+    journal = MoveJournal.create(job, root, copy, journal_dir)
+    journal.plan(moves)
+    try:
+        stats = file_mover.move_files(moves, workers=workers, copy=copy, progress_callback=progress_callback,
+                                      stop_event=stop_event, on_result=journal.record)
+    except BaseException:
+        # Interrupted (e.g. Ctrl+C): leave the job resumable
+        journal.close(finished=False)
+        raise
+    # A stopped job stays 'unfinished' so it can be resumed
+    journal.close(finished=not stats['stopped'])
+    stats['journal'] = journal.path
+    return stats
+
+def resume_job(path, workers=None, progress_callback=None, stop_event=None):
+    """
+    Finishes an interrupted job from its journal without rescanning.
+    Moves whose 'done' record was lost in the crash are detected on disk
+    (source gone, destination present) and only recorded.
+    Returns: (success_boolean, message_string)
+    """
+    try:
+        state = load_journal(path)
+    except (OSError, ValueError) as e:
+        return False, f"Could not read journal: {e}"
+    if state['finished']:
+        return True, "This job already finished. Nothing to resume."
+    if not state['planned']:
+        # Interrupted while writing the plan, so no file was touched yet
+        MoveJournal(path).close()
+        return False, f"'{state['job']}' was interrupted before any files moved. Please run it again."
+
+    journal = MoveJournal(path)
+    remaining = []
+    indices = []
+    recovered = 0
+    for index, (src, dst) in enumerate(state['moves']):
+        if index in state['done']:
+            continue
+        if os.path.lexists(dst):
+            # Copies land through a temp file + rename, so a present destination is complete
+            if state['copy'] or not os.path.lexists(src):
+                journal.record(index, True)
+                recovered += 1
+            else:
+                journal.record(index, False, "Destination already exists")
+            continue
+        remaining.append((src, dst))
+        indices.append(index)
+
+    journal.commit()
+    try:
+        stats = file_mover.move_files(remaining, workers=workers, copy=state['copy'], progress_callback=progress_callback,
+                                      stop_event=stop_event, on_result=lambda i, ok, error=None: journal.record(indices[i], ok, error))
+    except BaseException:
+        journal.close(finished=False)
+        raise
+    journal.close(finished=not stats['stopped'])
+
+    msg = f"Resumed '{state['job']}': moved {stats['moved']} of {len(remaining)} remaining files."
+    if recovered:
+        msg += f"\n{recovered} moves had already completed before the interruption."
+    if stats['failed']:
+        msg += f"\n{len(stats['failed'])} files failed (see console)."
+    return True, msg
+
+def undo_job(path, workers=None, progress_callback=None, stop_event=None):
+    """
+    Rolls back every applied move in a journal, newest first. Copies are
+    undone by deleting the copy. A move whose original path has been taken
+    again by the time it is reversed is left in place and recorded as
+    'undo_fail' (checked atomically with the rename, so paths the job's own
+    moves vacate and refill are handled in order).
+    Returns: (success_boolean, message_string)
+    """
+    try:
+        state = load_journal(path)
+    except (OSError, ValueError) as e:
+        return False, f"Could not read journal: {e}"
+
+    indices = sorted(state['done'] - state['undone'], reverse=True)
+    if not indices:
+        return True, "Nothing to undo."
+
+    journal = MoveJournal(path)
+    undone = 0
+    blocked = []
+    if state['copy']:
+        for count, index in enumerate(indices):
+            dst = state['moves'][index][1]
+            try:
+                os.remove(dst)
+                journal.record_undo(index, True)
+                undone += 1
+            except OSError as e:
+                print(f"Undo Error {dst}: {e}")
+                journal.record_undo(index, False, str(e))
+            if progress_callback:
+                progress_callback(count + 1, len(indices), os.path.basename(dst))
+        failed = len(indices) - undone
+    else:
+        def on_result(i, ok, error=None):
+            journal.record_undo(indices[i], ok, error)
+            if not ok and os.path.lexists(state['moves'][indices[i]][0]):
+                blocked.append(indices[i])
+
+        # Never overwrite a file created at the original path since the move
+        reverse_moves = [(state['moves'][i][1], state['moves'][i][0]) for i in indices]
+        stats = file_mover.move_files(reverse_moves, workers=workers, progress_callback=progress_callback,
+                                      stop_event=stop_event, on_result=on_result, no_replace=True)
+        undone = stats['moved']
+        failed = len(stats['failed']) - len(blocked)
+    journal.record_undo_end(len(indices) - undone, state['finished'])
+    journal.close(finished=False)
+
+    # Remove destination folders the job created and the undo emptied
+    for folder in sorted({os.path.dirname(state['moves'][i][1]) for i in indices}, key=len, reverse=True):
+        try:
+            os.rmdir(folder)
+        except OSError:
+            pass
+
+    msg = f"Undid {undone} moves from '{state['job']}'."
+    if failed:
+        msg += f"\n{failed} files could not be restored (see console)."
+    if blocked:
+        msg += f"\n{len(blocked)} files were left in place because a file now exists at their original path."
+    return True, msg
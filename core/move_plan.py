@@ -0,0 +1,142 @@
+import os
+import time
+from array import array
+from collections import Counter
+from core import move_journal
+
+PLAN_EXT = ".tsv"
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+def _unescape(text):
+    out = []
+    chars = iter(text)
+    for char in chars:
+        if char == '\\':
+            nxt = next(chars, '')
+            out.append({'t': '\t', 'n': '\n'}.get(nxt, nxt))
+        else:
+            out.append(char)
+    return ''.join(out)
+
+def default_plan_dir():
+    """Saved dry-run plans live next to the move journals."""
+    return os.path.join(os.path.dirname(move_journal.default_journal_dir()), 'plans')
+
+class MovePlan(object):
+    """
+    The moves a sorter intends to make, computed without touching disk.
+    Stored column-wise (sources, destinations, reason ids) so a plan for
+    hundreds of thousands of files stays small; each distinct reason string
+    is kept once.
+    """
+
+    def __init__(self, job, root, copy=False):
+        self.job = job
+        self.root = os.path.abspath(root)
+        self.copy = copy
+        self.sources = []
+        self.destinations = []
+        self.reasons = []                 # Distinct reason strings
+        self._reason_ids = array('I')     # Per move: index into self.reasons
+        self._reason_lookup = {}
+
+    def add(self, src, dst, reason):
+        reason_id = self._reason_lookup.get(reason)
+        if reason_id is None:
+            reason_id = self._reason_lookup[reason] = len(self.reasons)
+            self.reasons.append(reason)
+        self.sources.append(src)
+        self.destinations.append(dst)
+        self._reason_ids.append(reason_id)
+
+    def __len__(self):
+        return len(self.sources)
+
+    def reason(self, index):
+        return self.reasons[self._reason_ids[index]]
+
+    def moves(self):
+        return list(zip(self.sources, self.destinations))
+
+    def rows(self):
+        for index in range(len(self.sources)):
+            yield self.sources[index], self.destinations[index], self.reason(index)
+
+    def counts(self):
+        """Number of moves per reason."""
+        counts = Counter(self._reason_ids)
+        return {self.reasons[reason_id]: count for reason_id, count in counts.items()}
+
+    def describe(self, limit=10, dry_run=True):
+        """
+        Human-readable summary: dry-run results, or (dry_run=False) a
+        confirmation before the plan is applied.
+        """
+        verb = "copy" if self.copy else "move"
+        if not self.sources:
+            return f"Dry run: nothing to {verb}." if dry_run else f"Nothing to {verb}."
+        lines = [f"Dry run: would {verb} {len(self)} files." if dry_run else f"This will {verb} {len(self)} files."]
+        for reason, count in sorted(self.counts().items(), key=lambda item: -item[1])[:limit]:
+            lines.append(f"  {count} x {reason}")
+        if len(self.reasons) > limit:
+            lines.append(f"  ... and {len(self.reasons) - limit} more groups")
+        return "\n".join(lines)
+
+    # --- PERSISTENCE ---
+    def save(self, path=None):
+        """Writes the plan as TSV (reason, source, destination). Returns the path."""
+        if path is None:
+            os.makedirs(default_plan_dir(), exist_ok=True)
+            stamp = time.strftime('%Y%m%d-%H%M%S') + f"{int(time.time() * 1000) % 1000:03d}"
+            path = os.path.join(default_plan_dir(), f"{stamp}_{self.job}{PLAN_EXT}")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(f"#job\t{self.job}\t{_escape(self.root)}\t{'copy' if self.copy else 'move'}\n")
+            for row in self.rows():
+                f.write("\t".join(_escape(field) for field in (row[2], row[0], row[1])) + "\n")
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        plan = None
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                fields = line.rstrip('\n').split('\t')
+                if plan is None:
+                    if len(fields) != 4 or fields[0] != "#job":
+                        raise ValueError("Not a move plan file.")
+                    plan = cls(fields[1], _unescape(fields[2]), fields[3] == "copy")
+                elif len(fields) == 3:
+                    reason, src, dst = (_unescape(field) for field in fields)
+                    plan.add(src, dst, reason)
+        if plan is None:
+            raise ValueError("Empty plan file.")
+        return plan
+
+    def diff(self, other):
+        """
+        Compares this plan with an earlier one, keyed by source path.
+        Returns a dict of 'added' / 'removed' source lists and 'changed'
+        (source, old destination, new destination) tuples.
+        """
+        old = dict(zip(other.sources, other.destinations))
+        new = dict(zip(self.sources, self.destinations))
+        return {
+            'added': [src for src in self.sources if src not in old],
+            'removed': [src for src in other.sources if src not in new],
+            'changed': [(src, old[src], dst) for src, dst in new.items() if src in old and old[src] != dst],
+        }
+
+    # --- EXECUTION ---
+    def execute(self, workers=None, progress_callback=None, stop_event=None):
+        """Applies the plan through the move journal. Returns the file_mover stats dict."""
+        return move_journal.run_moves(self.job, self.root, self.moves(), copy=self.copy, workers=workers,
+                                      progress_callback=progress_callback, stop_event=stop_event)
+
+def dry_run_result(plan):
+    """(success, message) for a sorter called with dry_run=True; the plan is saved for review."""
+    path = plan.save()
+    return True, f"{plan.describe()}\nFull plan saved to: {path}"
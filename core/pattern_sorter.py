@@ -1,93 +1,466 @@
 import os
 import re
-import shutil
+import zlib
+import operator
+from collections import Counter
+from core import file_mover, move_plan, instrument, file_index
 
-def sort_by_name_pattern(directory, pattern_regex, min_files=2, ignore_spaces=False, char_count=None):
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+# --- PREFILTER ANALYSIS ---
+# Patterns are inspected once so most filenames can be rejected with a
+# startswith / 'in' / first-character test before the regex engine runs.
+MAX_RANGE_CHARS = 512
+
+def _first_char_check(items):
     """
-    Sorts files based on a regex pattern.
-    Uses re.search() to find the pattern ANYWHERE in the filename.
+    Returns a predicate on one character that is True for every character
+    the pattern could start with, or None if that can't be cheaply decided.
     """
-    if not directory or not os.path.isdir(directory):
-        return False, "Invalid directory."
+    if not items:
+        return None
+    op, av = items[0]
+
+    if op == sre_parse.LITERAL:
+        char = chr(av)
+        return lambda c: c == char
 
+    if op == sre_parse.IN:
+        chars = set()
+        checks = []
+        for set_op, set_av in av:
+            if set_op == sre_parse.LITERAL:
+                chars.add(chr(set_av))
+            elif set_op == sre_parse.RANGE:
+                if set_av[1] - set_av[0] > MAX_RANGE_CHARS:
+                    return None
+                chars.update(chr(code) for code in range(set_av[0], set_av[1] + 1))
+            elif set_op == sre_parse.CATEGORY and set_av == sre_parse.CATEGORY_DIGIT:
+                checks.append(str.isdecimal)
+            elif set_op == sre_parse.CATEGORY and set_av == sre_parse.CATEGORY_WORD:
+                checks.append(lambda c: c.isalnum() or c == '_')
+            else:
+                return None  # NEGATE, other categories...
+        frozen = frozenset(chars)
+        return lambda c: c in frozen or any(check(c) for check in checks)
+
+    if op == sre_parse.SUBPATTERN:
+        _, add_flags, del_flags, sub = av
+        if add_flags or del_flags:
+            return None
+        return _first_char_check(list(sub))
+
+    if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+        low, _, sub = av
+        return _first_char_check(list(sub)) if low >= 1 else None
+
+    if op == sre_parse.BRANCH:
+        branches = [_first_char_check(list(branch)) for branch in av[1]]
+        if any(check is None for check in branches):
+            return None
+        return lambda c: any(check(c) for check in branches)
+
+    return None
+
+def _build_prefilter(pattern):
+    """
+    Returns (first_check, prefix, needle) for 'pattern':
+      first_check - predicate on the first character (anchored patterns), or None
+      prefix      - literal the name must start with, or ''
+      needle      - literal the name must contain, or ''
+    Each is only ever a necessary condition, never a sufficient one.
+    """
+    if pattern.flags & (re.IGNORECASE | re.MULTILINE | re.VERBOSE):
+        return None, '', ''
     try:
-        # We compile the regex provided by the UI
-        pattern = re.compile(pattern_regex)
-    except re.error:
-        return False, "Invalid Regular Expression pattern."
+        items = list(sre_parse.parse(pattern.pattern, pattern.flags))
+    except Exception:
+        return None, '', ''
+
+    anchored = False
+    if items and items[0][0] == sre_parse.AT and items[0][1] in (sre_parse.AT_BEGINNING, sre_parse.AT_BEGINNING_STRING):
+        anchored = True
+        items = items[1:]
+
+    literal = []
+    for op, av in items:
+        if op != sre_parse.LITERAL:
+            break
+        literal.append(chr(av))
+    literal = "".join(literal)
+
+    if not anchored:
+        return None, '', literal
+    if literal:
+        first = literal[0]
+        return (lambda c: c == first), literal, ''
+    return _first_char_check(items), '', ''
+
+class PatternMatcher(object):
+    """
+    Several named patterns applied in priority order. A filename belongs to
+    the first pattern that matches it with at least one non-empty capture group.
+    patterns: list of (name, regex) or (name, regex, priority); lower priority
+    values run first, ties keep list order. Regexes may be strings or compiled.
+
+    Patterns are dispatched on the filename's first character (the candidate
+    list per character is computed once and cached), and literal prefixes /
+    required substrings are tested before the regex engine runs.
+    """
 
+    def __init__(self, patterns, ignore_spaces=False, char_count=None):
+        self.ignore_spaces = ignore_spaces
+        self.char_count = char_count
+
+        entries = []
+        for order, entry in enumerate(patterns):
+            name, regex = entry[0], entry[1]
+            priority = entry[2] if len(entry) > 2 else 0
+            compiled = regex if hasattr(regex, 'search') else re.compile(regex)
+            entries.append((priority, order, name, compiled))
+        entries.sort(key=lambda e: (e[0], e[1]))
+
+        self._entries = []
+        for _, _, name, compiled in entries:
+            first_check, prefix, needle = _build_prefilter(compiled)
+            self._entries.append((name, compiled.search, first_check, prefix, needle))
+        self._by_first_char = {}
+
+    def _candidates(self, first):
+        candidates = self._by_first_char.get(first)
+        if candidates is None:
+            candidates = tuple((name, search, prefix, needle) for name, search, first_check, prefix, needle in self._entries
+                               if first_check is None or (first and first_check(first)))
+            self._by_first_char[first] = candidates
+        return candidates
+
+    def match(self, filename):
+        """Returns (pattern_name, folder_name) or None."""
+        fname_to_check = filename
+        if self.ignore_spaces:
+            fname_to_check = fname_to_check.replace(' ', '')
+        if self.char_count is not None:
+            fname_to_check = fname_to_check[:self.char_count]
+
+        for name, search, prefix, needle in self._candidates(fname_to_check[:1]):
+            if prefix and not fname_to_check.startswith(prefix):
+                continue
+            if needle and needle not in fname_to_check:
+                continue
+
+            match = search(fname_to_check)
+            if match:
+                # Combine capture groups to make the folder name
+                # If your regex is "(BW)", it captures "BW" -> Folder "bw"
+                parts = [g for g in match.groups() if g]
+                if parts:
+                    return name, "_".join(parts).lower().strip()
+                # Pattern matched but no capturing group () defined: try the next one
+        return None
+
+@instrument.timed("plan pattern sort")
+def plan_sort_by_name_patterns(directory, matcher, min_files=2, job="sort_by_name_patterns"):
+    """
+    Planning half of sort_by_name_patterns: one walk, every file classified
+    by 'matcher' (a PatternMatcher). Nothing on disk is changed.
+    Returns a MovePlan.
+    """
     # --- PASS 1: SCAN AND GROUP ---
     groups = {}
     potential_folders = set()
 
-    for root, dirs, files in os.walk(directory):
+    for root, dirs, files in file_index.walk(directory):
         # Prevent recursing into folders we just created
         dirs[:] = [d for d in dirs if d not in potential_folders]
 
+        instrument.count('files_scanned', len(files))
         for filename in files:
-                        if filename.startswith('.'): continue
-                        
-                        fname_to_check = os.path.basename(filename) # Use only the filename for processing
-                        if ignore_spaces:
-                            fname_to_check = fname_to_check.replace(' ', '')
-                        
-                        if char_count is not None:
-                            fname_to_check = fname_to_check[:char_count]
-            
-                        match = pattern.search(fname_to_check)
-                        
-                        if match:
-                            # Combine capture groups to make the folder name
-                            # If your regex is "(BW)", it captures "BW" -> Folder "bw"
-                            parts = [g for g in match.groups() if g]
-                            
-                            if not parts: 
-                                continue # Pattern matched but no capturing group () defined
-                            
-                            # Create a clean folder name
-                            folder_name = "_".join(parts).lower().strip()
-                            
-                            if folder_name not in groups:
-                                groups[folder_name] = []
-                                potential_folders.add(folder_name)
-                            
-                            full_path = os.path.join(root, filename)
-                            groups[folder_name].append(full_path)
-
-    # --- PASS 2: FILTER AND MOVE ---
-    moved_count = 0
-    folders_created = 0
+            if filename.startswith('.'): continue
+
+            result = matcher.match(filename)
+            if result is None:
+                continue
+
+            pattern_name, folder_name = result
+            if folder_name not in groups:
+                groups[folder_name] = (pattern_name, [])
+                potential_folders.add(folder_name)
+
+            groups[folder_name][1].append(os.path.join(root, filename))
+
+    # --- PASS 2: FILTER AND PLAN ---
+    plan = move_plan.MovePlan(job, directory)
+    names = file_mover.NameIndex()
     
-    for folder_name, file_paths in groups.items():
+    for folder_name, (pattern_name, file_paths) in groups.items():
         # THRESHOLD CHECK
         if len(file_paths) < min_files:
             continue 
 
         dest_dir = os.path.join(directory, folder_name)
-        
-        try:
-            os.makedirs(dest_dir, exist_ok=True)
-            folders_created += 1
             
-            for src in file_paths:
-                filename = os.path.basename(src)
-                dest = os.path.join(dest_dir, filename)
-                
-                # Handle duplicates
-                if os.path.exists(dest):
-                    base, ext = os.path.splitext(filename)
-                    counter = 1
-                    while os.path.exists(os.path.join(dest_dir, f"{base}_{counter}{ext}")):
-                        counter += 1
-                    dest = os.path.join(dest_dir, f"{base}_{counter}{ext}")
-
-                shutil.move(src, dest)
-                moved_count += 1
-                
-        except Exception as e:
-            print(f"Error processing group {folder_name}: {e}")
+        for src in file_paths:
+            # Handle duplicates
+            filename = names.claim(dest_dir, os.path.basename(src))
+            plan.add(src, os.path.join(dest_dir, filename), f"{pattern_name} group {folder_name}")
+    return plan
+
+def plan_sort_by_name_pattern(directory, pattern, min_files=2, ignore_spaces=False, char_count=None):
+    """
+    Planning half of sort_by_name_pattern ('pattern' is compiled).
+    Nothing on disk is changed. Returns a MovePlan.
+    """
+    matcher = PatternMatcher([("pattern", pattern)], ignore_spaces, char_count)
+    return plan_sort_by_name_patterns(directory, matcher, min_files, job="sort_by_name_pattern")
+
+def execute_plan(plan, workers=None, progress_callback=None, stop_event=None):
+    """
+    Applies a plan from any of the planners above.
+    stop_event: once set, no new move starts and the job stays resumable.
+    Returns: (success_boolean, message_string)
+    """
+    if stop_event and stop_event.is_set():
+        return False, "Sort cancelled before any files moved."
+    # --- PASS 3: MOVE (renames in place, cross-device copies in parallel) ---
+    stats = plan.execute(workers=workers, progress_callback=progress_callback, stop_event=stop_event)
+    moved_count = stats['moved']
+    folders_created = len(plan.reasons)
+    if stats['stopped']:
+        return False, f"Sort cancelled after {moved_count} files. Use Resume to finish it."
 
     if moved_count == 0:
         return True, "Scan complete. No files matched the pattern (or met the threshold)."
-        
-    return True, f"Sorted {moved_count} files into {folders_created} folders."
\ No newline at end of file
+
+    throughput = file_mover.describe_throughput(stats)
+    if throughput:
+        return True, f"Sorted {moved_count} files into {folders_created} folders.\n{throughput}"
+    return True, f"Sorted {moved_count} files into {folders_created} folders."
+
+# --- FUZZY (SIMILARITY) GROUPING ---
+# Names are normalised into tokens, turned into character 3-grams and
+# summarised by a one-permutation MinHash signature (one crc32 per n-gram).
+# Locality-sensitive hashing over signature bands finds candidate pairs,
+# so the cost grows roughly linearly with the number of files.
+FUZZY_NGRAM = 3
+FUZZY_SIGNATURE_SIZE = 32           # Bins per signature (power of two)
+FUZZY_MARGIN = 0.15                 # Estimates this far below the threshold are still verified
+NOISE_TOKENS = re.compile(r'^(v\d+|rev\d*|ver\d*|final|copy|draft|new|old|edit(ed)?|\d{1,2})$')
+
+def _name_tokens(filename):
+    """'Client Brochure v2 FINAL.pdf' -> ['client', 'brochure']"""
+    stem = os.path.splitext(filename)[0]
+    stem = re.sub(r'(?<=[a-z])(?=[A-Z])', ' ', stem)  # camelCase -> camel Case
+    tokens = [t.lower() for t in re.findall(r'[^\W_]+', stem)]
+    return [t for t in tokens if not NOISE_TOKENS.match(t)]
+
+def _name_text(tokens):
+    return f" {' '.join(tokens)} "
+
+def _ngrams(text):
+    return {text[i:i + FUZZY_NGRAM] for i in range(max(1, len(text) - FUZZY_NGRAM + 1))}
+
+def _signature(text):
+    """One-permutation MinHash of the name's character n-grams."""
+    size = FUZZY_SIGNATURE_SIZE
+    mask = size - 1
+    crc32 = zlib.crc32
+    bins = [None] * size
+    for gram in _ngrams(text):
+        h = crc32(gram.encode('utf-8'))
+        slot = h & mask
+        value = h >> 5
+        current = bins[slot]
+        if current is None or value < current:
+            bins[slot] = value
+
+    # Densify: an empty bin borrows the next filled bin (circularly), offset by the distance
+    if None in bins:
+        filled = list(bins)
+        borrowed = None
+        borrowed_pos = 0
+        for pos in range(2 * size - 1, -1, -1):
+            value = filled[pos & mask]
+            if value is not None:
+                borrowed, borrowed_pos = value, pos
+            elif borrowed is not None and bins[pos & mask] is None:
+                bins[pos & mask] = borrowed + ((borrowed_pos - pos) << 32)
+    return tuple(bins)
+
+def _lsh_shape(threshold, size=FUZZY_SIGNATURE_SIZE):
+    """(bands, rows) whose LSH threshold (1/b)^(1/r) sits at or just below 'threshold'."""
+    best = (size, 1)
+    for rows in (1, 2, 4, 8, 16, 32):
+        if size % rows:
+            continue
+        bands = size // rows
+        if (1.0 / bands) ** (1.0 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+def _similarity(a, b):
+    """Estimated Jaccard similarity: the share of equal signature bins."""
+    return sum(map(operator.eq, a, b)) / len(a)
+
+def _group_name(token_lists):
+    """Tokens shared by most of the names, in the order of the first name."""
+    counts = Counter(t for tokens in token_lists for t in set(tokens))
+    needed = len(token_lists) / 2.0
+    shared = [t for t in token_lists[0] if counts[t] > needed]
+    return "_".join(dict.fromkeys(shared or token_lists[0]))
+
+@instrument.timed("group similar names")
+def propose_similar_groups(directory, threshold=0.6, min_files=2, progress_callback=None):
+    """
+    Clusters files whose normalised names are similar (estimated Jaccard
+    similarity of character 3-grams >= threshold). Nothing on disk is changed.
+    Returns a list of {'name': folder_name, 'files': [paths]} with at least
+    'min_files' files each, largest first.
+    """
+    # --- PASS 1: SIGNATURES (identical signatures share one entry) ---
+    by_signature = {}
+    for root, dirs, files in file_index.walk(directory):
+        instrument.count('files_scanned', len(files))
+        for filename in files:
+            if filename.startswith('.'): continue
+            tokens = _name_tokens(filename)
+            if not tokens:
+                continue
+            text = _name_text(tokens)
+            signature = _signature(text)
+            entry = by_signature.get(signature)
+            if entry is None:
+                entry = by_signature[signature] = ([], [], text)
+            entry[0].append(os.path.join(root, filename))
+            entry[1].append(tokens)
+
+    signatures = list(by_signature)
+    parent = list(range(len(signatures)))
+    exact = {}  # index -> n-gram set, built only for near-threshold candidates
+
+    def similar(i, j):
+        estimate = _similarity(signatures[i], signatures[j])
+        if estimate < threshold - FUZZY_MARGIN:
+            return False
+        # The 32-bin estimate is noisy; confirm with the exact Jaccard similarity
+        for k in (i, j):
+            if k not in exact:
+                exact[k] = _ngrams(by_signature[signatures[k]][2])
+        a, b = exact[i], exact[j]
+        return len(a & b) / len(a | b) >= threshold
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # --- PASS 2: LSH BANDS -> VERIFIED UNIONS ---
+    bands, rows = _lsh_shape(threshold)
+    for band in range(bands):
+        buckets = {}
+        for index, signature in enumerate(signatures):
+            buckets.setdefault(signature[band * rows:(band + 1) * rows], []).append(index)
+
+        for members in buckets.values():
+            # Compare each member with the bucket head and its predecessor
+            # instead of all pairs, so huge buckets stay linear
+            head = members[0]
+            for previous, current in zip(members, members[1:]):
+                for other in (head, previous):
+                    if find(other) != find(current) and similar(other, current):
+                        parent[find(current)] = find(other)
+        if progress_callback:
+            progress_callback(band + 1, bands, "Comparing names...")
+
+    # --- PASS 3: COLLECT CLUSTERS ---
+    clusters = {}
+    for index, signature in enumerate(signatures):
+        paths, token_lists, _ = by_signature[signature]
+        cluster = clusters.setdefault(find(index), ([], []))
+        cluster[0].extend(paths)
+        cluster[1].extend(token_lists)
+
+    groups = []
+    for paths, token_lists in clusters.values():
+        if len(paths) >= min_files:
+            groups.append({'name': _group_name(token_lists), 'files': sorted(paths)})
+    groups.sort(key=lambda g: (-len(g['files']), g['name']))
+    return groups
+
+def plan_sort_by_similarity(directory, groups):
+    """Turns propose_similar_groups() output into a MovePlan (one folder per group)."""
+    plan = move_plan.MovePlan("sort_by_similarity", directory)
+    names = file_mover.NameIndex()
+    used_folders = set()  # Two groups may normalise to the same name
+    for group in groups:
+        folder_name = file_mover.unique_name(used_folders, group['name'] or "similar", "{base}_{counter}")
+        dest_dir = os.path.join(directory, folder_name)
+        for src in group['files']:
+            # Files already sitting in the right folder stay put
+            if os.path.dirname(src) == dest_dir:
+                continue
+            filename = names.claim(dest_dir, os.path.basename(src))
+            plan.add(src, os.path.join(dest_dir, filename), f"similar names {folder_name}")
+    return plan
+
+def sort_by_similarity(directory, threshold=0.6, min_files=2, progress_callback=None, workers=None, dry_run=False, stop_event=None):
+    """
+    Groups files with similar (not identical) names into folders, e.g.
+    'Client Brochure v2 FINAL.pdf' and 'client-brochure_v3.pdf'.
+    threshold (float): 0-1 name similarity needed to join a group.
+    """
+    if not directory or not os.path.isdir(directory):
+        return False, "Invalid directory."
+    if not 0 < threshold <= 1:
+        return False, "Similarity threshold must be between 0 and 1."
+
+    groups = propose_similar_groups(directory, threshold, min_files)
+    plan = plan_sort_by_similarity(directory, groups)
+    if dry_run:
+        return move_plan.dry_run_result(plan)
+    return execute_plan(plan, workers, progress_callback, stop_event)
+
+def sort_by_name_patterns(directory, patterns, min_files=2, ignore_spaces=False, char_count=None, progress_callback=None, workers=None, dry_run=False, stop_event=None):
+    """
+    Sorts files using several named patterns in one walk.
+    patterns: list of (name, regex) or (name, regex, priority); each file goes
+    to the first pattern (by priority) whose capture groups match.
+    """
+    if not directory or not os.path.isdir(directory):
+        return False, "Invalid directory."
+    if not patterns:
+        return False, "No patterns selected."
+
+    try:
+        matcher = PatternMatcher(patterns, ignore_spaces, char_count)
+    except re.error as e:
+        return False, f"Invalid Regular Expression pattern: {e}"
+
+    plan = plan_sort_by_name_patterns(directory, matcher, min_files)
+    if dry_run:
+        return move_plan.dry_run_result(plan)
+    return execute_plan(plan, workers, progress_callback, stop_event)
+
+def sort_by_name_pattern(directory, pattern_regex, min_files=2, ignore_spaces=False, char_count=None, progress_callback=None, workers=None, dry_run=False, stop_event=None):
+    """
+    Sorts files based on a regex pattern.
+    Uses re.search() to find the pattern ANYWHERE in the filename.
+    dry_run (bool): Only compute and save the move plan.
+    """
+    if not directory or not os.path.isdir(directory):
+        return False, "Invalid directory."
+
+    try:
+        # We compile the regex provided by the UI
+        pattern = re.compile(pattern_regex)
+    except re.error:
+        return False, "Invalid Regular Expression pattern."
+
+    plan = plan_sort_by_name_pattern(directory, pattern, min_files, ignore_spaces, char_count)
+    if dry_run:
+        return move_plan.dry_run_result(plan)
+
+    return execute_plan(plan, workers, progress_callback, stop_event)
\ No newline at end of file
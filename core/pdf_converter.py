@@ -1,5 +1,6 @@
 import os
 import shutil
+from core import file_index
 
 try:
     import win32com.client
@@ -33,7 +34,7 @@ def batch_convert_to_pdf(source_dir, output_dir, archive_dir, progress_callback=
     pdf_options.PDFPreset = "[Smallest File Size]"
 
     count = 0
-    ai_files = [os.path.join(root, f) for root, _, files in os.walk(source_dir) for f in files if f.lower().endswith('.ai')]
+    ai_files = file_index.find_files(source_dir, ['.ai'])
     total_files = len(ai_files)
 
     for i, file_path in enumerate(ai_files):
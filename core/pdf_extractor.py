@@ -1,7 +1,8 @@
 import os
-import fitz  # PyMuPDF
+from core import instrument
 
 def extract_pages_as_images(pdf_paths, output_root, zoom=2):
+    import fitz  # PyMuPDF
     processed_count = 0
     for pdf_path in pdf_paths:
         try:
@@ -11,12 +12,16 @@ def extract_pages_as_images(pdf_paths, output_root, zoom=2):
 
             doc = fitz.open(pdf_path)
             matrix = fitz.Matrix(zoom, zoom)
+            instrument.count('bytes_read', os.path.getsize(pdf_path))
             
             for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                pix = page.get_pixmap(matrix=matrix)
+                with instrument.stage("render pages"):
+                    page = doc.load_page(page_num)
+                    pix = page.get_pixmap(matrix=matrix)
                 output_filename = f"{pdf_filename_base}_page_{page_num + 1:02d}.png"
-                pix.save(os.path.join(output_folder, output_filename))
+                with instrument.stage("encode png"):
+                    pix.save(os.path.join(output_folder, output_filename))
+                instrument.count('pages_rendered')
             
             doc.close()
             processed_count += 1
@@ -1,14 +1,15 @@
 import os
-import fitz  # PyMuPDF
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.units import inch
+from core import instrument
 
 def merge_pdfs_with_toc(source_folder, output_path, title_text="Compilation", progress_callback=None):
     """
     Merges all PDFs, generates a Title Page + TOC, and adds CLICKABLE bookmarks.
     progress_callback: function(percentage_int, status_string)
     """
+    import fitz  # PyMuPDF
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.units import inch
     if not source_folder or not os.path.exists(source_folder):
         return False, "Invalid directory."
 
@@ -22,6 +23,8 @@ def merge_pdfs_with_toc(source_folder, output_path, title_text="Compilation", pr
         return False, "No PDF files found in directory."
 
     total_files = len(pdf_files)
+    phases = instrument.phases()
+    phases.next("analyze page counts")
 
     # 2. Pass 1: Analyze Page Counts (Weights 0-10% of progress)
     file_info = [] 
@@ -49,6 +52,7 @@ def merge_pdfs_with_toc(source_folder, output_path, title_text="Compilation", pr
         return False, "Could not read any PDF files."
 
     # 3. Calculate Layout
+    phases.next("table of contents")
     if progress_callback: progress_callback(10, "Generating Table of Contents...")
     
     lines_per_page = 35
@@ -100,6 +104,7 @@ def merge_pdfs_with_toc(source_folder, output_path, title_text="Compilation", pr
     c.save() 
 
     # 5. Merge Everything (Weights 10-60% of progress)
+    phases.next("merge pages")
     try:
         final_doc = fitz.open()
         
@@ -121,6 +126,7 @@ def merge_pdfs_with_toc(source_folder, output_path, title_text="Compilation", pr
                 pct = 10 + int((i / len(file_info)) * 50)
                 progress_callback(pct, f"Merging file: {item['name']}")
 
+            instrument.count('bytes_read', os.path.getsize(item['path']))
             doc = fitz.open(item['path'])
             final_doc.insert_pdf(doc)
             doc.close()
@@ -131,6 +137,7 @@ def merge_pdfs_with_toc(source_folder, output_path, title_text="Compilation", pr
         final_doc.set_toc(toc_data)
 
         # 6. Pass 3: Create Clickable Links (Weights 60-95% of progress)
+        phases.next("create links")
         link_cursor = front_matter_length + 1
         
         for i, name_text in enumerate(searchable_names):
@@ -160,8 +167,11 @@ def merge_pdfs_with_toc(source_folder, output_path, title_text="Compilation", pr
 
         # Save (Final 5%)
         if progress_callback: progress_callback(95, "Saving final document...")
+        phases.next("save")
         final_doc.save(output_path)
         final_doc.close()
+        phases.end()
+        instrument.count('bytes_written', os.path.getsize(output_path))
 
         if os.path.exists(temp_front_matter):
             os.remove(temp_front_matter)
@@ -1,20 +1,26 @@
 import os
 import math
 import warnings
-import pikepdf
-from PIL import Image
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter, landscape
-from reportlab.lib.units import inch
-from reportlab.lib.colors import black, white
-from reportlab.lib.utils import ImageReader
-
-# Suppress Pillow warnings
-warnings.simplefilter('ignore', Image.DecompressionBombWarning)
-Image.MAX_IMAGE_PIXELS = 200000000
+from core import thumbnail_cache, instrument
+
+# Pillow's pixel limit while printing (large scans are expected)
+PIL_MAX_IMAGE_PIXELS = 200000000
+
+# Longest edge used for cached 'draft' images when printing to US Letter
+DRAFT_IMAGE_SIZE = 1600
+
+def _import_pil():
+    """Imports Pillow on first use and suppresses its decompression-bomb warnings."""
+    from PIL import Image
+    warnings.simplefilter('ignore', Image.DecompressionBombWarning)
+    # Only ever raise the process-wide limit (the pyramid tiler lifts it entirely)
+    if Image.MAX_IMAGE_PIXELS is not None and Image.MAX_IMAGE_PIXELS < PIL_MAX_IMAGE_PIXELS:
+        Image.MAX_IMAGE_PIXELS = PIL_MAX_IMAGE_PIXELS
+    return Image
 
 def linearize_pdf(input_path, output_path):
     """Linearizes a single PDF."""
+    import pikepdf
     try:
         with pikepdf.open(input_path) as pdf:
             pdf.save(output_path, linearize=True)
@@ -22,6 +28,20 @@ def linearize_pdf(input_path, output_path):
     except Exception as e:
         return False, f"Error linearizing {os.path.basename(input_path)}: {e}"
 
+def compress_pdf(input_path, output_path):
+    """Drops unreferenced resources, recompresses streams and linearizes one PDF."""
+    import pikepdf
+    try:
+        with pikepdf.open(input_path) as pdf:
+            pdf.remove_unreferenced_resources()
+            pdf.save(output_path, compress_streams=True, linearize=True)
+        original_size = os.path.getsize(input_path)
+        new_size = os.path.getsize(output_path)
+        savings_percent = (original_size - new_size) / original_size * 100 if original_size > 0 else 0
+        return True, f"Saved {savings_percent:.1f}% ({original_size/1024:.0f}KB -> {new_size/1024:.0f}KB)"
+    except Exception as e:
+        return False, f"Error compressing {os.path.basename(input_path)}: {e}"
+
 def batch_linearize_pdfs(pdf_files, progress_callback=None, stop_event=None):
     """Linearizes a list of PDF files."""
     total_files = len(pdf_files)
@@ -51,12 +71,20 @@ def batch_linearize_pdfs(pdf_files, progress_callback=None, stop_event=None):
 
     return True, result_msg
 
-def create_compilation_pdf(image_directory, orientation='P', include_filename=True, progress_callback=None, use_native_res=False, stop_event=None):
+def create_compilation_pdf(image_directory, orientation='P', include_filename=True, progress_callback=None, use_native_res=False, stop_event=None, draft_size=None):
     """
     Core logic for 'Dark Mode' PDF compilation.
     use_native_res (bool): If True, page size equals image size (Best for Digital/Screens).
                            If False, scales image to fit US Letter (Best for Printing).
+    draft_size (int): If set (and not native res), pages use cached thumbnails of
+                      this size instead of decoding the full-size originals.
     """
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter, landscape
+    from reportlab.lib.units import inch
+    from reportlab.lib.colors import black, white
+    from reportlab.lib.utils import ImageReader
+    Image = _import_pil()
     if not image_directory or not os.path.exists(image_directory):
         return False, "Invalid directory."
 
@@ -77,6 +105,7 @@ def create_compilation_pdf(image_directory, orientation='P', include_filename=Tr
 
     text_font, text_size, margin = 'Helvetica-Bold', 14, 0.25 * inch
     stopped = False
+    phases = instrument.phases()
 
     for i, filename_with_ext in enumerate(image_files):
         if stop_event and stop_event.is_set():
@@ -90,6 +119,11 @@ def create_compilation_pdf(image_directory, orientation='P', include_filename=Tr
         filename_base = os.path.splitext(filename_with_ext)[0]
         
         try:
+            if draft_size and not use_native_res:
+                phases.next("draft thumbnails")
+                file_path = thumbnail_cache.get_thumbnail_path(file_path, draft_size)
+
+            phases.next("draw pages")
             with Image.open(file_path) as img:
                 original_width, original_height = img.size
 
@@ -129,6 +163,7 @@ def create_compilation_pdf(image_directory, orientation='P', include_filename=Tr
         except Exception as e:
             print(f"Error on {filename_with_ext}: {e}")
 
+    phases.next("save pdf")
     if stopped:
         c.save() # Save to close the file handle
         if os.path.exists(output_file):
@@ -136,12 +171,19 @@ def create_compilation_pdf(image_directory, orientation='P', include_filename=Tr
         return False, "PDF generation stopped by user."
     
     c.save()
+    phases.end()
+    instrument.count('bytes_written', os.path.getsize(output_file))
     return True, f"PDF Saved: {output_file}"
 
-def create_contact_sheet_pdf(input_folder, cols=3):
+def create_contact_sheet_pdf(input_folder, cols=3, thumb_size=None):
     """
     Core logic for 'Contact Sheet' PDF.
+    thumb_size (int): If set, cells use cached thumbnails that fit in
+                      thumb_size x thumb_size instead of the full-size originals.
     """
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.utils import ImageReader
+    Image = _import_pil()
     output_filename = os.path.join(input_folder, "Contact_Sheet.pdf")
     valid_exts = ('.png', '.jpg', '.jpeg', '.tiff', '.bmp', '.webp')
     files = [f for f in os.listdir(input_folder) if f.lower().endswith(valid_exts)]
@@ -150,11 +192,24 @@ def create_contact_sheet_pdf(input_folder, cols=3):
     if not files:
         return False, "No images found."
 
+    # Resolve the image each cell will draw (original or cached thumbnail)
+    sources = {}
+    for f in files:
+        src = os.path.join(input_folder, f)
+        if thumb_size:
+            try:
+                src = thumbnail_cache.get_thumbnail_path(src, thumb_size)
+            except Exception as e:
+                print(f"Thumbnail error for {f}: {e}")
+                continue
+        sources[f] = src
+    files = [f for f in files if f in sources]
+
     # Scan for Max Dimensions
     max_w, max_h = 0, 0
-    for f in files:
+    for src in sources.values():
         try:
-            with Image.open(os.path.join(input_folder, f)) as img:
+            with Image.open(src) as img:
                 max_w = max(max_w, img.width)
                 max_h = max(max_h, img.height)
         except: continue
@@ -173,7 +228,7 @@ def create_contact_sheet_pdf(input_folder, cols=3):
     current_col, current_row = 0, 0
     
     for f in files:
-        filepath = os.path.join(input_folder, f)
+        filepath = sources[f]
         try:
             with Image.open(filepath) as img:
                 img_w, img_h = img.size
@@ -199,7 +254,7 @@ def create_contact_sheet_pdf(input_folder, cols=3):
     c.save()
     return True, f"Sheet Saved: {output_filename}"
 
-def batch_create_pdfs(parent_directory, orientation='P', include_filename=True, use_native_res=False, progress_callback=None, stop_event=None):
+def batch_create_pdfs(parent_directory, orientation='P', include_filename=True, use_native_res=False, progress_callback=None, stop_event=None, draft_size=None):
     """
     Scans the parent_directory for subfolders and creates a PDF for each one.
     """
@@ -228,7 +283,7 @@ def batch_create_pdfs(parent_directory, orientation='P', include_filename=True,
 
         # Pass the stop_event down to the single PDF creation function
         success, msg = create_compilation_pdf(
-            folder, orientation, include_filename, None, use_native_res, stop_event=stop_event
+            folder, orientation, include_filename, None, use_native_res, stop_event=stop_event, draft_size=draft_size
         )
         
         if success:
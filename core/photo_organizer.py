@@ -1,5 +1,5 @@
 import os
-import shutil
+import time
 import hashlib
 from datetime import datetime, timedelta
 import re
@@ -10,9 +10,16 @@ try:
 except:
     import simplejson as json
 import filecmp
+from core import file_mover, move_plan, instrument
 
-# Setting locale to the 'local' value
-locale.setlocale(locale.LC_ALL, '')
+# Month names in folder names follow the 'local' locale; set on first use
+_locale_set = False
+
+def _use_local_locale():
+    global _locale_set
+    if not _locale_set:
+        locale.setlocale(locale.LC_ALL, '')
+        _locale_set = True
 
 exiftool_location = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'Image-ExifTool', 'exiftool')
 
@@ -182,9 +189,12 @@ class ExifTool(object):
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        self.process.stdin.write(b'-stay_open\nFalse\n')
-        self.process.stdin.flush()
-        self.process.stdin.close()
+        try:
+            self.process.stdin.write(b'-stay_open\nFalse\n')
+            self.process.stdin.flush()
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass  # Already exited
         self.process.stdout.close()
         self.process.stderr.close()
         self.process.wait()
@@ -192,15 +202,20 @@ class ExifTool(object):
 
     def execute(self, *args):
         args = args + ("-execute\n",)
+        start = time.perf_counter()
         self.process.stdin.write(str.join("\n", args).encode('utf-8'))
         self.process.stdin.flush()
         output = ""
         fd = self.process.stdout.fileno()
         while not output.rstrip(' \t\n\r').endswith(self.sentinel):
             increment = os.read(fd, 4096)
+            if not increment:
+                # ExifTool died (the watch mode would otherwise wait here forever)
+                raise OSError(f"ExifTool exited unexpectedly: {self.process.stderr.read().decode('utf-8', 'replace').strip()}")
             if self.verbose:
                 sys.stdout.write(increment.decode('utf-8'))
             output += increment.decode('utf-8')
+        instrument.count('subprocess_wait', time.perf_counter() - start)
         return output.rstrip(' \t\n\r')[:-len(self.sentinel)]
 
     def get_metadata(self, *args):
@@ -210,9 +225,15 @@ class ExifTool(object):
         except ValueError:
             return []
 
-def organize_by_date(src, structure="%Y/%m-%b", progress_cb=None, rename_format=None, recursive=False, copy_files=False, test=False, remove_duplicates=True, day_begins=0, keep_filename=False):
-    """Core logic to organize files by date into subfolders."""
-    if not os.path.exists(src): return False, "Invalid directory."
+@instrument.timed("plan photo moves")
+def plan_organize_by_date(src, structure="%Y/%m-%b", progress_cb=None, rename_format=None, recursive=False, copy_files=False, remove_duplicates=True, day_begins=0, keep_filename=False, files=None):
+    """
+    Planning half of organize_by_date: reads the dates with ExifTool and
+    resolves every destination. Nothing on disk is changed.
+    files: only read these paths (date folders are still created under src).
+    Returns a MovePlan. Raises FileNotFoundError if ExifTool is missing.
+    """
+    _use_local_locale()
 
     additional_groups_to_ignore=['File']
     additional_tags_to_ignore=[]
@@ -239,22 +260,24 @@ def organize_by_date(src, structure="%Y/%m-%b", progress_cb=None, rename_format=
         args += ['-time:all']
 
 
-    if recursive:
-        args += ['-r']
-
-    args += [src]
+    if files is not None:
+        args += list(files)
+    else:
+        if recursive:
+            args += ['-r']
+        args += [src]
 
-    moved_count = 0
+    plan = move_plan.MovePlan("organize_by_date", src, copy_files)
+    planned = {}  # normcased destination -> source, for collision checks before anything moves
+    names = file_mover.NameIndex()  # one listing per destination folder instead of a stat per file
     
-    try:
-        # get all metadata
-        with ExifTool(verbose=verbose) as e:
-            metadata = e.get_metadata(*args)
-    except FileNotFoundError:
-        return False, "ExifTool not found. Please make sure the 'Image-ExifTool' directory is in the root of the application."
+    # get all metadata
+    with instrument.stage("exiftool"), ExifTool(verbose=verbose) as e:
+        metadata = e.get_metadata(*args)
 
 
     total_files = len(metadata)
+    instrument.count('files_scanned', total_files)
 
     # parse output extracting oldest relevant date
     for idx, data in enumerate(metadata):
@@ -283,8 +306,6 @@ def organize_by_date(src, structure="%Y/%m-%b", progress_cb=None, rename_format=
         dest_file_path = src
         for thedir in dirs:
             dest_file_path = os.path.join(dest_file_path, thedir)
-            if not test and not os.path.exists(dest_file_path):
-                os.makedirs(dest_file_path)
 
         # rename file if necessary
         filename = os.path.basename(src_file)
@@ -303,8 +324,14 @@ def organize_by_date(src, structure="%Y/%m-%b", progress_cb=None, rename_format=
         fileIsIdentical = False
 
         while True:
-            if os.path.isfile(dest_file):  # check for existing name
-                if remove_duplicates and filecmp.cmp(src_file, dest_file):  # check for identical files
+            # an earlier file in this run may already be headed for the same name
+            existing = planned.get(os.path.normcase(dest_file))
+            if existing is None and os.path.normcase(os.path.basename(dest_file)) in names.taken(os.path.dirname(dest_file)) \
+                    and os.path.isfile(dest_file):
+                existing = dest_file
+            if existing is not None:  # check for existing name
+                instrument.count('duplicate_checks')
+                if remove_duplicates and filecmp.cmp(src_file, existing):  # check for identical files
                     fileIsIdentical = True
                     break
 
@@ -319,14 +346,44 @@ def organize_by_date(src, structure="%Y/%m-%b", progress_cb=None, rename_format=
                 break
 
 
-        # finally move or copy the file
+        # queue the move or copy
         if fileIsIdentical:
             continue  # ignore identical files
         else:
-            if copy_files:
-                shutil.copy2(src_file, dest_file)
-            else:
-                shutil.move(src_file, dest_file)
-            moved_count += 1
-        
+            planned[os.path.normcase(dest_file)] = src_file
+            plan.add(src_file, dest_file, f"dated {dir_structure}")
+
+    return plan
+
+def organize_by_date(src, structure="%Y/%m-%b", progress_cb=None, rename_format=None, recursive=False, copy_files=False, test=False, remove_duplicates=True, day_begins=0, keep_filename=False, workers=None, stop_event=None):
+    """
+    Core logic to organize files by date into subfolders.
+    test (bool): Dry run - only compute and save the move plan.
+    stop_event: once set, no new move starts; copies in flight finish and are
+        journaled, and the job stays resumable.
+    """
+    if not os.path.exists(src): return False, "Invalid directory."
+
+    try:
+        plan = plan_organize_by_date(src, structure, progress_cb, rename_format, recursive, copy_files, remove_duplicates, day_begins, keep_filename)
+    except FileNotFoundError:
+        return False, "ExifTool not found. Please make sure the 'Image-ExifTool' directory is in the root of the application."
+
+    if test:
+        return move_plan.dry_run_result(plan)
+    if stop_event and stop_event.is_set():
+        return False, "Photo sort cancelled before any files moved."
+
+    # finally move or copy the files (renames in place, cross-device copies in parallel)
+    move_cb = None
+    if progress_cb:
+        move_cb = lambda current, total, name: progress_cb(current, total, f"{'Copying' if copy_files else 'Moving'} {name}")
+    stats = plan.execute(workers=workers, progress_callback=move_cb, stop_event=stop_event)
+    moved_count = stats['moved']
+    if stats['stopped']:
+        return False, f"Photo sort cancelled after {moved_count} files. Use Resume to finish it."
+
+    throughput = file_mover.describe_throughput(stats)
+    if throughput:
+        return True, f"Organized {moved_count} files into date-based folders.\n{throughput}"
     return True, f"Organized {moved_count} files into date-based folders."
@@ -1,68 +1,151 @@
 import os
-import shutil
+from core import file_mover, move_plan, instrument, file_index
 
-def consolidate_single_files(directory):
+def _collapse_scan(path, target_dir, remove_empty, plan, names, remove_dirs):
     """
-    Moves files from subfolders that contain EXACTLY ONE item 
-    into a 'Singles_Consolidated' folder, then deletes the empty subfolder.
+    Post-order walk used by plan_consolidate_single_files. Returns the single
+    file a folder boils down to (for a chain like a/b/c/file.jpg), 'empty' /
+    'emptied' for a folder with nothing left in it (before / because of this
+    run), or None otherwise. Only a folder that held exactly one item to
+    begin with is a link in a chain; a folder that is left with one file
+    after its subfolders are consolidated stays as it is.
+    """
+    kept = []         # Entries that stay put
+    chains = []       # (child folder, file) pairs that collapse to one file
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError as e:
+        print(f"Error processing {path}: {e}")
+        return None
+
+    for entry in entries:
+        if not entry.is_dir(follow_symlinks=False) or entry.path == target_dir:
+            kept.append(entry)
+            continue
+        result = _collapse_scan(entry.path, target_dir, remove_empty, plan, names, remove_dirs)
+        if result == 'emptied' or (result == 'empty' and remove_empty):
+            remove_dirs.append(entry.path)
+        elif result is None or result == 'empty':
+            kept.append(entry)
+        else:
+            chains.append((entry.path, result))
+
+    # Our only item is a file or itself a chain: pass it up
+    if len(entries) == 1:
+        if chains:
+            return chains[0][1]
+        if kept and kept[0].is_file():
+            return kept[0].path
+
+    # Otherwise every chain below ends at this level
+    for folder, file_path in chains:
+        _plan_chain(folder, file_path, target_dir, plan, names, remove_dirs)
+
+    if not kept:
+        return 'emptied' if chains or len(entries) else 'empty'
+    return None
+
+def _plan_chain(folder, file_path, target_dir, plan, names, remove_dirs):
+    dest_name = names.claim(target_dir, os.path.basename(file_path))
+    plan.add(file_path, os.path.join(target_dir, dest_name), f"only file in {os.path.basename(folder)}")
+    # Every folder from the file up to 'folder' empties once the file moves
+    current = os.path.dirname(file_path)
+    while True:
+        remove_dirs.append(current)
+        if current == folder:
+            break
+        current = os.path.dirname(current)
+
+@instrument.timed("plan consolidation")
+def plan_consolidate_single_files(directory, remove_empty=True):
+    """
+    Planning half of consolidate_single_files: one bottom-up os.scandir pass.
+    Unlike the old one-level pass, single-file folders are found at any depth,
+    not only directly below 'directory'.
+    Nothing on disk is changed.
+    Returns: (MovePlan, folders_to_remove) with the folders deepest first.
+    """
+    target_dir = os.path.join(directory, "Singles_Consolidated")
+    plan = move_plan.MovePlan("consolidate_single_files", directory)
+    names = file_mover.NameIndex()
+    remove_dirs = []
+
+    with os.scandir(directory) as it:
+        top_entries = [entry for entry in it if entry.is_dir(follow_symlinks=False) and entry.path != target_dir]
+
+    for entry in top_entries:
+        result = _collapse_scan(entry.path, target_dir, remove_empty, plan, names, remove_dirs)
+        if result == 'emptied' or (result == 'empty' and remove_empty):
+            remove_dirs.append(entry.path)
+        elif result is not None and result != 'empty':
+            _plan_chain(entry.path, result, target_dir, plan, names, remove_dirs)
+
+    remove_dirs.sort(key=lambda d: d.count(os.sep), reverse=True)
+    return plan, remove_dirs
+
+def consolidate_single_files(directory, dry_run=False, remove_empty=True, progress_callback=None, stop_event=None):
+    """
+    Moves files out of folders that contain EXACTLY ONE item - at any depth,
+    including nested chains like a/b/c/file.jpg - into a
+    'Singles_Consolidated' folder, then deletes the emptied folders in the
+    same pass.
+    remove_empty (bool): Also delete folders that are (or become) empty.
+    stop_event: once set, no new move starts and the job stays resumable.
     """
     if not os.path.exists(directory): return False, "Invalid Path"
     
-    target_dir = os.path.join(directory, "Singles_Consolidated")
-    os.makedirs(target_dir, exist_ok=True)
+    plan, remove_dirs = plan_consolidate_single_files(directory, remove_empty)
+    if dry_run:
+        success, msg = move_plan.dry_run_result(plan)
+        return success, f"{msg}\nWould remove {len(remove_dirs)} folders."
     
-    moved = 0
+    if stop_event and stop_event.is_set():
+        return False, "Consolidation cancelled before any files moved."
+    stats = plan.execute(progress_callback=progress_callback, stop_event=stop_event)
+    if stats['stopped']:
+        return False, f"Consolidation cancelled after {stats['moved']} files. Use Resume to finish it."
+
+    # Deepest first; a folder whose move failed is not empty and simply stays
     deleted_folders = 0
-    
-    for item in os.listdir(directory):
-        sub_path = os.path.join(directory, item)
-        
-        if os.path.isdir(sub_path) and sub_path != target_dir:
-            contents = os.listdir(sub_path)
-            
-            if len(contents) == 1:
-                file_name = contents[0]
-                src = os.path.join(sub_path, file_name)
-                
-                if os.path.isfile(src):
-                    try:
-                        shutil.move(src, os.path.join(target_dir, file_name))
-                        os.rmdir(sub_path)
-                        moved += 1
-                        deleted_folders += 1
-                    except Exception as e:
-                        print(f"Error processing {sub_path}: {e}")
-
-    return True, f"Consolidated {moved} files.\nRemoved {deleted_folders} empty folders."
-
-def sort_by_extension(source_dirs, centralize=False, progress_callback=None):
+    for folder in remove_dirs:
+        try:
+            os.rmdir(folder)
+            deleted_folders += 1
+        except OSError:
+            pass
+
+    return True, f"Consolidated {stats['moved']} files.\nRemoved {deleted_folders} empty folders."
+
+@instrument.timed("plan extension sort")
+def plan_sort_by_extension(source_dirs, centralize=False, files=None):
     """
-    Scans folders and moves files into subfolders by extension.
-    centralize (bool): 
-        If True: Moves ALL files to the main source directory (source_dirs[0]).
-        If False: Sorts files into subfolders relative to where they were found.
+    Planning half of sort_by_extension. Nothing on disk is changed.
+    files: sort only these paths instead of scanning source_dirs.
+    Returns a MovePlan.
     """
-    moved_count = 0
-    
-    # 1. Scan for files
+    # 1. Scan for files (or take the ones given)
     files_to_move = []
-    for d in source_dirs:
-        for root, _, files in os.walk(d):
+    scan_dirs = source_dirs
+    if files is not None:
+        files_to_move = [os.path.split(path) for path in files]
+        scan_dirs = []
+    for d in scan_dirs:
+        for root, _, files in file_index.walk(d):
             # Avoid processing folders we just created
             if "_Files" in os.path.basename(root): 
                 continue
                 
+            instrument.count('files_scanned', len(files))
             for f in files:
                 files_to_move.append((root, f))
     
-    total_files = len(files_to_move)
     main_root = source_dirs[0] # The main folder selected by the user
     
-    # 2. Process Moves
-    for i, (current_root, filename) in enumerate(files_to_move):
-        if progress_callback:
-            progress_callback(i+1, total_files, f"Sorting {filename}")
-            
+    # 2. Plan destinations (duplicate names resolved in memory)
+    plan = move_plan.MovePlan("sort_by_extension", main_root)
+    names = file_mover.NameIndex()
+    for current_root, filename in files_to_move:
         ext = os.path.splitext(filename)[1].strip('.').upper()
         if not ext: ext = "NO_EXT"
         
@@ -76,28 +159,45 @@ def sort_by_extension(source_dirs, centralize=False, progress_callback=None):
             # Move to Current Root/JPG_Files
             dest_dir = os.path.join(current_root, folder_name)
         
-        try:
-            os.makedirs(dest_dir, exist_ok=True)
-            
-            # Handle duplicate filenames if centralizing
-            dest_path = os.path.join(dest_dir, filename)
-            if os.path.exists(dest_path):
-                base, extension = os.path.splitext(filename)
-                counter = 1
-                while os.path.exists(os.path.join(dest_dir, f"{base}_{counter}{extension}")):
-                    counter += 1
-                dest_path = os.path.join(dest_dir, f"{base}_{counter}{extension}")
-
-            shutil.move(os.path.join(current_root, filename), dest_path)
-            moved_count += 1
-        except Exception as e: 
-            print(f"Error moving {filename}: {e}")
+        dest_name = names.claim(dest_dir, filename)
+        plan.add(os.path.join(current_root, filename), os.path.join(dest_dir, dest_name), f"extension {ext}")
+    return plan
+
+def sort_by_extension(source_dirs, centralize=False, progress_callback=None, workers=None, dry_run=False, stop_event=None):
+    """
+    Scans folders and moves files into subfolders by extension.
+    centralize (bool): 
+        If True: Moves ALL files to the main source directory (source_dirs[0]).
+        If False: Sorts files into subfolders relative to where they were found.
+    workers (int): Parallel copies when the destination is on another drive.
+    dry_run (bool): Only compute and save the move plan.
+    stop_event: once set, no new move starts; copies in flight finish and are
+        journaled, and the job stays resumable.
+    """
+    plan = plan_sort_by_extension(source_dirs, centralize)
+    if dry_run:
+        return move_plan.dry_run_result(plan)
+    if stop_event and stop_event.is_set():
+        return False, "Sort cancelled before any files moved."
+
+    # 3. Process Moves (renames in place, cross-device copies in parallel)
+    cb = None
+    if progress_callback:
+        cb = lambda current, total, name: progress_callback(current, total, f"Sorting {name}")
+    stats = plan.execute(workers=workers, progress_callback=cb, stop_event=stop_event)
+    moved_count = stats['moved']
+    if stats['stopped']:
+        return False, f"Sort cancelled after {moved_count} files. Use Resume to finish it."
 
+    throughput = file_mover.describe_throughput(stats)
+    if throughput:
+        return True, f"Sorted {moved_count} files by file type.\n{throughput}"
     return True, f"Sorted {moved_count} files by file type."
 
-def delete_empty_folders(directory):
+def delete_empty_folders(directory, stop_event=None):
     """
     Deletes all empty subdirectories within a given directory.
+    stop_event: once set, the walk stops after the current folder.
     """
     if not os.path.isdir(directory):
         return False, "Invalid directory provided."
@@ -105,6 +205,8 @@ def delete_empty_folders(directory):
     deleted_count = 0
     # We walk bottom-up to ensure we delete nested empty folders correctly.
     for root, dirs, files in os.walk(directory, topdown=False):
+        if stop_event and stop_event.is_set():
+            return False, f"Stopped after deleting {deleted_count} empty folders."
         if not dirs and not files:
             # We should not delete the root directory itself, even if it becomes empty
             if os.path.samefile(root, directory):
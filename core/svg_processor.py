@@ -1,11 +1,30 @@
 import os
+import io
+import re
 import math
-import xml.etree.ElementTree as ET
+import shutil
+import hashlib
+import xml.sax
+from xml.sax.handler import feature_namespaces, feature_external_ges
+from xml.sax.saxutils import escape, quoteattr
+from core import instrument
 
 # Configuration defaults
-DEFAULT_ITEM_SIZE = 200    
-DEFAULT_PADDING = 20       
-DEFAULT_COLUMNS = 10       
+DEFAULT_ITEM_SIZE = 200
+DEFAULT_PADDING = 20
+DEFAULT_COLUMNS = 10
+
+# Embedded images shorter than this are cheaper to keep inline than to hoist
+DATA_URI_MIN_LENGTH = 1024
+
+# Local references ('#id') are written as \x01id\x02 while a file is streamed and
+# resolved once its final id map is known. Both characters are illegal in XML 1.0,
+# so they can never clash with real content.
+_MARKER_RE = re.compile('\x01([^\x02]*)\x02')
+_URL_REF_RE = re.compile(r'''url\(\s*(['"]?)#([^)'"\s]+)\1\s*\)''')
+# In <style> text: the selector (or @-rule prelude) before each '{', and '#id' selectors in it
+_CSS_PRELUDE_RE = re.compile(r'([^{}]*)\{')
+_CSS_ID_RE = re.compile(r'#(-?[_a-zA-Z][\w-]*)')
 
 def strip_namespace(element):
     """Clean namespace prefixes to prevent Illustrator errors."""
@@ -19,9 +38,355 @@ def strip_namespace(element):
     for child in element:
         strip_namespace(child)
 
-def merge_svgs_to_grid(input_folder, item_size=DEFAULT_ITEM_SIZE, padding=DEFAULT_PADDING, columns=DEFAULT_COLUMNS):
+def _format_attrs(attrs):
+    return "".join(f" {name}={quoteattr(value)}" for name, value in attrs.items())
+
+def _mark_url_refs(value):
+    return _URL_REF_RE.sub(lambda m: f"url(#\x01{m.group(2)}\x02)", value)
+
+def _mark_css_refs(css):
+    """Marks '#id' selectors and url(#id) in stylesheet text. Colours like #fff only occur inside declarations, which are left alone."""
+    css = _CSS_PRELUDE_RE.sub(lambda m: _CSS_ID_RE.sub(lambda s: f"#\x01{s.group(1)}\x02", m.group(1)) + "{", css)
+    return _mark_url_refs(css)
+
+class _SharedDefs(object):
+    """
+    State shared by every file of one merge: ids already used in the output
+    and the hoisted <defs> children (written to 'defs_out' as they are found).
+    """
+
+    def __init__(self, defs_out=None, reserved_ids=()):
+        self.defs_out = defs_out          # None disables hoisting/deduplication
+        self.used_ids = set(reserved_ids)
+        self.hashes = {}                  # content hash -> master id
+        self.hoisted_count = 0
+        self.deduped_count = 0
+
+    def allocate_id(self, wanted, prefix):
+        """Returns 'wanted' if it is still free, else a prefixed unique variant."""
+        new_id = wanted
+        if new_id in self.used_ids:
+            new_id = f"{prefix}_{wanted}"
+            counter = 1
+            while new_id in self.used_ids:
+                counter += 1
+                new_id = f"{prefix}_{wanted}_{counter}"
+        self.used_ids.add(new_id)
+        return new_id
+
+class _GroupWriter(xml.sax.ContentHandler):
     """
-    Core logic to merge SVGs. 
+    SAX handler that re-emits the children of an SVG's root element (the root's
+    own attributes are kept in 'root_attrs' for the layout). Namespace prefixes are dropped on the fly (same result as strip_namespace),
+    ids that clash with earlier files are renamed (along with references to them in
+    attributes and in <style> selectors), and (when shared.defs_out is set)
+    identical <defs>/<symbol> children and embedded images are hoisted into the
+    master <defs> once.
+    """
+
+    def __init__(self, out, shared, prefix):
+        super().__init__()
+        self.out = out
+        self.root_attrs = {}
+        self.shared = shared
+        self.prefix = prefix
+        self.id_map = {}
+        self.depth = 0
+        self.tag_open = False  # True while a start tag still lacks its closing '>'
+        self.stack = []
+        self.text = []
+        self.capture = None    # State of the <defs> child currently being buffered
+
+    # --- OUTPUT HELPERS ---
+    def _close_start_tag(self):
+        if self.tag_open:
+            self.out.write(">")
+            self.tag_open = False
+
+    def _flush_text(self):
+        if self.text:
+            content = "".join(self.text)
+            self.text = []
+            if self.shared.defs_out is not None and self.capture is None and self.stack[-1:] == ['defs'] and content.isspace():
+                return  # Whitespace between hoisted children would only bloat the empty <defs>
+            self._close_start_tag()
+            if self.stack[-1:] == ['style']:
+                self.out.write(_mark_css_refs(escape(content)))
+            else:
+                self.out.write(_mark_url_refs(escape(content)))
+
+    def _map_id(self, old_id):
+        new_id = self.shared.allocate_id(old_id, self.prefix)
+        self.id_map[old_id] = new_id
+        return new_id
+
+    def _local_attrs(self, attrs):
+        # Keyed by local name so 'xlink:href' becomes 'href', as before
+        local_attrs = {}
+        for (_, local_name), value in attrs.items():
+            if local_name == 'href' and value.startswith('#'):
+                value = f"#\x01{value[1:]}\x02"
+            else:
+                value = _mark_url_refs(value)
+            local_attrs[local_name] = value
+        return local_attrs
+
+    # --- SAX EVENTS ---
+    def startElementNS(self, name, qname, attrs):
+        self._flush_text()
+        self.depth += 1
+        if self.depth == 1:
+            # Root <svg>: only its size matters, the caller wraps the children in a <g>
+            self.root_attrs = {local_name: value for (_, local_name), value in attrs.items()}
+            return
+
+        tag = name[1]
+        local_attrs = self._local_attrs(attrs)
+        parent = self.stack[-1] if self.stack else None
+        hoisting = self.shared.defs_out is not None
+
+        if hoisting and self.capture is None and (parent == 'defs' or (tag == 'symbol' and self.depth == 2)):
+            # Buffer the whole subtree so it can be hashed once it closes
+            old_id = local_attrs.pop('id', None)
+            self.capture = {'depth': self.depth, 'id': old_id, 'out': self.out, 'tag_open': self.tag_open}
+            self.out = io.StringIO()
+            self.tag_open = False
+        elif 'id' in local_attrs:
+            local_attrs['id'] = self._map_id(local_attrs['id'])
+
+        self._close_start_tag()
+
+        if hoisting and self.capture is None and tag == 'image':
+            tag, local_attrs = self._hoist_image(local_attrs)
+
+        self.stack.append(tag)
+        self.out.write(f"<{tag}{_format_attrs(local_attrs)}")
+        self.tag_open = True
+
+    def endElementNS(self, name, qname):
+        self._flush_text()
+        self.depth -= 1
+        if self.depth == 0:
+            return
+
+        tag = self.stack.pop()
+        if self.tag_open:
+            self.out.write(" />")
+            self.tag_open = False
+        else:
+            self.out.write(f"</{tag}>")
+
+        if self.capture is not None and self.capture['depth'] == self.depth + 1:
+            self._finish_capture(tag)
+
+    def characters(self, content):
+        if self.depth >= 1:
+            self.text.append(content)
+
+    # --- DEDUPLICATION ---
+    def _finish_capture(self, tag):
+        capture = self.capture
+        self.capture = None
+        fragment = self.out.getvalue()
+        self.out = capture['out']
+        self.tag_open = capture['tag_open']
+        old_id = capture['id']
+
+        # Only fragments whose references all point at ids defined earlier can be
+        # compared across files; anything else stays local to this file.
+        refs = _MARKER_RE.findall(fragment)
+        if all(ref in self.id_map for ref in refs):
+            resolved = _MARKER_RE.sub(lambda m: self.id_map[m.group(1)], fragment)
+            key = (hashlib.sha1(resolved.encode('utf-8')).hexdigest(), old_id is not None)
+
+            if key in self.shared.hashes:
+                if old_id is not None:
+                    self.id_map[old_id] = self.shared.hashes[key]
+                self.shared.deduped_count += 1
+                return
+
+            new_id = self._map_id(old_id) if old_id is not None else None
+            self.shared.hashes[key] = new_id
+            self.shared.defs_out.write(self._with_id(resolved, tag, new_id))
+            self.shared.hoisted_count += 1
+            return
+
+        new_id = self._map_id(old_id) if old_id is not None else None
+        self._close_start_tag()
+        self.out.write(self._with_id(fragment, tag, new_id))
+
+    def _with_id(self, fragment, tag, new_id):
+        if new_id is None:
+            return fragment
+        head = len(tag) + 1  # '<' + tag
+        return f"{fragment[:head]} id={quoteattr(new_id)}{fragment[head:]}"
+
+    def _hoist_image(self, local_attrs):
+        """Moves a large embedded data URI into the master <defs> and returns a <use> of it."""
+        href = local_attrs.get('href', '')
+        if not href.startswith('data:') or len(href) < DATA_URI_MIN_LENGTH:
+            return 'image', local_attrs
+
+        image_attrs = {'href': local_attrs.pop('href')}
+        for key in ('width', 'height', 'preserveAspectRatio'):
+            if key in local_attrs:
+                image_attrs[key] = local_attrs.pop(key)
+
+        key = hashlib.sha1(_format_attrs(image_attrs).encode('utf-8')).hexdigest()
+        master_id = self.shared.hashes.get(key)
+        if master_id is None:
+            master_id = self.shared.allocate_id(f"image_{self.shared.hoisted_count + 1}", "shared")
+            self.shared.hashes[key] = master_id
+            self.shared.defs_out.write(f"<image id={quoteattr(master_id)}{_format_attrs(image_attrs)} />")
+            self.shared.hoisted_count += 1
+        else:
+            self.shared.deduped_count += 1
+
+        use_attrs = {'href': f"#{master_id}"}
+        use_attrs.update(local_attrs)
+        return 'use', use_attrs
+
+    def result(self):
+        """The re-emitted children with every local reference resolved."""
+        return _MARKER_RE.sub(lambda m: self.id_map.get(m.group(1), m.group(1)), self.out.getvalue())
+
+def _stream_svg_children(file_path, shared, prefix):
+    """Returns (root_attributes, children_markup) for 'file_path'."""
+    handler = _GroupWriter(io.StringIO(), shared, prefix)
+    parser = xml.sax.make_parser()
+    parser.setFeature(feature_namespaces, True)
+    parser.setFeature(feature_external_ges, False)  # Never fetch external DTDs
+    parser.setContentHandler(handler)
+    parser.parse(file_path)
+    return handler.root_attrs, handler.result()
+
+# --- LAYOUT ---
+LAYOUT_MODES = ("grid", "fit", "pack")
+
+# CSS absolute units in user units (px)
+_UNIT_SCALE = {'': 1.0, 'px': 1.0, 'pt': 1.25, 'pc': 15.0, 'mm': 3.7795, 'cm': 37.795, 'in': 96.0}
+_LENGTH_RE = re.compile(r'^\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*([a-z]*)\s*$')
+
+def _parse_length(value):
+    match = _LENGTH_RE.match(value or '')
+    if not match or match.group(2) not in _UNIT_SCALE:
+        return None  # Missing, percentage or relative unit
+    return float(match.group(1)) * _UNIT_SCALE[match.group(2)]
+
+def _intrinsic_box(root_attrs):
+    """
+    Returns (min_x, min_y, width, height) of the content from the root's
+    viewBox, falling back to width/height. None if the size is unknown.
+    """
+    view_box = root_attrs.get('viewBox')
+    if view_box:
+        try:
+            min_x, min_y, width, height = [float(v) for v in view_box.replace(',', ' ').split()]
+            if width > 0 and height > 0:
+                return min_x, min_y, width, height
+        except ValueError:
+            pass
+
+    width = _parse_length(root_attrs.get('width'))
+    height = _parse_length(root_attrs.get('height'))
+    if width and height and width > 0 and height > 0:
+        return 0.0, 0.0, width, height
+    return None
+
+def _num(value):
+    return f"{value:.4f}".rstrip('0').rstrip('.')
+
+def _transform(x, y, scale=1.0, min_x=0.0, min_y=0.0):
+    transform = f"translate({_num(x)}, {_num(y)})"
+    if scale != 1.0:
+        transform += f" scale({_num(scale)})"
+    if min_x or min_y:
+        transform += f" translate({_num(-min_x)}, {_num(-min_y)})"
+    return transform
+
+class _ShelfPacker(object):
+    """Online first-fit shelf packer: places each item as it arrives in a strip of fixed width."""
+
+    def __init__(self, width, padding):
+        self.width = width
+        self.padding = padding
+        self.shelves = []  # [y, height, next_x]
+        self.height = 0
+        self.used_width = 0
+
+    def add(self, w, h):
+        for shelf in self.shelves:
+            y, shelf_height, x = shelf
+            if h <= shelf_height and x + w <= self.width:
+                shelf[2] = x + w + self.padding
+                self.used_width = max(self.used_width, x + w)
+                return x, y
+
+        y = self.height
+        self.shelves.append([y, h, w + self.padding])
+        self.height = y + h + self.padding
+        self.used_width = max(self.used_width, w)
+        return 0, y
+
+class _Layout(object):
+    """
+    Positions each item from its intrinsic size as it is streamed.
+    'grid': fixed cells, plain translate (original behaviour)
+    'fit':  fixed cells, each item scaled and centred to fit its cell
+    'pack': items keep their size (shrunk to item_size if larger) and are shelf-packed
+    """
+
+    def __init__(self, mode, item_size, padding, columns, total_items):
+        if mode not in LAYOUT_MODES:
+            raise ValueError(f"Unknown layout '{mode}'.")
+        self.mode = mode
+        self.item_size = item_size
+        self.padding = padding
+        self.columns = columns
+        self.total_items = total_items
+        self.packer = _ShelfPacker((item_size + padding) * columns, padding)
+
+    def place(self, index, box):
+        cell = self.item_size + self.padding
+
+        if self.mode == "pack":
+            if box is None:
+                x, y = self.packer.add(self.item_size, self.item_size)
+                return _transform(x, y)
+            min_x, min_y, width, height = box
+            scale = min(1.0, self.item_size / max(width, height))
+            x, y = self.packer.add(width * scale, height * scale)
+            return _transform(x, y, scale, min_x, min_y)
+
+        # Grid Math
+        x_pos = (index % self.columns) * cell
+        y_pos = (index // self.columns) * cell
+
+        if self.mode == "grid" or box is None:
+            return _transform(x_pos, y_pos)
+
+        min_x, min_y, width, height = box
+        scale = min(self.item_size / width, self.item_size / height)
+        x_pos += (self.item_size - width * scale) / 2
+        y_pos += (self.item_size - height * scale) / 2
+        return _transform(x_pos, y_pos, scale, min_x, min_y)
+
+    def canvas_size(self):
+        if self.mode == "pack":
+            return self.packer.used_width + self.padding, self.packer.height
+        rows = math.ceil(self.total_items / self.columns)
+        cell = self.item_size + self.padding
+        return cell * self.columns, cell * rows
+
+def merge_svgs_to_grid(input_folder, item_size=DEFAULT_ITEM_SIZE, padding=DEFAULT_PADDING, columns=DEFAULT_COLUMNS, progress_callback=None, dedupe_defs=True, layout="grid"):
+    """
+    Core logic to merge SVGs.
+    Each input is streamed straight into the output file, so memory stays
+    proportional to the largest single SVG rather than the whole set.
+    dedupe_defs (bool): Hoist identical <defs>/<symbol> children and embedded
+                        images into one master <defs> instead of repeating them.
+    layout (str): 'grid' (plain cells), 'fit' (scale each SVG to its cell using its
+                  viewBox/width/height) or 'pack' (shelf-pack items by their size).
     Returns: (success_boolean, message_string)
     """
     if not input_folder or not os.path.exists(input_folder):
@@ -29,69 +394,98 @@ def merge_svgs_to_grid(input_folder, item_size=DEFAULT_ITEM_SIZE, padding=DEFAUL
 
     # Determine output filename automatically
     output_file = os.path.join(os.path.dirname(input_folder), 'master_grid_sorted.svg')
-    
+
     files = [f for f in os.listdir(input_folder) if f.endswith('.svg')]
     files.sort()
-    
+
     if not files:
         return False, "No SVGs found in the selected folder."
 
-    # Calculate Canvas Size
     total_items = len(files)
-    rows = math.ceil(total_items / columns)
-    canvas_width = (item_size + padding) * columns
-    canvas_height = (item_size + padding) * rows
-
-    ET.register_namespace('', "http://www.w3.org/2000/svg")
-    master_root = ET.Element('svg', {
-        'xmlns': 'http://www.w3.org/2000/svg',
-        'xmlns:xlink': 'http://www.w3.org/1999/xlink',
-        'version': '1.1',
-        'viewBox': f'0 0 {canvas_width} {canvas_height}'
-    })
+    try:
+        grid = _Layout(layout, item_size, padding, columns, total_items)
+    except ValueError as e:
+        return False, str(e)
 
     processed_count = 0
     errors = []
+    temp_file = output_file + '.tmp'
+    body_file = output_file + '.body.tmp'
+    defs_file = output_file + '.defs.tmp'
+    layer_names = [os.path.splitext(f)[0] for f in files]
+    group_spans = []  # (offset, length) of each group in body_file
+    phases = instrument.phases()
 
-    for index, filename in enumerate(files):
-        file_path = os.path.join(input_folder, filename)
-        layer_name = os.path.splitext(filename)[0]
-        
-        try:
-            tree = ET.parse(file_path)
-            root = tree.getroot()
-            strip_namespace(root)
-
-            # Grid Math
-            col = index % columns
-            row = index // columns
-            x_pos = col * (item_size + padding)
-            y_pos = row * (item_size + padding)
-
-            new_group = ET.Element('g', {
-                'id': layer_name,
-                'transform': f'translate({x_pos}, {y_pos})'
-            })
-            
-            for child in root:
-                new_group.append(child)
-            
-            # Insert at 0 (Reverse Layer Order fix)
-            master_root.insert(0, new_group)
-            processed_count += 1
-            
-        except Exception as e:
-            errors.append(f"{filename}: {e}")
-
-    # Write final file
     try:
-        tree = ET.ElementTree(master_root)
-        tree.write(output_file, encoding='utf-8', xml_declaration=True)
+        # Groups and hoisted defs are streamed to separate temp files, then stitched
+        # together so the master <defs> can sit at the top of the document.
+        with open(body_file, 'wb') as body_out, \
+             open(defs_file, 'w', encoding='utf-8') as defs_out:
+            shared = _SharedDefs(defs_out if dedupe_defs else None, reserved_ids=layer_names)
+
+            for index, filename in enumerate(files):
+                file_path = os.path.join(input_folder, filename)
+
+                if progress_callback:
+                    progress_callback(index + 1, total_items, filename)
+
+                # One file is buffered at a time so a parse error never leaves half a group behind
+                phases.next("parse svgs")
+                instrument.count('bytes_read', os.path.getsize(file_path))
+                try:
+                    root_attrs, children = _stream_svg_children(file_path, shared, layer_names[index])
+                except Exception as e:
+                    errors.append(f"{filename}: {e}")
+                    continue
+
+                group_attrs = {
+                    'id': layer_names[index],
+                    'transform': grid.place(index, _intrinsic_box(root_attrs))
+                }
+                data = f"<g{_format_attrs(group_attrs)}>{children}</g>".encode('utf-8')
+                group_spans.append((body_out.tell(), len(data)))
+                body_out.write(data)
+                processed_count += 1
+
+        phases.next("write master svg")
+        canvas_width, canvas_height = grid.canvas_size()
+        master_attrs = {
+            'xmlns': 'http://www.w3.org/2000/svg',
+            'xmlns:xlink': 'http://www.w3.org/1999/xlink',
+            'version': '1.1',
+            'viewBox': f'0 0 {_num(canvas_width)} {_num(canvas_height)}'
+        }
+
+        with open(temp_file, 'wb') as out:
+            out.write(b"<?xml version='1.0' encoding='utf-8'?>\n")
+            out.write(f"<svg{_format_attrs(master_attrs)}>".encode('utf-8'))
+            if shared.hoisted_count:
+                out.write(b"<defs>")
+                with open(defs_file, 'rb') as f:
+                    shutil.copyfileobj(f, out)
+                out.write(b"</defs>")
+
+            # Copy the groups back last-to-first so the first file ends up on top (Reverse Layer Order fix)
+            with open(body_file, 'rb') as body_in:
+                for offset, length in reversed(group_spans):
+                    body_in.seek(offset)
+                    out.write(body_in.read(length))
+            out.write(b"</svg>")
+
+        os.replace(temp_file, output_file)
+        phases.end()
+        instrument.count('bytes_written', os.path.getsize(output_file))
     except Exception as e:
         return False, f"Failed to save file: {e}"
+    finally:
+        for path in (temp_file, body_file, defs_file):
+            if os.path.exists(path):
+                os.remove(path)
 
     result_msg = f"Success! Merged {processed_count} SVGs.\nSaved to: {output_file}"
+    if shared.deduped_count:
+        result_msg += f"\nShared {shared.hoisted_count} definitions, removed {shared.deduped_count} duplicates."
     if errors:
         result_msg += f"\n\nSkipped {len(errors)} files due to errors."
-    
-    return True, result_msg
\ No newline at end of file
+
+    return True, result_msg
@@ -0,0 +1,161 @@
+import os
+import hashlib
+import threading
+from core import instrument
+
+# Configuration defaults
+DEFAULT_MAX_CACHE_BYTES = 512 * 1024 * 1024   # 512 MB on disk
+CACHE_FORMAT = "WEBP"                         # Compact, keeps alpha
+CACHE_EXT = ".webp"
+CACHE_QUALITY = 90
+PRUNE_TARGET = 0.9                            # Prune down to 90% of the limit
+
+def default_cache_dir():
+    """Per-user cache folder (LOCALAPPDATA on Windows, XDG/~/.cache elsewhere)."""
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME')
+    if not base:
+        base = os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'FileManagementSuite', 'thumbnails')
+
+def _reduce(img, max_size):
+    """Decodes 'img' at reduced resolution and returns an RGB/RGBA thumbnail."""
+    from PIL import Image
+    # JPEG can decode straight at 1/2, 1/4 or 1/8 scale, which skips most of the work
+    img.draft(img.mode, (max_size, max_size))
+    img.thumbnail((max_size, max_size), Image.LANCZOS)
+
+    has_alpha = img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info
+    return img.convert('RGBA' if has_alpha else 'RGB')
+
+class ThumbnailCache(object):
+    """
+    On-disk cache of reduced-resolution images shared by the image and PDF tools.
+    Entries are keyed by source path + size + mtime + target size, so an edited
+    file is never served stale. The least recently used entries are pruned
+    once the cache grows past 'max_bytes'.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes = None  # Computed lazily on the first write
+
+    def _entry_path(self, image_path, max_size):
+        st = os.stat(image_path)
+        raw_key = f"{os.path.abspath(image_path)}|{st.st_size}|{st.st_mtime_ns}|{max_size}"
+        key = hashlib.sha1(raw_key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], key + CACHE_EXT)
+
+    def get_path(self, image_path, max_size):
+        """
+        Returns the path of a cached thumbnail of 'image_path' that fits inside
+        max_size x max_size, generating it on a miss.
+        """
+        from PIL import Image
+        entry = self._entry_path(image_path, max_size)
+
+        if os.path.exists(entry):
+            try:
+                os.utime(entry, None)  # Bump recency for LRU pruning
+            except OSError:
+                pass
+            self.hits += 1
+            instrument.count('cache_hits')
+            return entry
+
+        self.misses += 1
+        instrument.count('cache_misses')
+        with Image.open(image_path) as img:
+            thumb = _reduce(img, max_size)
+
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        # Write to a temp name first so concurrent readers never see a partial file
+        tmp_path = f"{entry}.{os.getpid()}.{threading.get_ident()}.tmp"
+        thumb.save(tmp_path, CACHE_FORMAT, quality=CACHE_QUALITY)
+        os.replace(tmp_path, entry)
+
+        self._account(os.path.getsize(entry))
+        return entry
+
+    def get(self, image_path, max_size):
+        """Returns a loaded PIL image of the cached thumbnail."""
+        from PIL import Image
+        with Image.open(self.get_path(image_path, max_size)) as img:
+            img.load()
+            return img.copy()
+
+    def clear(self):
+        """Removes every cached entry."""
+        with self._lock:
+            for path, _, _ in self._scan():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._total_bytes = 0
+
+    # --- SIZE ACCOUNTING ---
+    def _scan(self):
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(CACHE_EXT):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((entry.path, st.st_size, st.st_mtime))
+        return entries
+
+    def _account(self, added_bytes):
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._scan())
+            else:
+                self._total_bytes += added_bytes
+
+            if self._total_bytes > self.max_bytes:
+                self._prune()
+
+    def _prune(self):
+        """Deletes the least recently used entries until under the target size."""
+        entries = self._scan()
+        entries.sort(key=lambda e: e[2])  # Oldest access first
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * PRUNE_TARGET
+
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._total_bytes = total
+
+# Shared instance used by the tools
+_default_cache = None
+_default_lock = threading.Lock()
+
+def get_default_cache():
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ThumbnailCache()
+        return _default_cache
+
+def get_thumbnail_path(image_path, max_size):
+    """Convenience wrapper around the shared cache."""
+    return get_default_cache().get_path(image_path, max_size)
+
+def get_thumbnail(image_path, max_size):
+    """Convenience wrapper around the shared cache."""
+    return get_default_cache().get(image_path, max_size)
@@ -0,0 +1,555 @@
+import os
+import sys
+import time
+import select
+import struct
+from core import pdf_processor, photo_organizer, structure_sorter, instrument
+
+# Configuration defaults
+SETTLE_SECONDS = 2.0           # Quiet time before a file is checked for stability
+MAX_BATCH_DELAY = 30.0         # Longest a stable file waits for a burst to finish
+MAX_BATCH_FILES = 500          # Files per batch before it is sent regardless
+TICK_SECONDS = 0.5             # Longest wait for events between stability checks
+POLL_SECONDS = 2.0             # Rescan interval of the polling fallback
+PRODUCED_IGNORE_SECONDS = 60   # Events for files the pipeline just wrote are dropped this long
+COMPRESSED_FOLDER = "compressed_pdfs"
+PARTIAL_SUFFIXES = ('.part', '.partial', '.crdownload', '.download', '.tmp', '.temp')
+
+# Pipeline steps, always run in this order on each batch
+COMPRESS_PDFS = "compress_pdfs"
+ORGANIZE_PHOTOS = "organize_photos"
+SORT_EXTENSIONS = "sort_extensions"
+STEPS = (COMPRESS_PDFS, ORGANIZE_PHOTOS, SORT_EXTENSIONS)
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+# No IN_MODIFY: a large copy would send one event per write; growth is caught by the stability check
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+EVENT_HEADER = struct.Struct('iIII')
+
+# Event kinds reported by the backends
+CHANGED = "changed"    # Created, written, or moved in; maybe still being written
+GONE = "gone"          # Deleted or moved away
+RESCAN = "rescan"      # Events were lost: rescan the folder
+
+def _is_output_dir(name):
+    """Folders the pipeline writes into; never watched so its own output is not picked up again."""
+    return name == COMPRESSED_FOLDER or name.endswith("_Files")
+
+def _is_candidate(name):
+    return not name.startswith(('.', '~$')) and not name.lower().endswith(PARTIAL_SUFFIXES)
+
+def _list_files(folder, recursive):
+    """Files below folder (only its own files unless recursive), skipping pipeline output folders."""
+    found = []
+    stack = [folder]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive and not _is_output_dir(entry.name):
+                                stack.append(entry.path)
+                        elif _is_candidate(entry.name):
+                            found.append(entry.path)
+                    except OSError:
+                        pass
+        except OSError as e:
+            print(f"Watch Error {current}: {e}")
+    return found
+
+# --- BACKENDS ---
+class InotifyBackend(object):
+    """Linux inotify through ctypes: one watch per folder, events read without polling the disk."""
+
+    def __init__(self, folders, recursive):
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._add_watch.restype = ctypes.c_int
+        self._ctypes = ctypes
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code))
+        self.recursive = recursive
+        self.paths = {}   # watch descriptor -> folder
+        try:
+            for folder in folders:
+                self._watch_tree(folder)
+        except OSError:
+            self.close()
+            raise
+
+    def _watch(self, folder):
+        wd = self._add_watch(self.fd, os.fsencode(folder), WATCH_MASK)
+        if wd < 0:
+            code = self._ctypes.get_errno()
+            raise OSError(code, f"{os.strerror(code)} (inotify watch on {folder}; see fs.inotify.max_user_watches)")
+        self.paths[wd] = folder
+
+    def _watch_tree(self, folder):
+        self._watch(folder)
+        if not self.recursive:
+            return
+        for root, dirs, _ in os.walk(folder):
+            dirs[:] = [d for d in dirs if not _is_output_dir(d)]
+            for d in dirs:
+                self._watch(os.path.join(root, d))
+
+    def read(self, timeout):
+        """Events as (path, kind) after waiting up to 'timeout' seconds."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        data = b""
+        while True:
+            try:
+                chunk = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            data += chunk
+        events = []
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = os.fsdecode(data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0"))
+            offset += EVENT_HEADER.size + length
+            events.extend(self._translate(wd, mask, name))
+        return events
+
+    def _translate(self, wd, mask, name):
+        if mask & IN_Q_OVERFLOW:
+            return [(folder, RESCAN) for folder in set(self.paths.values())]
+        folder = self.paths.get(wd)
+        if folder is None:
+            return []
+        if mask & IN_IGNORED:
+            del self.paths[wd]
+            return []
+        if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+            return [(folder, GONE)]
+        path = os.path.join(folder, name)
+        if mask & IN_ISDIR:
+            if self.recursive and mask & (IN_CREATE | IN_MOVED_TO) and not _is_output_dir(name):
+                # Files can land in a new folder before its watch exists: pick them up with a scan
+                try:
+                    self._watch_tree(path)
+                except OSError as e:
+                    print(f"Watch Error {path}: {e}")
+                return [(path, RESCAN)]
+            return []
+        if mask & (IN_DELETE | IN_MOVED_FROM):
+            return [(path, GONE)]
+        return [(path, CHANGED)]
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+class PollingBackend(object):
+    """
+    Fallback for systems without inotify (Windows, macOS, network shares):
+    every POLL_SECONDS each folder is stat'ed and only folders whose mtime
+    changed are listed again.
+    """
+
+    def __init__(self, folders, recursive, interval=POLL_SECONDS):
+        self.recursive = recursive
+        self.interval = interval
+        self.listings = {}    # folder -> (mtime_ns, {name: (size, mtime_ns)}, [subfolders])
+        self._last_poll = time.monotonic()
+        self.roots = list(folders)
+        for folder in self.roots:
+            self._scan(folder, report=False)
+
+    def _scan(self, folder, report=True):
+        events = []
+        stack = [folder]
+        seen = set()
+        while stack:
+            current = stack.pop()
+            try:
+                mtime_ns = os.stat(current).st_mtime_ns
+            except OSError:
+                continue
+            seen.add(current)
+            old = self.listings.get(current)
+            if old and old[0] == mtime_ns:
+                stack.extend(old[2])
+                continue
+            files, subdirs = {}, []
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if self.recursive and not _is_output_dir(entry.name):
+                                    subdirs.append(entry.path)
+                            else:
+                                st = entry.stat(follow_symlinks=False)
+                                files[entry.name] = (st.st_size, st.st_mtime_ns)
+                        except OSError:
+                            pass
+            except OSError:
+                continue
+            if report:
+                previous = old[1] if old else {}
+                for name, signature in files.items():
+                    if previous.get(name) != signature:
+                        events.append((os.path.join(current, name), CHANGED))
+                for name in previous:
+                    if name not in files:
+                        events.append((os.path.join(current, name), GONE))
+            self.listings[current] = (mtime_ns, files, subdirs)
+            stack.extend(subdirs)
+        # Folders that disappeared below this root
+        prefix = os.path.join(folder, "")
+        for current in [path for path in self.listings if path not in seen and (path == folder or path.startswith(prefix))]:
+            del self.listings[current]
+        return events
+
+    def read(self, timeout):
+        wait = self._last_poll + self.interval - time.monotonic()
+        if wait > 0:
+            time.sleep(min(wait, timeout))
+            if wait > timeout:
+                return []
+        self._last_poll = time.monotonic()
+        events = []
+        for folder in self.roots:
+            events.extend(self._scan(folder))
+        return events
+
+    def close(self):
+        pass
+
+def open_for_writing(paths):
+    """
+    The subset of 'paths' some process still has open for writing. Linux
+    reads /proc/<pid>/fd; Windows tries to open each file (a writer holding
+    it locks it); elsewhere nothing is detected and size stability decides.
+    """
+    paths = set(paths)
+    busy = set()
+    if sys.platform.startswith('linux') and os.path.isdir('/proc'):
+        for pid in os.listdir('/proc'):
+            if not pid.isdigit():
+                continue
+            fd_dir = f"/proc/{pid}/fd"
+            try:
+                fds = os.listdir(fd_dir)
+            except OSError:
+                continue  # Gone, or another user's process
+            for fd in fds:
+                try:
+                    target = os.readlink(f"{fd_dir}/{fd}")
+                    if target not in paths:
+                        continue
+                    with open(f"/proc/{pid}/fdinfo/{fd}") as f:
+                        flags = next(int(line.split()[1], 8) for line in f if line.startswith('flags:'))
+                except (OSError, StopIteration, ValueError):
+                    continue
+                if flags & os.O_ACCMODE in (os.O_WRONLY, os.O_RDWR):
+                    busy.add(target)
+    elif os.name == 'nt':
+        for path in paths:
+            try:
+                os.close(os.open(path, os.O_RDWR))
+            except PermissionError:
+                busy.add(path)
+            except OSError:
+                pass
+    return busy
+
+# --- STABILITY ---
+class _Pending(object):
+    __slots__ = ('last_event', 'signature')
+
+    def __init__(self, now):
+        self.last_event = now
+        self.signature = None
+
+def _signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+class StabilityTracker(object):
+    """
+    Files seen in events wait until they have been quiet for 'settle'
+    seconds, their size and mtime have not moved since the last event and no
+    process has them open for writing. Stable files are handed out in
+    batches once a burst of drops is over.
+    """
+
+    def __init__(self, settle=SETTLE_SECONDS, max_delay=MAX_BATCH_DELAY, max_files=MAX_BATCH_FILES):
+        self.settle = settle
+        self.max_delay = max_delay
+        self.max_files = max_files
+        self.pending = {}
+        self.ready = {}     # path -> time it became stable
+
+    def touch(self, path, now=None):
+        now = time.monotonic() if now is None else now
+        self.ready.pop(path, None)
+        entry = self.pending.get(path)
+        if entry is None:
+            entry = self.pending[path] = _Pending(now)
+        entry.last_event = now
+        entry.signature = _signature(path)
+
+    def forget(self, path):
+        self.pending.pop(path, None)
+        self.ready.pop(path, None)
+
+    def check(self, now=None):
+        """Moves settled files to the ready set. Returns a batch (list of paths) when one is due, else []."""
+        now = time.monotonic() if now is None else now
+        settled = []
+        for path, entry in list(self.pending.items()):
+            if now - entry.last_event < self.settle:
+                continue
+            signature = _signature(path)
+            if signature is None:
+                del self.pending[path]
+            elif signature != entry.signature:
+                # Still growing: wait another settle period
+                entry.signature = signature
+                entry.last_event = now
+            else:
+                settled.append(path)
+        if settled:
+            busy = open_for_writing(settled)
+            for path in settled:
+                if path in busy:
+                    self.pending[path].last_event = now
+                else:
+                    del self.pending[path]
+                    self.ready[path] = now
+
+        if not self.ready:
+            return []
+        oldest = min(self.ready.values())
+        burst_over = not self.pending
+        if burst_over or now - oldest >= self.max_delay or len(self.ready) >= self.max_files:
+            batch = sorted(self.ready)[:self.max_files]
+            for path in batch:
+                del self.ready[path]
+            return batch
+        return []
+
+# --- PIPELINE ---
+class WatchPipeline(object):
+    """
+    The steps run on each batch of new files in a watched folder, in STEPS
+    order: PDFs are compressed into compressed_pdfs/, dated files are moved
+    into date folders, and whatever is left is sorted into <EXT>_Files.
+    Paths the steps wrote are collected in 'produced' so the watcher can
+    ignore their events.
+    """
+
+    def __init__(self, steps, photo_options=None, centralize=False):
+        unknown = [step for step in steps if step not in STEPS]
+        if unknown:
+            raise ValueError(f"Unknown pipeline steps: {', '.join(unknown)}")
+        self.steps = [step for step in STEPS if step in steps]
+        self.photo_options = photo_options or {}
+        self.centralize = centralize
+        self.produced = []
+
+    def run(self, root, files, progress_callback=None, workers=None, stop_event=None):
+        """Runs the steps on 'files' (all inside 'root'). Returns (success, message)."""
+        self.produced = []
+        remaining = [path for path in files if os.path.isfile(path)]
+        lines = []
+        success = True
+        for step in self.steps:
+            if not remaining or (stop_event and stop_event.is_set()):
+                break
+            try:
+                with instrument.stage(f"watch {step}"):
+                    ok, msg = getattr(self, f"_{step}")(root, remaining, progress_callback, workers, stop_event)
+            except Exception as e:
+                # One bad batch must not end the watch
+                print(f"Watch Error {step}: {e}")
+                ok, msg = False, f"{step} failed: {e}"
+            success = success and ok
+            if msg:
+                lines.append(msg)
+            remaining = [path for path in remaining if os.path.isfile(path)]
+        return success, f"{os.path.basename(root) or root}: {len(files)} new files\n" + "\n".join(lines)
+
+    def _compress_pdfs(self, root, files, progress_callback, workers, stop_event):
+        pdfs = [path for path in files if path.lower().endswith('.pdf')]
+        if not pdfs:
+            return True, ""
+        errors = []
+        for i, path in enumerate(pdfs):
+            if stop_event and stop_event.is_set():
+                break
+            if progress_callback:
+                progress_callback(i + 1, len(pdfs), f"Compressing {os.path.basename(path)}")
+            output_dir = os.path.join(os.path.dirname(path), COMPRESSED_FOLDER)
+            os.makedirs(output_dir, exist_ok=True)
+            output_path = os.path.join(output_dir, os.path.basename(path))
+            ok, msg = pdf_processor.compress_pdf(path, output_path)
+            if ok:
+                self.produced.append(output_path)
+            else:
+                errors.append(msg)
+        return not errors, "\n".join([f"Compressed {len(pdfs) - len(errors)} PDFs."] + errors)
+
+    def _moved(self, plan, stats):
+        failed = {src for src, _, _ in stats['failed']}
+        moved = [dst for src, dst in zip(plan.sources, plan.destinations) if src not in failed]
+        self.produced.extend(moved)
+        return len(moved)
+
+    def _organize_photos(self, root, files, progress_callback, workers, stop_event):
+        try:
+            plan = photo_organizer.plan_organize_by_date(root, files=files, **self.photo_options)
+        except FileNotFoundError:
+            return False, "ExifTool not found; photos were not organized."
+        if not len(plan):
+            return True, ""
+        stats = plan.execute(workers=workers, progress_callback=progress_callback, stop_event=stop_event)
+        return not stats['failed'], f"Organized {self._moved(plan, stats)} files into date folders."
+
+    def _sort_extensions(self, root, files, progress_callback, workers, stop_event):
+        plan = structure_sorter.plan_sort_by_extension([root], self.centralize, files=files)
+        if not len(plan):
+            return True, ""
+        stats = plan.execute(workers=workers, progress_callback=progress_callback, stop_event=stop_event)
+        return not stats['failed'], f"Sorted {self._moved(plan, stats)} files by file type."
+
+# --- WATCHER ---
+class FolderWatcher(object):
+    """
+    Watches hot folders and calls on_batch(root, files) with each batch of
+    new, stable files. inotify is used where available (Linux), otherwise
+    folders are polled. on_batch may return paths it wrote; their own
+    events are ignored for PRODUCED_IGNORE_SECONDS.
+    """
+
+    def __init__(self, folders, recursive=False, settle=SETTLE_SECONDS, polling=False, include_existing=False):
+        self.folders = [os.path.abspath(folder) for folder in folders]
+        self.recursive = recursive
+        self.include_existing = include_existing
+        self.tracker = StabilityTracker(settle)
+        self.backend = None
+        self.polling = polling
+        self._ignored = {}
+
+    def _open_backend(self):
+        if not self.polling and sys.platform.startswith('linux'):
+            try:
+                return InotifyBackend(self.folders, self.recursive)
+            except (OSError, AttributeError) as e:
+                print(f"inotify unavailable ({e}); polling every {POLL_SECONDS:.0f}s instead.")
+        self.polling = True
+        return PollingBackend(self.folders, self.recursive)
+
+    def _root_of(self, path):
+        for folder in self.folders:
+            if path == folder or path.startswith(os.path.join(folder, "")):
+                return folder
+        return None
+
+    def _handle(self, path, kind, now):
+        if kind == GONE:
+            self.tracker.forget(path)
+            return
+        if kind == RESCAN:
+            for found in _list_files(path, self.recursive):
+                self._handle(found, CHANGED, now)
+            return
+        if not _is_candidate(os.path.basename(path)):
+            return
+        expires = self._ignored.get(path)
+        if expires is not None:
+            if expires > now:
+                return
+            del self._ignored[path]
+        self.tracker.touch(path, now=now)
+
+    def run(self, on_batch, stop_event=None):
+        """Blocks until stop_event is set. Returns (success, message)."""
+        self.backend = self._open_backend()
+        batches = files = 0
+        try:
+            if self.include_existing:
+                for folder in self.folders:
+                    self._handle(folder, RESCAN, time.monotonic())
+            while not (stop_event and stop_event.is_set()):
+                events = self.backend.read(TICK_SECONDS)
+                now = time.monotonic()
+                for path, kind in events:
+                    self._handle(path, kind, now)
+                batch = self.tracker.check(now)
+                if not batch:
+                    continue
+                by_root = {}
+                for path in batch:
+                    root = self._root_of(path)
+                    if root:
+                        by_root.setdefault(root, []).append(path)
+                for root, paths in by_root.items():
+                    produced = on_batch(root, paths) or []
+                    expires = time.monotonic() + PRODUCED_IGNORE_SECONDS
+                    for path in produced:
+                        self._ignored[path] = expires
+                    batches += 1
+                    files += len(paths)
+                self._ignored = {path: t for path, t in self._ignored.items() if t > now}
+        finally:
+            self.backend.close()
+        mode = "polling" if self.polling else "inotify"
+        return True, f"Stopped watching {len(self.folders)} folders ({mode}): {files} files in {batches} batches."
+
+def watch_folders(folders, steps, recursive=False, settle=SETTLE_SECONDS, polling=False, include_existing=False,
+                  photo_options=None, centralize=False, workers=None, stop_event=None, progress_callback=None,
+                  batch_callback=None):
+    """
+    Watch mode without a UI: runs the pipeline inline on each batch until
+    stop_event is set. batch_callback(root, files, success, message) is
+    called after each batch. Returns (success, message).
+    """
+    for folder in folders:
+        if not os.path.isdir(folder):
+            return False, f"Not a folder: {folder}"
+    try:
+        pipeline = WatchPipeline(steps, photo_options, centralize)
+    except ValueError as e:
+        return False, str(e)
+
+    def on_batch(root, files):
+        with instrument.recording(f"Watch batch {os.path.basename(root)}") as stats:
+            success, msg = pipeline.run(root, files, progress_callback, workers, stop_event)
+        print(stats.summary())
+        if batch_callback:
+            batch_callback(root, files, success, msg)
+        return pipeline.produced
+
+    watcher = FolderWatcher(folders, recursive, settle, polling, include_existing)
+    return watcher.run(on_batch, stop_event)
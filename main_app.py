@@ -1,16 +1,66 @@
+import time
+STARTUP_START = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk
 import os
+import sys
+import multiprocessing
 
 # --- IMPORT MODULES ---
-from ui.pdf_tools_tab import PDFToolsTab
-from ui.sorting_tools_tab import SortingToolsTab
-from ui.batch_tab import BatchToolsTab
-from ui.renamer_tab import RenamerTab
-from ui.mask_tab import MaskToolsTab
-from ui.svg_tab import SVGToolsTab
+# Tab modules (and the PDF/imaging libraries behind them) are imported when a
+# tab is first selected; see the tab factories below.
+from ui.ui_utils import LazyNotebook
 from core.theme import COLORS, FONTS # Import your new theme
 
+# --- TAB FACTORIES ---
+# Plain import statements (not importlib) so PyInstaller still bundles the tabs
+def _batch_images_tab(parent, main_window):
+    from ui.batch_tab import BatchToolsTab
+    return BatchToolsTab(parent, main_window=main_window)
+
+def _renamer_tab(parent, main_window):
+    from ui.renamer_tab import RenamerTab
+    return RenamerTab(parent, main_window=main_window)
+
+def _mask_tab(parent, main_window):
+    from ui.mask_tab import MaskToolsTab
+    return MaskToolsTab(parent, main_window=main_window)
+
+def _svg_tab(parent, main_window):
+    from ui.svg_tab import SVGToolsTab
+    return SVGToolsTab(parent, main_window=main_window)
+
+def _pdf_tools_tab(parent, main_window):
+    from ui.pdf_tools_tab import PDFToolsTab
+    return PDFToolsTab(parent, main_window=main_window)
+
+def _sorting_tools_tab(parent, main_window):
+    from ui.sorting_tools_tab import SortingToolsTab
+    return SortingToolsTab(parent, main_window=main_window)
+
+def _jobs_tab(parent, main_window):
+    from ui.jobs_tab import JobsTab
+    return JobsTab(parent, main_window=main_window)
+
+# (tab text, factory, attribute on the main window)
+BATCH_TABS = [
+    ("Batch Images", _batch_images_tab, "batch_tab"),
+    ("Renamer", _renamer_tab, "renamer_tab"),
+    ("Crop/Mask", _mask_tab, "mask_tab"),
+    ("SVG Merger", _svg_tab, "svg_tab"),
+]
+MAIN_TABS = [
+    ("PDF Tools", _pdf_tools_tab, "pdf_tools_tab"),
+    ("Sorting Tools", _sorting_tools_tab, "sorting_tools_tab"),
+    ("Jobs", _jobs_tab, "jobs_tab"),
+]
+
+# --- STARTUP REPORT ---
+# Run with --startup-report (optionally under "python -X importtime") to check start-up cost
+STARTUP_TARGET_SECONDS = 0.5
+HEAVY_MODULES = ("fitz", "pymupdf", "pikepdf", "reportlab", "PIL")
+
 class FileManagementSuite(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -67,30 +117,19 @@ class FileManagementSuite(tk.Tk):
             foreground=[('selected', 'white')]
         )
         # --- MAIN NOTEBOOK ---
-        self.notebook = ttk.Notebook(self)
+        self.notebook = LazyNotebook(self)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.lazy_notebooks = [self.notebook]
 
         # --- LOAD TABS ---
-        
+        # Each tab is built the first time it is selected
+
         # 1. Batch Processing
-        batch_notebook = ttk.Notebook(self.notebook)
-        self.batch_tab = BatchToolsTab(batch_notebook, main_window=self)
-        self.renamer_tab = RenamerTab(batch_notebook, main_window=self)
-        self.mask_tab = MaskToolsTab(batch_notebook, main_window=self)
-        self.svg_tab = SVGToolsTab(batch_notebook, main_window=self)
-        batch_notebook.add(self.batch_tab, text="Batch Images")
-        batch_notebook.add(self.renamer_tab, text="Renamer")
-        batch_notebook.add(self.mask_tab, text="Crop/Mask")
-        batch_notebook.add(self.svg_tab, text="SVG Merger")
-        self.notebook.add(batch_notebook, text="Batch Processing")
-
-        # 2. PDF Tools
-        self.pdf_tools_tab = PDFToolsTab(self.notebook, main_window=self)
-        self.notebook.add(self.pdf_tools_tab, text="PDF Tools")
-
-        # 3. Sorting Tools
-        self.sorting_tools_tab = SortingToolsTab(self.notebook, main_window=self)
-        self.notebook.add(self.sorting_tools_tab, text="Sorting Tools")
+        self.notebook.add_lazy(self._create_batch_notebook, text="Batch Processing")
+
+        # The other top-level tabs (PDF Tools, Sorting Tools, Jobs), in MAIN_TABS order
+        for text, factory, attr in MAIN_TABS:
+            self.notebook.add_lazy(self._tab_factory(factory, attr), text=text)
 
         # --- GLOBAL STATUS BAR ---
         self.progress_frame = ttk.Frame(self, padding=10)
@@ -100,6 +139,41 @@ class FileManagementSuite(tk.Tk):
         self.progress_bar = ttk.Progressbar(self.progress_frame, orient="horizontal", mode="determinate")
         self.progress_bar.pack(fill=tk.X, pady=2)
 
+    def _tab_factory(self, factory, attr):
+        """Wraps a tab factory so the built tab is also kept as self.<attr>."""
+        def build(parent):
+            tab = factory(parent, self)
+            setattr(self, attr, tab)
+            return tab
+        return build
+
+    def _create_batch_notebook(self, parent):
+        batch_notebook = LazyNotebook(parent)
+        for text, factory, attr in BATCH_TABS:
+            batch_notebook.add_lazy(self._tab_factory(factory, attr), text=text)
+        self.lazy_notebooks.append(batch_notebook)
+        return batch_notebook
+
+    def print_startup_report(self):
+        """Time until the first tab is drawn, per-tab build times and heavy libraries loaded so far."""
+        self.update_idletasks()  # Finish building and drawing the visible tab
+        elapsed = time.perf_counter() - STARTUP_START
+        status = "OK" if elapsed <= STARTUP_TARGET_SECONDS else "over target"
+        print(f"Startup: interactive after {elapsed * 1000:.0f} ms ({status}, target {STARTUP_TARGET_SECONDS * 1000:.0f} ms)")
+        for notebook in self.lazy_notebooks:
+            for text, seconds in notebook.build_times.items():
+                print(f"  tab '{text}' built in {seconds * 1000:.0f} ms")
+        loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+        print(f"  heavy libraries loaded: {', '.join(loaded) if loaded else 'none'}")
+
 if __name__ == "__main__":
+    # Required for process pools in the frozen (PyInstaller) Windows build
+    multiprocessing.freeze_support()
+    if "--profile" in sys.argv:
+        # Every job also writes a cProfile dump and a folded-stack trace
+        from core import instrument
+        instrument.enable_profiling()
     app = FileManagementSuite()
+    if "--startup-report" in sys.argv:
+        app.after(0, app.print_startup_report)
     app.mainloop()
\ No newline at end of file
@@ -1,13 +1,15 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import threading
 from core import general_tools 
+from core import job_engine
 from ui.ui_utils import DirectorySelector
+from ui.event_bus import get_event_bus
 
 class BatchToolsTab(ttk.Frame):
     def __init__(self, parent, main_window=None):
         super().__init__(parent, padding=10)
         self.main_window = main_window
+        self.events = get_event_bus(self)
 
         self.grid_columnconfigure(0, weight=1)
         
@@ -55,7 +57,7 @@ class BatchToolsTab(ttk.Frame):
             qual = int(self.batch_quality_scale.get())
             
             self.run_btn.config(state="disabled")
-            threading.Thread(target=self._run_thread, args=(source, dest, pct, fmt, qual), daemon=True).start()
+            job_engine.get_engine().submit("Batch resize", self._run_thread, source, dest, pct, fmt, qual, workers=1)
         except Exception as e:
             messagebox.showerror("Error", str(e))
             self.run_btn.config(state="normal")
@@ -67,15 +69,18 @@ class BatchToolsTab(ttk.Frame):
                 self.main_window.progress_bar['maximum'] = total
                 self.main_window.progress_bar['value'] = current
 
-    def _run_thread(self, s, d, p, f, q):
+    def _run_thread(self, s, d, p, f, q, job):
         # We define a callback lambda to pass to the logic
-        cb = lambda c, t, file: self.after(0, self._update_progress, c, t, file)
+        cb = job.progress(self.events.progress(self._update_progress))
         
-        count = general_tools.batch_process_images(s, d, p, f, q, progress_callback=cb)
+        try:
+            msg = f"Processed {general_tools.batch_process_images(s, d, p, f, q, progress_callback=cb)} images."
+        except job_engine.JobCancelled:
+            msg = "Batch cancelled."
         
-        self.after(0, lambda: self.run_btn.config(state="normal"))
+        self.events.call(lambda: self.run_btn.config(state="normal"))
         if self.main_window:
-            self.after(0, lambda: self.main_window.progress_label.config(text="Ready."))
-            self.after(0, lambda: self.main_window.progress_bar.config(value=0))
+            self.events.call(lambda: self.main_window.progress_label.config(text="Ready."))
+            self.events.call(lambda: self.main_window.progress_bar.config(value=0))
             
-        self.after(0, lambda: messagebox.showinfo("Done", f"Processed {count} images."))
+        self.events.call(lambda: messagebox.showinfo("Done", msg))
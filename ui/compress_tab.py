@@ -1,14 +1,15 @@
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext
+from tkinter import ttk, filedialog, messagebox
 from pathlib import Path
-import threading
-import pikepdf
+from core import job_engine, pdf_processor
 from ui.ui_utils import DirectorySelector
+from ui.event_bus import get_event_bus
+from ui.log_view import LogView
 
 class CompressTab(ttk.Frame):
     def __init__(self, parent, main_window=None):
         super().__init__(parent, padding=10)
         self.main_window = main_window
+        self.events = get_event_bus(self)
 
         self.grid_columnconfigure(0, weight=1)
 
@@ -29,18 +30,15 @@ class CompressTab(ttk.Frame):
         log_frame.grid_columnconfigure(0, weight=1)
         log_frame.grid_rowconfigure(0, weight=1)
 
-        self.log_area = scrolledtext.ScrolledText(log_frame, height=15, state='disabled', font=("Consolas", 9))
-        self.log_area.grid(row=0, column=0, sticky="nsew")
+        self.log_view = LogView(log_frame, name="compress_pdfs", height=15)
+        self.log_view.grid(row=0, column=0, sticky="nsew")
 
         self.grid_rowconfigure(1, weight=1)
 
 
     def log(self, message):
-        """Updates the text area in a thread-safe way"""
-        self.log_area.config(state='normal')
-        self.log_area.insert(tk.END, message + "\n")
-        self.log_area.see(tk.END)
-        self.log_area.config(state='disabled')
+        """Queues a log line; safe to call from the worker thread"""
+        self.log_view.write(message)
 
     def start_thread(self):
         """Runs compression in a separate thread to keep UI responsive"""
@@ -50,16 +48,14 @@ class CompressTab(ttk.Frame):
             return
 
         self.btn_run.config(state="disabled", text="Processing...")
-        self.log_area.config(state='normal')
-        self.log_area.delete(1.0, tk.END) # Clear previous logs
-        self.log_area.config(state='disabled')
+        self.log_view.clear() # Clear previous logs
         if self.main_window:
             self.main_window.progress_label.config(text="Compressing PDFs...")
             self.main_window.progress_bar.start()
 
-        threading.Thread(target=self.run_compression, args=(source_dir,), daemon=True).start()
+        job_engine.get_engine().submit("Compress PDFs", self.run_compression, source_dir, workers=1)
 
-    def run_compression(self, source_directory):
+    def run_compression(self, source_directory, job):
         source_path = Path(source_directory)
         output_path = source_path / "compressed_pdfs"
 
@@ -71,35 +67,27 @@ class CompressTab(ttk.Frame):
             files = list(source_path.glob("*.pdf"))
             if not files:
                 self.log("No PDF files found in this directory.")
-                self.after(0, self.reset_ui)
+                self.events.call(self.reset_ui)
                 return
 
             total_saved = 0
+            progress = job.progress(raise_on_cancel=False)
             
             for i, file_path in enumerate(files):
-                try:
-                    if self.main_window:
-                        # This progress update is a bit tricky with indeterminate mode
-                        pass
-
-                    output_filename = output_path / file_path.name
-                    
-                    with pikepdf.open(file_path) as pdf:
-                        pdf.remove_unreferenced_resources()
-                        pdf.save(output_filename, compress_streams=True, linearize=True)
-                    
-                    # Stats
-                    original_size = file_path.stat().st_size
-                    new_size = output_filename.stat().st_size
-                    savings = original_size - new_size
-                    savings_percent = (savings / original_size) * 100 if original_size > 0 else 0
-                    total_saved += savings
-                    
+                if job.stop_event.is_set():
+                    self.log("Cancelled.")
+                    break
+                # The bar stays indeterminate; this feeds the job queue
+                progress(i, len(files), file_path.name)
+
+                output_filename = output_path / file_path.name
+                success, msg = pdf_processor.compress_pdf(str(file_path), str(output_filename))
+                if success:
+                    total_saved += file_path.stat().st_size - output_filename.stat().st_size
                     self.log(f"✔ {file_path.name}")
-                    self.log(f"   Saved {savings_percent:.1f}% ({original_size/1024:.0f}KB -> {new_size/1024:.0f}KB)")
-                    
-                except Exception as e:
-                    self.log(f"✘ Error on {file_path.name}: {e}")
+                    self.log(f"   {msg}")
+                else:
+                    self.log(f"✘ {msg}")
 
             self.log("-" * 40)
             self.log(f"All done! Total space saved: {total_saved/1024/1024:.2f} MB")
@@ -108,7 +96,7 @@ class CompressTab(ttk.Frame):
         except Exception as e:
             self.log(f"Critical Error: {e}")
         
-        self.after(0, self.reset_ui)
+        self.events.call(self.reset_ui)
 
     def reset_ui(self):
         self.btn_run.config(state="normal", text="Start Compression")
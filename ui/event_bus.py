@@ -0,0 +1,92 @@
+import threading
+import collections
+
+# Configuration defaults
+FRAME_MS = 50                  # Drain interval (20 UI updates per second)
+MAX_EVENTS_PER_FRAME = 20000   # Anything beyond this waits for the next frame
+
+# Event kinds
+_PROGRESS = 0
+_LOG = 1
+_CALL = 2
+
+class EventBus(object):
+    """
+    Hands events from worker threads to the Tk thread. Workers only append to
+    a deque (no Tk calls); one after() poller on the Tk thread drains it
+    every FRAME_MS. Progress is coalesced as it is queued: each handler has
+    at most one pending entry, and later updates only replace its newest
+    args, so the queue does not grow with the number of files. Log lines
+    are handed over in one batch per sink per frame.
+    Events keep their order relative to call(): pending progress and log
+    lines are applied before a queued call runs.
+    """
+
+    def __init__(self, root, frame_ms=FRAME_MS):
+        self.root = root
+        self.frame_ms = frame_ms
+        self._events = collections.deque()
+        self._latest = {}   # handler -> newest progress args not applied yet
+        self._latest_lock = threading.Lock()
+        self.root.after(self.frame_ms, self._poll)
+
+    # --- WORKER SIDE (any thread) ---
+    def progress(self, handler):
+        """Returns a progress_callback for core functions that feeds handler(*args) at most once per frame."""
+        def callback(*args):
+            with self._latest_lock:
+                pending = handler in self._latest
+                self._latest[handler] = args
+                if not pending:
+                    self._events.append((_PROGRESS, handler, None))
+        return callback
+
+    def log(self, sink, line):
+        """Queues one log line; sink(lines) later receives every line queued for it in the frame."""
+        self._events.append((_LOG, sink, line))
+
+    def call(self, func, *args):
+        """Runs func(*args) on the Tk thread (use instead of widget.after(0, ...) from workers)."""
+        self._events.append((_CALL, func, args))
+
+    # --- TK SIDE ---
+    def _poll(self):
+        try:
+            self.drain()
+        finally:
+            self.root.after(self.frame_ms, self._poll)
+
+    def drain(self, limit=MAX_EVENTS_PER_FRAME):
+        progress = {}   # handler -> newest args
+        logs = {}       # sink -> lines
+        events = self._events
+        try:
+            for _ in range(min(len(events), limit)):
+                kind, target, payload = events.popleft()
+                if kind == _PROGRESS:
+                    with self._latest_lock:
+                        progress[target] = self._latest.pop(target)
+                elif kind == _LOG:
+                    logs.setdefault(target, []).append(payload)
+                else:
+                    self._flush(progress, logs)
+                    target(*payload)
+        finally:
+            # A failing call must not drop the progress and log lines already taken off the queue
+            self._flush(progress, logs)
+
+    def _flush(self, progress, logs):
+        for handler, args in progress.items():
+            handler(*args)
+        for sink, lines in logs.items():
+            sink(lines)
+        progress.clear()
+        logs.clear()
+
+def get_event_bus(widget):
+    """The bus shared by every tab in widget's window; created on first use (call from the Tk thread)."""
+    root = widget.winfo_toplevel()
+    bus = getattr(root, 'event_bus', None)
+    if bus is None:
+        bus = root.event_bus = EventBus(root)
+    return bus
@@ -1,13 +1,15 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import threading
 from core.pdf_converter import batch_convert_to_pdf
+from core import job_engine
 from ui.ui_utils import DirectorySelector
+from ui.event_bus import get_event_bus
 
 class IllustratorToPdfTab(ttk.Frame):
     def __init__(self, parent, main_window=None):
         super().__init__(parent, padding=10)
         self.main_window = main_window
+        self.events = get_event_bus(self)
 
         self.grid_columnconfigure(0, weight=1)
 
@@ -42,16 +44,19 @@ class IllustratorToPdfTab(ttk.Frame):
             self.main_window.progress_label.config(text="Converting Illustrator files to PDF...")
             self.main_window.progress_bar.start()
         
-        threading.Thread(target=self.run_conversion, args=(source_dir, output_dir, archive_dir), daemon=True).start()
+        job_engine.get_engine().submit("Illustrator to PDF", self.run_conversion, source_dir, output_dir, archive_dir,
+                                       resource=job_engine.IO)
 
-    def run_conversion(self, source_dir, output_dir, archive_dir):
+    def run_conversion(self, source_dir, output_dir, archive_dir, job):
         try:
-            count = batch_convert_to_pdf(source_dir, output_dir, archive_dir, self.update_progress)
-            self.after(0, lambda: messagebox.showinfo("Success", f"Done! {count} files processed."))
+            count = batch_convert_to_pdf(source_dir, output_dir, archive_dir, job.progress(self.events.progress(self.update_progress)))
+            self.events.call(lambda: messagebox.showinfo("Success", f"Done! {count} files processed."))
+        except job_engine.JobCancelled:
+            self.events.call(messagebox.showinfo, "Cancelled", "Conversion cancelled.")
         except Exception as e:
-            self.after(0, lambda: messagebox.showerror("Script Error", f"Details: {str(e)}"))
+            self.events.call(messagebox.showerror, "Script Error", f"Details: {str(e)}")
         finally:
-            self.after(0, self.reset_ui)
+            self.events.call(self.reset_ui)
 
     def update_progress(self, value):
         if self.main_window:
@@ -1,13 +1,15 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import threading
 from core import illustrator_to_svg as illustrator_converter
+from core import job_engine
 from ui.ui_utils import DirectorySelector
+from ui.event_bus import get_event_bus
 
 class IllustratorToSvgTab(ttk.Frame):
     def __init__(self, parent, main_window=None):
         super().__init__(parent, padding=10)
         self.main_window = main_window
+        self.events = get_event_bus(self)
 
         self.grid_columnconfigure(0, weight=1)
 
@@ -42,20 +44,22 @@ class IllustratorToSvgTab(ttk.Frame):
             self.main_window.progress_label.config(text="Initializing Illustrator...")
             self.main_window.progress_bar['value'] = 0
         
-        threading.Thread(target=self.run_conversion, args=(source_dir, output_dir, archive_dir), daemon=True).start()
+        job_engine.get_engine().submit("Illustrator to SVG", self.run_conversion, source_dir, output_dir, archive_dir,
+                                       resource=job_engine.IO)
 
-    def run_conversion(self, source_dir, output_dir, archive_dir):
-        def cb(c, t, m):
-            self.after(0, lambda: self.update_progress(c, t, m))
+    def run_conversion(self, source_dir, output_dir, archive_dir, job):
+        cb = job.progress(self.events.progress(self.update_progress))
 
         try:
             success, msg = illustrator_converter.batch_convert_to_svg(
                 source_dir, output_dir, archive_dir, progress_callback=cb
             )
-            self.after(0, lambda: self._finish(success, msg))
+            self.events.call(self._finish, success, msg)
             
+        except job_engine.JobCancelled:
+            self.events.call(self._finish, False, "Conversion cancelled.")
         except Exception as e:
-            self.after(0, lambda: self._finish(False, str(e)))
+            self.events.call(self._finish, False, str(e))
 
     def update_progress(self, curr, total, msg):
         if self.main_window:
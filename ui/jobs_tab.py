@@ -0,0 +1,120 @@
+import tkinter as tk
+from tkinter import ttk
+import threading
+from core import job_engine
+from ui.event_bus import get_event_bus
+
+class JobsTab(ttk.Frame):
+    """Queue of every job submitted by the other tabs, with pause / resume / cancel."""
+
+    def __init__(self, parent, main_window=None):
+        super().__init__(parent, padding=10)
+        self.main_window = main_window
+        self.events = get_event_bus(self)
+        self.engine = job_engine.get_engine()
+        self._dirty = {}
+        self._lock = threading.Lock()
+        self._refresh = self.events.progress(self._flush)
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        frame = ttk.LabelFrame(self, text="Job Queue", padding=10)
+        frame.grid(row=0, column=0, sticky="nsew")
+        frame.grid_columnconfigure(0, weight=1)
+        frame.grid_rowconfigure(0, weight=1)
+
+        columns = ("job", "class", "workers", "state", "progress")
+        self.tree = ttk.Treeview(frame, columns=columns, show="headings", selectmode="extended")
+        for col, text, width in (("job", "Job", 220), ("class", "Class", 60), ("workers", "Workers", 70),
+                                 ("state", "State", 90), ("progress", "Progress", 320)):
+            self.tree.heading(col, text=text)
+            self.tree.column(col, width=width, stretch=(col in ("job", "progress")))
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self.tree.yview)
+        scrollbar.grid(row=0, column=1, sticky="ns")
+        self.tree.config(yscrollcommand=scrollbar.set)
+
+        # Actions
+        actions = ttk.Frame(frame)
+        actions.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(10, 0))
+        for col in range(3):
+            actions.grid_columnconfigure(col, weight=1)
+        ttk.Button(actions, text="Pause", command=lambda: self._apply(self.engine.pause)).grid(row=0, column=0, sticky="ew")
+        ttk.Button(actions, text="Resume", command=lambda: self._apply(self.engine.resume)).grid(row=0, column=1, sticky="ew", padx=5)
+        ttk.Button(actions, text="Cancel", command=lambda: self._apply(self.engine.cancel)).grid(row=0, column=2, sticky="ew")
+
+        self.usage_label = ttk.Label(frame, text="")
+        self.usage_label.grid(row=2, column=0, columnspan=2, sticky="w", pady=(5, 0))
+
+        # Stage timings and counters of the selected (or last finished) job
+        summary_frame = ttk.LabelFrame(self, text="Job Summary", padding=10)
+        summary_frame.grid(row=1, column=0, sticky="ew", pady=(10, 0))
+        summary_frame.grid_columnconfigure(0, weight=1)
+        self.summary_text = tk.Text(summary_frame, height=8, wrap="none", state='disabled', font=("Consolas", 9))
+        self.summary_text.grid(row=0, column=0, sticky="ew")
+        self.tree.bind("<<TreeviewSelect>>", lambda e: self._show_summary())
+        self._summary_job = None
+
+        for job in self.engine.jobs():
+            self._show(job)
+        self._update_usage()
+        self.engine.subscribe(self._on_job)
+        self.bind("<Destroy>", lambda e: self.engine.unsubscribe(self._on_job) if e.widget is self else None)
+
+    # --- WORKER SIDE ---
+    def _on_job(self, job):
+        # Called from job threads: remember the job and ask for one refresh per frame
+        with self._lock:
+            self._dirty[job.id] = job
+        self._refresh()
+
+    # --- TK SIDE ---
+    def _flush(self):
+        with self._lock:
+            jobs = list(self._dirty.values())
+            self._dirty.clear()
+        for job in jobs:
+            self._show(job)
+            if job.summary and not self.tree.selection():
+                self._summary_job = job
+        self._update_usage()
+        self._show_summary()
+
+    def _show(self, job):
+        iid = str(job.id)
+        if not self.tree.exists(iid):
+            # The engine only keeps recent finished jobs; do the same here
+            self.tree.insert("", tk.END, iid=iid)
+            children = self.tree.get_children()
+            finished = [child for child in children if self.tree.set(child, "state") in job_engine.FINISHED_STATES]
+            for child in finished[:max(0, len(finished) - job_engine.FINISHED_JOBS_KEPT)]:
+                self.tree.delete(child)
+
+        if job.total:
+            progress = f"{job.current}/{job.total} {job.message}"
+        else:
+            progress = job.error or job.message
+        workers = job.workers if job.state in (job_engine.RUNNING, job_engine.PAUSED) else job.requested or ""
+        self.tree.item(iid, values=(job.name, job.resource.upper(), workers, job.state, progress))
+
+    def _show_summary(self):
+        selection = self.tree.selection()
+        job = self.engine.get(int(selection[-1])) if selection else self._summary_job
+        if job is None:
+            return
+        text = job.summary or (job.stats.summary() if job.stats else f"{job.name}: {job.state}")
+        self.summary_text.config(state='normal')
+        self.summary_text.delete("1.0", tk.END)
+        self.summary_text.insert("1.0", text)
+        self.summary_text.config(state='disabled')
+
+    def _update_usage(self):
+        usage = self.engine.usage()
+        cpu_used, cpu_budget = usage[job_engine.CPU]
+        io_used, io_budget = usage[job_engine.IO]
+        self.usage_label.config(text=f"CPU workers in use: {cpu_used}/{cpu_budget}    I/O jobs running: {io_used}/{io_budget}")
+
+    def _apply(self, action):
+        for iid in self.tree.selection():
+            action(int(iid))
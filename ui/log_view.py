@@ -0,0 +1,281 @@
+import tkinter as tk
+from tkinter import ttk
+import tkinter.font as tkfont
+import os
+import threading
+from core import move_journal
+from ui.event_bus import get_event_bus
+
+# Configuration defaults
+RING_LINES = 100000                  # Lines kept in memory (and scrollable)
+SPILL_MAX_BYTES = 16 * 1024 * 1024   # Size at which the log file is rotated
+SPILL_BACKUPS = 4                    # Rotated files kept (name.log.1 ... name.log.4)
+WHEEL_LINES = 3                      # Lines per mouse wheel notch
+
+def default_log_dir():
+    """Full logs live next to the move journals."""
+    return os.path.join(os.path.dirname(move_journal.default_journal_dir()), 'logs')
+
+class RingBuffer(object):
+    """Fixed-size line store; once full, each new line overwrites the oldest."""
+
+    def __init__(self, capacity=RING_LINES):
+        self.capacity = capacity
+        self.clear()
+
+    def clear(self):
+        self._lines = [None] * self.capacity
+        self._start = 0
+        self._count = 0
+        self.total = 0      # Lines appended since clear(), including dropped ones
+
+    def __len__(self):
+        return self._count
+
+    def extend(self, lines):
+        """Appends lines. Returns how many old lines were dropped to make room."""
+        dropped = 0
+        for line in lines[-self.capacity:]:
+            if self._count < self.capacity:
+                self._lines[(self._start + self._count) % self.capacity] = line
+                self._count += 1
+            else:
+                self._lines[self._start] = line
+                self._start = (self._start + 1) % self.capacity
+                dropped += 1
+        # Lines that never made it in because the batch itself exceeded capacity
+        dropped += max(0, len(lines) - self.capacity)
+        self.total += len(lines)
+        return dropped
+
+    def slice(self, first, count):
+        end = min(first + count, self._count)
+        return [self._lines[(self._start + i) % self.capacity] for i in range(max(0, first), end)]
+
+class LogSpill(object):
+    """Appends every log line to a size-rotated file so nothing is lost when the ring buffer wraps."""
+
+    def __init__(self, path, max_bytes=SPILL_MAX_BYTES, backups=SPILL_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8', errors='replace')
+
+    def _rotate(self):
+        self._file.close()
+        for n in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{n}"):
+                os.replace(f"{self.path}.{n}", f"{self.path}.{n + 1}")
+        os.replace(self.path, f"{self.path}.1")
+        self._open()
+
+    def write(self, lines):
+        with self._lock:
+            try:
+                if self._file is None:
+                    self._open()
+                self._file.write("\n".join(lines) + "\n")
+                self._file.flush()
+                if self._file.tell() >= self.max_bytes:
+                    self._rotate()
+            except OSError as e:
+                print(f"Log Spill Error {self.path}: {e}")
+
+    def files(self):
+        """Existing log files, oldest first."""
+        paths = [f"{self.path}.{n}" for n in range(self.backups, 0, -1)] + [self.path]
+        return [path for path in paths if os.path.exists(path)]
+
+    def search(self, query, limit=RING_LINES):
+        """
+        Case-insensitive substring search over the full log (all rotated files).
+        Returns (matching_lines, truncated) with at most 'limit' lines, newest kept.
+        """
+        with self._lock:
+            paths = self.files()
+        needle = query.lower()
+        matches = []
+        truncated = False
+        for path in paths:
+            try:
+                with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                    for line in f:
+                        if needle in line.lower():
+                            matches.append(line.rstrip('\n'))
+                            if len(matches) >= 2 * limit:
+                                # Keep the newest matches; trim in chunks, not per line
+                                del matches[:len(matches) - limit]
+                                truncated = True
+            except OSError as e:
+                print(f"Log Search Error {path}: {e}")
+        if len(matches) > limit:
+            del matches[:len(matches) - limit]
+            truncated = True
+        return matches, truncated
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+class LogView(ttk.Frame):
+    """
+    Log panel for long batch runs. Lines go into a RingBuffer and a LogSpill
+    file; the Text widget only ever holds the lines currently on screen, so
+    appending and scrolling cost the same at 100 lines or millions.
+    append(lines) must run on the Tk thread (pass it as an EventBus log sink).
+    """
+
+    def __init__(self, parent, name="log", height=15, capacity=RING_LINES, log_dir=None):
+        super().__init__(parent)
+        self.events = get_event_bus(self)
+        self.lines = RingBuffer(capacity)
+        self.spill = LogSpill(os.path.join(log_dir or default_log_dir(), f"{name}.log"))
+        self._results = None    # Search results being shown instead of the live log
+        self._first = 0         # Index of the top visible line
+        self._follow = True     # Stick to the newest line
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        # Search bar
+        bar = ttk.Frame(self)
+        bar.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, 5))
+        bar.grid_columnconfigure(0, weight=1)
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(bar, textvariable=self.search_var)
+        search_entry.grid(row=0, column=0, sticky="ew")
+        search_entry.bind("<Return>", lambda e: self._search())
+        ttk.Button(bar, text="Find", command=self._search).grid(row=0, column=1, padx=(5, 0))
+        ttk.Button(bar, text="Show Live Log", command=self._show_live).grid(row=0, column=2, padx=(5, 0))
+
+        # Viewport
+        self.text = tk.Text(self, height=height, wrap="none", state='disabled', font=("Consolas", 9))
+        self.text.grid(row=1, column=0, sticky="nsew")
+        self._line_height = max(1, tkfont.Font(font=self.text.cget("font")).metrics("linespace"))
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
+
+        self.status = ttk.Label(self, text="")
+        self.status.grid(row=2, column=0, columnspan=2, sticky="w")
+
+        self.text.bind("<Configure>", lambda e: self._render())
+        self.text.bind("<MouseWheel>", self._on_wheel)
+        self.text.bind("<Button-4>", lambda e: self._scroll(-WHEEL_LINES))
+        self.text.bind("<Button-5>", lambda e: self._scroll(WHEEL_LINES))
+
+    # --- PUBLIC ---
+    def append(self, lines):
+        """Adds a batch of lines (Tk thread)."""
+        self.spill.write(lines)
+        dropped = self.lines.extend(lines)
+        if self._results is None:
+            if not self._follow:
+                # Keep the same lines on screen while old ones scroll out of the buffer
+                self._first = max(0, self._first - dropped)
+            self._render()
+
+    def write(self, line):
+        """Queues one line from any thread."""
+        self.events.log(self.append, line)
+
+    def clear(self):
+        """Empties the view for a new run; the log file keeps everything."""
+        self.lines.clear()
+        self._results = None
+        self._first = 0
+        self._follow = True
+        self._render()
+
+    # --- RENDERING ---
+    def _source(self):
+        return self._results if self._results is not None else self.lines
+
+    def _visible_rows(self):
+        return max(1, self.text.winfo_height() // self._line_height)
+
+    def _render(self):
+        source = self._source()
+        total = len(source)
+        rows = self._visible_rows()
+        if self._follow:
+            self._first = max(0, total - rows)
+        self._first = max(0, min(self._first, max(0, total - rows)))
+
+        if self._results is None:
+            visible = source.slice(self._first, rows)
+        else:
+            visible = source[self._first:self._first + rows]
+
+        self.text.config(state='normal')
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", "\n".join(visible))
+        self.text.config(state='disabled')
+
+        if total:
+            self.scrollbar.set(self._first / total, min(1.0, (self._first + rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        self._update_status()
+
+    def _update_status(self):
+        if self._results is not None:
+            return
+        total = self.lines.total
+        if total > len(self.lines):
+            self.status.config(text=f"{total:,} lines; last {len(self.lines):,} shown. Full log: {self.spill.path}")
+        else:
+            self.status.config(text=f"{total:,} lines")
+
+    # --- SCROLLING ---
+    def _scroll(self, lines):
+        total = len(self._source())
+        rows = self._visible_rows()
+        self._first = max(0, min(self._first + lines, max(0, total - rows)))
+        self._follow = self._results is None and self._first + rows >= total
+        self._render()
+        return "break"
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            total = len(self._source())
+            return self._scroll(int(float(amount) * total) - self._first)
+        step = self._visible_rows() if unit == "pages" else 1
+        return self._scroll(int(amount) * step)
+
+    def _on_wheel(self, event):
+        notches = event.delta // 120 if abs(event.delta) >= 120 else (1 if event.delta > 0 else -1)
+        return self._scroll(-notches * WHEEL_LINES)
+
+    # --- SEARCH ---
+    def _search(self):
+        query = self.search_var.get()
+        if not query:
+            return self._show_live()
+        self.status.config(text=f"Searching for '{query}'...")
+        threading.Thread(target=self._thread_search, args=(query,), daemon=True).start()
+
+    def _thread_search(self, query):
+        matches, truncated = self.spill.search(query, limit=self.lines.capacity)
+        self.events.call(self._show_results, query, matches, truncated)
+
+    def _show_results(self, query, matches, truncated):
+        self._results = matches
+        self._first = 0
+        self._follow = False
+        self._render()
+        msg = f"{len(matches):,} lines match '{query}'"
+        if truncated:
+            msg += " (newest shown)"
+        self.status.config(text=msg + ". Show Live Log to return.")
+
+    def _show_live(self):
+        self._results = None
+        self._follow = True
+        self._render()
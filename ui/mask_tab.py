@@ -3,14 +3,17 @@ from tkinter import ttk, filedialog, messagebox
 import os
 import glob
 from core import image_masker
+from core import job_engine
+from ui.event_bus import get_event_bus
 
 class MaskToolsTab(ttk.Frame):
     def __init__(self, parent, main_window=None):
         super().__init__(parent, padding=10)
         self.main_window = main_window
+        self.events = get_event_bus(self)
 
         self.grid_columnconfigure(0, weight=1)
-        
+
         # Normal Mask
         f1 = ttk.LabelFrame(self, text="Circular Mask (Keep Center)", padding=10)
         f1.grid(row=0, column=0, sticky="ew")
@@ -25,35 +28,62 @@ class MaskToolsTab(ttk.Frame):
         ttk.Button(f2, text="Process Single Image", command=lambda: self._proc("single", "inverted")).grid(row=0, column=0, sticky="ew", pady=2)
         ttk.Button(f2, text="Process Folder", command=lambda: self._proc("dir", "inverted")).grid(row=1, column=0, sticky="ew", pady=2)
 
+        # Options
+        self.antialias_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(self, text="Smooth Edges (Anti-aliased)", variable=self.antialias_var).grid(row=2, column=0, sticky="w")
+
     def _proc(self, type, mode):
         out_folder = "masked_output"
-        
+        antialias = self.antialias_var.get()
+
         # Optional: Update status
         if self.main_window:
             self.main_window.progress_label.config(text="Processing masks...")
-        
+
         if type == "single":
             path = filedialog.askopenfilename(filetypes=[("Images", "*.jpg *.png *.jpeg")])
             if path:
                 out = os.path.join(os.path.dirname(path), out_folder)
-                os.makedirs(out, exist_ok=True)
-                image_masker.apply_mask(path, out, mode)
-                messagebox.showinfo("Done", f"Saved to {out}")
+                job_engine.get_engine().submit("Mask image", self._thread_single, path, out, mode, antialias, workers=1)
+                return
         else:
             path = filedialog.askdirectory()
             if path:
                 out = os.path.join(path, out_folder)
-                os.makedirs(out, exist_ok=True)
                 files = glob.glob(os.path.join(path, "*.jpg")) + glob.glob(os.path.join(path, "*.png"))
-                if not files: 
+                if not files:
                     messagebox.showinfo("Done", "No images found to process.")
                     if self.main_window:
                         self.main_window.progress_label.config(text="Ready.")
                     return
-                
-                for f in files:
-                    image_masker.apply_mask(f, out, mode)
-                messagebox.showinfo("Done", f"Processed {len(files)} images.")
 
+                job_engine.get_engine().submit("Mask images", self._thread_batch, files, out, mode, antialias)
+                return
+
+        if self.main_window:
+            self.main_window.progress_label.config(text="Ready.")
+
+    def _update_progress(self, current, total, filename):
+        if self.main_window:
+            self.main_window.progress_label.config(text=f"Masking: {filename}")
+            if total > 0:
+                self.main_window.progress_bar['maximum'] = total
+                self.main_window.progress_bar['value'] = current
+
+    def _thread_single(self, path, out, mode, antialias, job):
+        os.makedirs(out, exist_ok=True)
+        success = image_masker.apply_mask(path, out, mode, antialias)
+        msg = f"Saved to {out}" if success else f"Could not mask {os.path.basename(path)} (see console)."
+        self.events.call(self._finish, success, msg)
+
+    def _finish(self, success, msg):
         if self.main_window:
             self.main_window.progress_label.config(text="Ready.")
+            self.main_window.progress_bar.config(value=0)
+        messagebox.showinfo("Done", msg) if success else messagebox.showerror("Error", msg)
+
+    def _thread_batch(self, files, out, mode, antialias, job):
+        cb = job.progress(self.events.progress(self._update_progress), raise_on_cancel=False)
+        success, msg = image_masker.batch_apply_mask(files, out, mode, antialias, workers=job.workers,
+                                                     progress_callback=cb, stop_event=job.stop_event)
+        self.events.call(self._finish, success, msg)
@@ -1,9 +1,10 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import threading
 import os
 from core import pdf_merger, pdf_extractor, pdf_processor
+from core import job_engine
 from ui.ui_utils import DirectorySelector
+from ui.event_bus import get_event_bus
 from ui.compress_tab import CompressTab
 from ui.illustrator_to_pdf_tab import IllustratorToPdfTab
 
@@ -11,7 +12,9 @@ class PDFToolsTab(ttk.Frame):
     def __init__(self, parent, main_window=None):
         super().__init__(parent, padding=10)
         self.main_window = main_window
-        self.stop_event = threading.Event()
+        self.events = get_event_bus(self)
+        self._linearize_job = None
+        self._compile_job = None
 
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(0, weight=1)
@@ -56,7 +59,7 @@ class PDFToolsTab(ttk.Frame):
         self.run_btn_linearizer = ttk.Button(action_frame, text="Linearize PDFs", command=self._run_linearizer)
         self.run_btn_linearizer.grid(row=0, column=0, sticky="ew", pady=10)
 
-        self.stop_btn_linearizer = ttk.Button(action_frame, text="Stop", command=self._stop_process)
+        self.stop_btn_linearizer = ttk.Button(action_frame, text="Stop", command=self._stop_linearizer)
         self.stop_btn_linearizer.grid(row=0, column=1, sticky="ew", padx=(5,0), pady=10)
         self.stop_btn_linearizer.grid_remove()
         
@@ -134,6 +137,9 @@ class PDFToolsTab(ttk.Frame):
         self.pdf_filename_var = tk.BooleanVar(value=True)
         ttk.Checkbutton(opts_frame, text="Include Filenames", variable=self.pdf_filename_var).pack(side=tk.LEFT, padx=20)
 
+        self.pdf_draft_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(opts_frame, text="Fast Draft (Cached Previews)", variable=self.pdf_draft_var).pack(side=tk.LEFT, padx=10)
+
         action_frame = ttk.Frame(comp_frame)
         action_frame.grid(row=2, column=0, sticky="ew", pady=10)
         action_frame.grid_columnconfigure(0, weight=1)
@@ -160,6 +166,9 @@ class PDFToolsTab(ttk.Frame):
         self.pdf_sheet_cols = ttk.Entry(col_frame, width=5)
         self.pdf_sheet_cols.insert(0, "3")
         self.pdf_sheet_cols.pack(side=tk.LEFT, padx=5)
+        ttk.Label(col_frame, text="Thumbnail Size (px, blank = full):").pack(side=tk.LEFT, padx=(15, 0))
+        self.pdf_sheet_thumb = ttk.Entry(col_frame, width=6)
+        self.pdf_sheet_thumb.pack(side=tk.LEFT, padx=5)
 
         self.sheet_btn = ttk.Button(sheet_frame, text="Generate Contact Sheet", command=self._run_pdf_sheet)
         self.sheet_btn.grid(row=2, column=0, sticky="ew", pady=10)
@@ -189,28 +198,31 @@ class PDFToolsTab(ttk.Frame):
             self.main_window.progress_label.config(text="Starting Merge...")
             self.main_window.progress_bar['value'] = 0
 
-        threading.Thread(target=self._thread_merger, args=(src, dest, title), daemon=True).start()
+        job_engine.get_engine().submit("Merge PDFs", self._thread_merger, src, dest, title, workers=1)
 
     def _update_progress_gui_merger(self, value, message):
         if self.main_window:
             self.main_window.progress_label.config(text=message)
             self.main_window.progress_bar['value'] = value
 
-    def _thread_merger(self, src, dest, title):
-        success, msg = pdf_merger.merge_pdfs_with_toc(
-            src, 
-            dest, 
-            title, 
-            progress_callback=lambda v, m: self.after(0, self._update_progress_gui_merger, v, m)
-        )
+    def _thread_merger(self, src, dest, title, job):
+        try:
+            success, msg = pdf_merger.merge_pdfs_with_toc(
+                src, 
+                dest, 
+                title, 
+                progress_callback=job.progress(self.events.progress(self._update_progress_gui_merger))
+            )
+        except job_engine.JobCancelled:
+            success, msg = False, "Merge cancelled."
         
-        self.after(0, lambda: self.run_btn_merger.config(state="normal"))
+        self.events.call(lambda: self.run_btn_merger.config(state="normal"))
         
         if self.main_window:
-            self.after(0, lambda: self.main_window.progress_label.config(text="Ready."))
-            self.after(0, lambda: self.main_window.progress_bar.config(value=0))
+            self.events.call(lambda: self.main_window.progress_label.config(text="Ready."))
+            self.events.call(lambda: self.main_window.progress_bar.config(value=0))
         
-        self.after(0, lambda: messagebox.showinfo("Result", msg) if success else messagebox.showerror("Error", msg))
+        self.events.call(lambda: messagebox.showinfo("Result", msg) if success else messagebox.showerror("Error", msg))
 
     # --- Extractor Methods ---
     def _select_extractor(self):
@@ -232,19 +244,19 @@ class PDFToolsTab(ttk.Frame):
             self.main_window.progress_bar.config(mode='indeterminate')
             self.main_window.progress_bar.start(10)
 
-        threading.Thread(target=self._thread_extractor, args=(self.pdf_files, out), daemon=True).start()
+        job_engine.get_engine().submit("Extract PDF pages", self._thread_extractor, self.pdf_files, out, workers=1)
 
     def _thread_extractor(self, files, out):
-        count = pdf_extractor.extract_images_from_pdfs(files, out)
+        count = pdf_extractor.extract_pages_as_images(files, out)
         
-        self.after(0, lambda: self.run_btn_extractor.config(state="normal"))
+        self.events.call(lambda: self.run_btn_extractor.config(state="normal"))
         
         if self.main_window:
-            self.after(0, lambda: self.main_window.progress_label.config(text="Ready."))
-            self.after(0, lambda: self.main_window.progress_bar.stop())
-            self.after(0, lambda: self.main_window.progress_bar.config(mode='determinate', value=0))
+            self.events.call(lambda: self.main_window.progress_label.config(text="Ready."))
+            self.events.call(lambda: self.main_window.progress_bar.stop())
+            self.events.call(lambda: self.main_window.progress_bar.config(mode='determinate', value=0))
             
-        self.after(0, lambda: messagebox.showinfo("Done", f"Processed {count} PDFs."))
+        self.events.call(lambda: messagebox.showinfo("Done", f"Processed {count} PDFs."))
 
     # --- Optimizer Methods ---
     def _select_linearize_pdfs(self):
@@ -266,15 +278,20 @@ class PDFToolsTab(ttk.Frame):
             self.main_window.progress_label.config(text="Linearizing PDFs...")
             self.main_window.progress_bar['value'] = 0
         
-        self.stop_event.clear()
-        
-        threading.Thread(target=self._thread_linearizer, args=(self.linearize_files, self.stop_event), daemon=True).start()
+        self._linearize_job = job_engine.get_engine().submit(
+            "Linearize PDFs", self._thread_linearizer, self.linearize_files, workers=1
+        )
 
-    def _thread_linearizer(self, files, stop_event):
-        cb = lambda c, t, m: self.after(0, self._update_progress, c, t, m)
+    def _stop_linearizer(self):
+        if self._linearize_job:
+            job_engine.get_engine().cancel(self._linearize_job.id)
+        self.stop_btn_linearizer.config(state="disabled")
+
+    def _thread_linearizer(self, files, job):
+        cb = job.progress(self.events.progress(self._update_progress), raise_on_cancel=False)
         
         success, msg = pdf_processor.batch_linearize_pdfs(
-            files, progress_callback=cb, stop_event=stop_event
+            files, progress_callback=cb, stop_event=job.stop_event
         )
 
         def cleanup_ui():
@@ -285,11 +302,12 @@ class PDFToolsTab(ttk.Frame):
                 self.main_window.progress_bar.config(value=0)
             messagebox.showinfo("Result", msg) if success else messagebox.showerror("Error", msg)
 
-        self.after(0, cleanup_ui)
+        self.events.call(cleanup_ui)
 
     # --- Compiler Methods ---
     def _stop_process(self):
-        self.stop_event.set()
+        if self._compile_job:
+            job_engine.get_engine().cancel(self._compile_job.id)
         self.stop_btn.config(state="disabled")
 
     def _run_pdf_comp(self):
@@ -297,7 +315,6 @@ class PDFToolsTab(ttk.Frame):
         if not path: 
             return messagebox.showerror("Error", "Select a folder.")
         
-        self.stop_event.clear()
         self.generate_btn.grid_remove()
         self.stop_btn.grid()
         self.stop_btn.config(state="normal")
@@ -310,8 +327,11 @@ class PDFToolsTab(ttk.Frame):
         incl = self.pdf_filename_var.get()
         native = self.pdf_native_res_var.get()
         is_recursive = self.pdf_recursive_var.get()
+        draft_size = pdf_processor.DRAFT_IMAGE_SIZE if self.pdf_draft_var.get() else None
         
-        threading.Thread(target=self._pdf_comp_thread, args=(path, orient, incl, native, is_recursive, self.stop_event), daemon=True).start()
+        self._compile_job = job_engine.get_engine().submit(
+            "Compile PDF", self._pdf_comp_thread, path, orient, incl, native, is_recursive, draft_size, workers=1
+        )
 
     def _update_progress(self, current, total, message):
         if self.main_window:
@@ -320,16 +340,17 @@ class PDFToolsTab(ttk.Frame):
                 self.main_window.progress_bar['maximum'] = total
                 self.main_window.progress_bar['value'] = current
 
-    def _pdf_comp_thread(self, path, orient, incl, native, is_recursive, stop_event):
-        cb = lambda c, t, m: self.after(0, self._update_progress, c, t, m)
+    def _pdf_comp_thread(self, path, orient, incl, native, is_recursive, draft_size, job):
+        cb = job.progress(self.events.progress(self._update_progress), raise_on_cancel=False)
+        stop_event = job.stop_event
 
         if is_recursive:
             success, msg = pdf_processor.batch_create_pdfs(
-                path, orient, incl, native, progress_callback=cb, stop_event=stop_event
+                path, orient, incl, native, progress_callback=cb, stop_event=stop_event, draft_size=draft_size
             )
         else:
             success, msg = pdf_processor.create_compilation_pdf(
-                path, orient, incl, progress_callback=cb, use_native_res=native, stop_event=stop_event
+                path, orient, incl, progress_callback=cb, use_native_res=native, stop_event=stop_event, draft_size=draft_size
             )
         
         def cleanup_ui():
@@ -340,14 +361,17 @@ class PDFToolsTab(ttk.Frame):
                 self.main_window.progress_bar.config(value=0)
             messagebox.showinfo("Result", msg) if success else messagebox.showerror("Error", msg)
 
-        self.after(0, cleanup_ui)
+        self.events.call(cleanup_ui)
 
     def _run_pdf_sheet(self):
         path = self.sheet_dir_selector.get()
         try:
             cols = int(self.pdf_sheet_cols.get())
+            thumb_size = int(self.pdf_sheet_thumb.get()) if self.pdf_sheet_thumb.get().strip() else None
         except ValueError:
-            return messagebox.showerror("Error", "Columns must be a number.")
+            return messagebox.showerror("Error", "Columns and thumbnail size must be numbers.")
+        if thumb_size is not None and thumb_size <= 0:
+            return messagebox.showerror("Error", "Thumbnail size must be a positive number of pixels (leave it blank for full resolution).")
 
         if not path: return messagebox.showerror("Error", "Select a folder.")
         
@@ -355,13 +379,13 @@ class PDFToolsTab(ttk.Frame):
         if self.main_window:
             self.main_window.progress_label.config(text="Generating Contact Sheet...")
         
-        threading.Thread(target=self._pdf_sheet_thread, args=(path, cols), daemon=True).start()
+        job_engine.get_engine().submit("Contact sheet", self._pdf_sheet_thread, path, cols, thumb_size, workers=1)
 
-    def _pdf_sheet_thread(self, path, cols):
-        success, msg = pdf_processor.create_contact_sheet_pdf(path, cols)
+    def _pdf_sheet_thread(self, path, cols, thumb_size=None):
+        success, msg = pdf_processor.create_contact_sheet_pdf(path, cols, thumb_size=thumb_size)
         
-        self.after(0, lambda: self.sheet_btn.config(state="normal"))
+        self.events.call(lambda: self.sheet_btn.config(state="normal"))
         if self.main_window:
-            self.after(0, lambda: self.main_window.progress_label.config(text="Ready."))
+            self.events.call(lambda: self.main_window.progress_label.config(text="Ready."))
         
-        self.after(0, lambda: messagebox.showinfo("Result", msg) if success else messagebox.showerror("Error", msg))
\ No newline at end of file
+        self.events.call(lambda: messagebox.showinfo("Result", msg) if success else messagebox.showerror("Error", msg))
\ No newline at end of file
@@ -1,13 +1,28 @@
+import os
+import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import threading
 from core import pattern_sorter, structure_sorter
 from core import photo_organizer
+from core import move_journal
+from core import job_engine
+from core import file_index
+from core import watch_folder
+from core import dedupe
+from ui.event_bus import get_event_bus
+from ui.log_view import LogView
 
 class SortingToolsTab(ttk.Frame):
     def __init__(self, parent, main_window=None):
         super().__init__(parent, padding=10)
         self.main_window = main_window
+        self.events = get_event_bus(self)
+
+        # Shared by every tool that scans folders, not just the sorters
+        self.use_index_var = tk.BooleanVar(value=file_index.enabled())
+        ttk.Checkbutton(self, text="Use the file index (rescans of large folders only re-read changed folders)",
+                        variable=self.use_index_var,
+                        command=lambda: file_index.enable(self.use_index_var.get())).pack(anchor="w", pady=(0, 5))
 
         notebook = ttk.Notebook(self)
         notebook.pack(fill=tk.BOTH, expand=True)
@@ -16,10 +31,14 @@ class SortingToolsTab(ttk.Frame):
         structure_frame = self._create_structure_sort_tab(notebook)
         # ADDED: New internal tab
         photo_frame = self._create_photo_sort_tab(notebook)
+        watch_frame = self._create_watch_tab(notebook)
+        dedupe_frame = self._create_dedupe_tab(notebook)
 
         notebook.add(pattern_frame, text="Pattern Sorter")
         notebook.add(structure_frame, text="Structure Sorter")
         notebook.add(photo_frame, text="Photo/Date Sorter") # ADDED
+        notebook.add(watch_frame, text="Hot Folders")
+        notebook.add(dedupe_frame, text="Duplicates")
 
     def _create_pattern_sort_tab(self, parent):
         frame = ttk.Frame(parent, padding=10)
@@ -30,6 +49,7 @@ class SortingToolsTab(ttk.Frame):
             "First Word Only": r'^([a-zA-Z0-9]+)',
             "First 3 Words": r'^([a-zA-Z0-9]+)[^a-zA-Z0-9]+([a-zA-Z0-9]+)[^a-zA-Z0-9]+([a-zA-Z0-9]+)',
             "Date (YYYY-MM-DD)": r'^(\d{4}-\d{2}-\d{2})',
+            "Similar Names (Fuzzy)": None,
             "Custom Pattern": "" 
         }
 
@@ -58,6 +78,10 @@ class SortingToolsTab(ttk.Frame):
         self.custom_regex_var = tk.StringVar()
         self.entry_custom = ttk.Entry(config_frame, textvariable=self.custom_regex_var)
         self.lbl_custom = ttk.Label(config_frame, text="Regex:")
+
+        self.similarity_var = tk.IntVar(value=60)
+        self.lbl_similarity = ttk.Label(config_frame, text="Similarity (%):")
+        self.spin_similarity = ttk.Spinbox(config_frame, from_=10, to=100, increment=5, textvariable=self.similarity_var, width=5)
         
         ttk.Label(config_frame, text="Minimum Files to Create Folder:").grid(row=2, column=0, sticky="w", pady=5)
         self.threshold_var = tk.IntVar(value=2)
@@ -82,7 +106,15 @@ class SortingToolsTab(ttk.Frame):
         self.char_limit_spinbox.pack(side=tk.LEFT, padx=5)
         ttk.Label(char_limit_frame, text="characters").pack(side=tk.LEFT)
 
-        ttk.Button(container, text="Analyze and Sort", command=self._run_pattern).pack(fill=tk.X, pady=20)
+        self.pattern_dry_run_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(config_frame, text="Preview only (dry run, saves the move plan)", variable=self.pattern_dry_run_var).grid(row=5, column=0, columnspan=2, sticky="w", pady=5)
+
+        # Grid row 6: Several patterns in one pass
+        self.pattern_all_presets_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(config_frame, text="Also try the other presets (selected pattern wins, then list order)", variable=self.pattern_all_presets_var).grid(row=6, column=0, columnspan=2, sticky="w", pady=5)
+
+        self.run_pattern_btn = ttk.Button(container, text="Analyze and Sort", command=self._run_pattern)
+        self.run_pattern_btn.pack(fill=tk.X, pady=20)
         return frame
 
     def _create_structure_sort_tab(self, parent):
@@ -92,7 +124,7 @@ class SortingToolsTab(ttk.Frame):
         f1 = ttk.LabelFrame(frame, text="Consolidate Single-File Folders", padding=10)
         f1.pack(fill=tk.X, pady=10)
         
-        ttk.Label(f1, text="Moves files out of subfolders that contain only 1 item.", wraplength=350).pack(anchor="w")
+        ttk.Label(f1, text="Moves files out of subfolders that contain only 1 item, including nested chains like a/b/c/file.jpg.", wraplength=350).pack(anchor="w")
         
         row1 = ttk.Frame(f1)
         row1.pack(fill=tk.X, pady=5)
@@ -100,7 +132,13 @@ class SortingToolsTab(ttk.Frame):
         ttk.Entry(row1, textvariable=self.path1_structure).pack(side=tk.LEFT, fill=tk.X, expand=True)
         ttk.Button(row1, text="Browse", command=lambda: self._browse_structure(self.path1_structure)).pack(side=tk.LEFT, padx=5)
         
-        ttk.Button(f1, text="Run Consolidation", command=self._run_consolidate).pack(fill=tk.X, pady=5)
+        self.consolidate_dry_run_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(f1, text="Preview only (dry run)", variable=self.consolidate_dry_run_var).pack(anchor="w", pady=5)
+        self.consolidate_remove_empty_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(f1, text="Also remove empty folders", variable=self.consolidate_remove_empty_var).pack(anchor="w")
+
+        self.run_consolidate_btn = ttk.Button(f1, text="Run Consolidation", command=self._run_consolidate)
+        self.run_consolidate_btn.pack(fill=tk.X, pady=5)
 
         f2 = ttk.LabelFrame(frame, text="Sort by Extension", padding=10)
         f2.pack(fill=tk.X, pady=10)
@@ -116,6 +154,9 @@ class SortingToolsTab(ttk.Frame):
         self.centralize_var = tk.BooleanVar(value=False)
         chk = ttk.Checkbutton(f2, text="Move ALL files to main directory (Flatten Subfolders)", variable=self.centralize_var)
         chk.pack(anchor="w", pady=5)
+
+        self.ext_dry_run_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(f2, text="Preview only (dry run)", variable=self.ext_dry_run_var).pack(anchor="w", pady=5)
         
         self.run_ext_btn = ttk.Button(f2, text="Run Extension Sort", command=self._run_ext)
         self.run_ext_btn.pack(fill=tk.X, pady=5)
@@ -131,7 +172,18 @@ class SortingToolsTab(ttk.Frame):
         ttk.Entry(row3, textvariable=self.path3_structure).pack(side=tk.LEFT, fill=tk.X, expand=True)
         ttk.Button(row3, text="Browse", command=lambda: self._browse_structure(self.path3_structure)).pack(side=tk.LEFT, padx=5)
         
-        ttk.Button(f3, text="Find and Delete Empty Folders", command=self._run_delete_empty).pack(fill=tk.X, pady=5)
+        self.run_delete_empty_btn = ttk.Button(f3, text="Find and Delete Empty Folders", command=self._run_delete_empty)
+        self.run_delete_empty_btn.pack(fill=tk.X, pady=5)
+
+        f4 = ttk.LabelFrame(frame, text="Job History", padding=10)
+        f4.pack(fill=tk.X, pady=10)
+
+        ttk.Label(f4, text="Every sort is journaled. Finish an interrupted sort or roll back the last one.", wraplength=350).pack(anchor="w")
+
+        self.resume_btn = ttk.Button(f4, text="Resume Interrupted Job", command=self._run_resume)
+        self.resume_btn.pack(fill=tk.X, pady=5)
+        self.undo_btn = ttk.Button(f4, text="Undo Last Sort", command=self._run_undo)
+        self.undo_btn.pack(fill=tk.X, pady=5)
 
         return frame
 
@@ -175,12 +227,89 @@ class SortingToolsTab(ttk.Frame):
         self.photo_keep_filename = tk.BooleanVar(value=False)
         ttk.Checkbutton(config_frame, text="Keep Original Filename on Duplicate", variable=self.photo_keep_filename).grid(row=4, column=0, sticky="w", pady=5)
 
+        self.photo_dry_run = tk.BooleanVar(value=False)
+        ttk.Checkbutton(config_frame, text="Preview only (dry run)", variable=self.photo_dry_run).grid(row=5, column=0, sticky="w", pady=5)
+
 
         self.run_photo_sort_btn = ttk.Button(container, text="Run Photo Organizer", command=self._run_photo_sort)
         self.run_photo_sort_btn.pack(fill=tk.X, pady=20)
         
         return frame
 
+    def _create_watch_tab(self, parent):
+        frame = ttk.Frame(parent, padding=10)
+
+        container = ttk.LabelFrame(frame, text="Watch a Hot Folder", padding=10)
+        container.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Label(container, text="Processes files as soon as they are dropped into the folder and finished copying.",
+                  wraplength=400).pack(anchor="w", pady=(0,10))
+
+        ttk.Label(container, text="Hot Folder:").pack(anchor="w")
+        self.watch_dir = tk.StringVar()
+        row = ttk.Frame(container)
+        row.pack(fill=tk.X, pady=5)
+        ttk.Entry(row, textvariable=self.watch_dir).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        ttk.Button(row, text="Browse", command=lambda: self.watch_dir.set(filedialog.askdirectory())).pack(side=tk.LEFT, padx=5)
+
+        config_frame = ttk.LabelFrame(container, text="Pipeline (runs in this order)", padding=10)
+        config_frame.pack(fill=tk.X, pady=15)
+        self.watch_compress = tk.BooleanVar(value=False)
+        ttk.Checkbutton(config_frame, text="Compress PDFs (into compressed_pdfs)", variable=self.watch_compress).grid(row=0, column=0, sticky="w", pady=2)
+        self.watch_photos = tk.BooleanVar(value=True)
+        ttk.Checkbutton(config_frame, text="Organize by date (uses the Photo/Date Sorter folder structure)", variable=self.watch_photos).grid(row=1, column=0, sticky="w", pady=2)
+        self.watch_extensions = tk.BooleanVar(value=True)
+        ttk.Checkbutton(config_frame, text="Sort the rest by extension", variable=self.watch_extensions).grid(row=2, column=0, sticky="w", pady=2)
+        self.watch_recursive = tk.BooleanVar(value=False)
+        ttk.Checkbutton(config_frame, text="Also watch subfolders", variable=self.watch_recursive).grid(row=3, column=0, sticky="w", pady=(8, 2))
+
+        self.watch_btn = ttk.Button(container, text="Start Watching", command=self._toggle_watch)
+        self.watch_btn.pack(fill=tk.X, pady=10)
+
+        self.watch_log = LogView(container, name="watch_folders", height=8)
+        self.watch_log.pack(fill=tk.BOTH, expand=True)
+
+        self._watch_stop = None
+        self.bind("<Destroy>", lambda e: self._watch_stop.set() if e.widget is self and self._watch_stop else None)
+        return frame
+
+    def _create_dedupe_tab(self, parent):
+        frame = ttk.Frame(parent, padding=10)
+
+        container = ttk.LabelFrame(frame, text="Find Duplicate Files", padding=10)
+        container.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Label(container, text="Finds files with identical content anywhere below the folder. Only files of equal size "
+                  "are read, and hashes are remembered in the file index for the next run.",
+                  wraplength=400).pack(anchor="w", pady=(0,10))
+
+        ttk.Label(container, text="Folder:").pack(anchor="w")
+        self.dedupe_dir = tk.StringVar()
+        row = ttk.Frame(container)
+        row.pack(fill=tk.X, pady=5)
+        ttk.Entry(row, textvariable=self.dedupe_dir).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        ttk.Button(row, text="Browse", command=lambda: self.dedupe_dir.set(filedialog.askdirectory())).pack(side=tk.LEFT, padx=5)
+
+        config_frame = ttk.LabelFrame(container, text="Duplicates", padding=10)
+        config_frame.pack(fill=tk.X, pady=15)
+        ttk.Label(config_frame, text="Action:").grid(row=0, column=0, sticky="w", pady=5)
+        self.dedupe_action = tk.StringVar(value=dedupe.REPORT)
+        ttk.Combobox(config_frame, textvariable=self.dedupe_action, values=dedupe.ACTIONS,
+                     state="readonly", width=12).grid(row=0, column=1, sticky="w", padx=10, pady=5)
+        ttk.Label(config_frame, text="Keep:").grid(row=1, column=0, sticky="w", pady=5)
+        self.dedupe_keep = tk.StringVar(value=dedupe.KEEP_OLDEST)
+        ttk.Combobox(config_frame, textvariable=self.dedupe_keep, values=dedupe.KEEP_RULES,
+                     state="readonly", width=12).grid(row=1, column=1, sticky="w", padx=10, pady=5)
+        self.dedupe_dry_run = tk.BooleanVar(value=True)
+        ttk.Checkbutton(config_frame, text="Preview only (dry run)", variable=self.dedupe_dry_run).grid(row=2, column=0, columnspan=2, sticky="w", pady=5)
+
+        self.run_dedupe_btn = ttk.Button(container, text="Find Duplicates", command=self._run_dedupe)
+        self.run_dedupe_btn.pack(fill=tk.X, pady=10)
+
+        self.dedupe_log = LogView(container, name="duplicates", height=8)
+        self.dedupe_log.pack(fill=tk.BOTH, expand=True)
+        return frame
+
     # --- Pattern Sorter Methods ---
     def _browse_pattern(self):
         d = filedialog.askdirectory()
@@ -195,6 +324,13 @@ class SortingToolsTab(ttk.Frame):
             self.lbl_custom.grid_remove()
             self.entry_custom.grid_remove()
 
+        if selection == "Similar Names (Fuzzy)":
+            self.lbl_similarity.grid(row=1, column=0, sticky="e", padx=5)
+            self.spin_similarity.grid(row=1, column=1, sticky="w", padx=10)
+        else:
+            self.lbl_similarity.grid_remove()
+            self.spin_similarity.grid_remove()
+
     def _run_pattern(self):
         directory = self.src_pattern.get()
         if not directory: return messagebox.showerror("Error", "Select a folder.")
@@ -223,12 +359,70 @@ class SortingToolsTab(ttk.Frame):
         if self.main_window:
             self.main_window.progress_label.config(text="Scanning file patterns...")
 
-        success, msg = pattern_sorter.sort_by_name_pattern(directory, regex, min_count, ignore_spaces, char_count)
-        
+        dry_run = self.pattern_dry_run_var.get()
+        if selection == "Similar Names (Fuzzy)":
+            return self._run_fuzzy(directory, min_count, dry_run)
+
+        if self.pattern_all_presets_var.get():
+            # One walk: the selected pattern first, then every other preset in list order
+            patterns = [(selection, regex)] + [(name, p) for name, p in self.PATTERNS.items() if p and name != selection]
+            self._submit_sort("Sort by name patterns", self.run_pattern_btn, pattern_sorter.sort_by_name_patterns,
+                              directory, patterns, min_count, ignore_spaces, char_count, dry_run=dry_run)
+        else:
+            self._submit_sort("Sort by name pattern", self.run_pattern_btn, pattern_sorter.sort_by_name_pattern,
+                              directory, regex, min_count, ignore_spaces, char_count, dry_run=dry_run)
+
+    def _run_fuzzy(self, directory, min_count, dry_run):
+        try:
+            threshold = self.similarity_var.get() / 100.0
+        except tk.TclError:
+            return messagebox.showerror("Error", "Invalid similarity value.")
+
+        if dry_run:
+            return self._submit_sort("Sort by similarity", self.run_pattern_btn, pattern_sorter.sort_by_similarity,
+                                     directory, threshold, min_count, dry_run=True)
+        # Group in a job, review the groups here, then apply them in a second job
+        self.run_pattern_btn.config(state="disabled")
+        job_engine.get_engine().submit("Group similar names", self._thread_fuzzy_groups, directory, threshold, min_count,
+                                       resource=job_engine.IO)
+
+    def _thread_fuzzy_groups(self, directory, threshold, min_count, job):
+        cb = job.progress(self.events.progress(self._update_progress))
+        try:
+            groups = pattern_sorter.propose_similar_groups(directory, threshold, min_count, progress_callback=cb)
+        except job_engine.JobCancelled:
+            return self.events.call(self._finish_sort, self.run_pattern_btn, False, "Grouping cancelled.")
+        plan = pattern_sorter.plan_sort_by_similarity(directory, groups)
+        self.events.call(self._review_fuzzy, plan)
+
+    def _review_fuzzy(self, plan):
+        if not len(plan):
+            return self._finish_sort(self.run_pattern_btn, True, "No groups of similar file names were found.")
+        # Show the proposed groups before anything moves
+        summary = plan.describe(dry_run=False)
+        if not messagebox.askyesno("Review Groups", f"{summary}\n\nApply these groups?"):
+            return self._finish_sort(self.run_pattern_btn, None, None)
+        self._submit_sort("Sort by similarity", self.run_pattern_btn, pattern_sorter.execute_plan, plan)
+
+    # --- Shared Job Methods ---
+    def _submit_sort(self, name, button, func, *args, **kwargs):
+        """Runs func(*args, progress_callback=..., stop_event=..., **kwargs) -> (success, msg) as an I/O job."""
+        button.config(state="disabled")
+        job_engine.get_engine().submit(name, self._thread_sort, button, func, args, kwargs, resource=job_engine.IO)
+
+    def _thread_sort(self, button, func, args, kwargs, job):
+        # The sorters stop between files on the stop_event, so copies in flight are journaled
+        cb = job.progress(self.events.progress(self._update_progress), raise_on_cancel=False)
+        success, msg = func(*args, progress_callback=cb, stop_event=job.stop_event, **kwargs)
+        self.events.call(self._finish_sort, button, success, msg)
+
+    def _finish_sort(self, button, success, msg):
+        button.config(state="normal")
         if self.main_window:
             self.main_window.progress_label.config(text="Ready.")
-
-        messagebox.showinfo("Result", msg)
+            self.main_window.progress_bar.config(value=0)
+        if msg:
+            messagebox.showinfo("Result", msg) if success else messagebox.showerror("Error", msg)
 
     # --- Structure Sorter Methods ---
     def _browse_structure(self, var):
@@ -241,13 +435,9 @@ class SortingToolsTab(ttk.Frame):
         
         if self.main_window:
             self.main_window.progress_label.config(text="Consolidating folders...")
-            
-        success, msg = structure_sorter.consolidate_single_files(d)
-        
-        if self.main_window:
-            self.main_window.progress_label.config(text="Ready.")
-            
-        messagebox.showinfo("Result", msg)
+
+        self._submit_sort("Consolidate single files", self.run_consolidate_btn, structure_sorter.consolidate_single_files,
+                          d, dry_run=self.consolidate_dry_run_var.get(), remove_empty=self.consolidate_remove_empty_var.get())
 
     def _run_delete_empty(self):
         d = self.path3_structure.get()
@@ -258,34 +448,69 @@ class SortingToolsTab(ttk.Frame):
         
         if self.main_window:
             self.main_window.progress_label.config(text="Scanning for empty folders...")
-            
-        success, msg = structure_sorter.delete_empty_folders(d)
-        
-        if self.main_window:
-            self.main_window.progress_label.config(text="Ready.")
-            
-        messagebox.showinfo("Result", msg)
+
+        # No per-file progress here; the job only needs the stop_event
+        delete = lambda directory, progress_callback, stop_event: structure_sorter.delete_empty_folders(directory, stop_event)
+        self._submit_sort("Delete empty folders", self.run_delete_empty_btn, delete, d)
 
     def _run_ext(self):
         d = self.path2_structure.get()
         if not d: return messagebox.showerror("Error", "Select a folder.")
         
         centralize = self.centralize_var.get()
+        dry_run = self.ext_dry_run_var.get()
         
         self.run_ext_btn.config(state="disabled")
         
-        threading.Thread(target=self._thread_ext, args=(d, centralize), daemon=True).start()
+        job_engine.get_engine().submit("Sort by extension", self._thread_ext, d, centralize, dry_run, resource=job_engine.IO)
+
+    def _thread_ext(self, d, centralize, dry_run, job):
+        # Let the move engine stop between files, so copies in flight are journaled
+        cb = job.progress(self.events.progress(self._update_progress), raise_on_cancel=False)
+
+        success, msg = structure_sorter.sort_by_extension([d], centralize=centralize, progress_callback=cb, dry_run=dry_run,
+                                                          stop_event=job.stop_event)
+        self.events.call(self._finish_ext, msg)
+
+    # --- Journal Methods ---
+    def _run_resume(self):
+        path = move_journal.find_unfinished()
+        if not path:
+            return messagebox.showinfo("Result", "No interrupted jobs found.")
+        self._start_journal_job(move_journal.resume_job, path)
+
+    def _run_undo(self):
+        path = move_journal.find_undoable()
+        if not path:
+            return messagebox.showinfo("Result", "No sorts to undo.")
+        job = move_journal.load_journal(path)['job']
+        if not messagebox.askyesno("Confirm", f"Move every file from the last '{job}' run back to where it was?"):
+            return
+        self._start_journal_job(move_journal.undo_job, path)
 
-    def _thread_ext(self, d, centralize):
-        def cb(curr, total, msg):
-            if self.main_window:
-                self.main_window.after(0, lambda: self._update_progress(curr, total, msg))
+    def _start_journal_job(self, func, path):
+        self.resume_btn.config(state="disabled")
+        self.undo_btn.config(state="disabled")
+        job_engine.get_engine().submit(func.__name__.replace('_', ' ').capitalize(), self._thread_journal, func, path,
+                                       resource=job_engine.IO)
 
-        success, msg = structure_sorter.sort_by_extension([d], centralize=centralize, progress_callback=cb)
-        
-        self.after(0, lambda: self._finish_ext(msg))
+    def _thread_journal(self, func, path, job):
+        cb = job.progress(self.events.progress(self._update_progress), raise_on_cancel=False)
+
+        success, msg = func(path, progress_callback=cb, stop_event=job.stop_event)
+        self.events.call(self._finish_journal, success, msg)
+
+    def _finish_journal(self, success, msg):
+        self.resume_btn.config(state="normal")
+        self.undo_btn.config(state="normal")
+        if self.main_window:
+            self.main_window.progress_label.config(text="Ready.")
+            self.main_window.progress_bar.config(value=0)
+        messagebox.showinfo("Result", msg) if success else messagebox.showerror("Error", msg)
 
     def _update_progress(self, curr, total, msg):
+        if not self.main_window:
+            return
         self.main_window.progress_label.config(text=msg)
         if total > 0:
             self.main_window.progress_bar['maximum'] = total
@@ -305,20 +530,20 @@ class SortingToolsTab(ttk.Frame):
         recursive = self.photo_recursive.get()
         copy = self.photo_copy.get()
         keep_filename = self.photo_keep_filename.get()
+        dry_run = self.photo_dry_run.get()
 
         if not directory: return messagebox.showerror("Error", "Select a folder.")
 
-        def cb(curr, total, msg):
-            if self.main_window:
-                self.main_window.after(0, lambda: self._update_progress(curr, total, msg))
-
         self.run_photo_sort_btn.config(state="disabled")
-        # Run in a thread so the UI doesn't freeze
-        threading.Thread(target=self._thread_photo, args=(directory, fmt, rename_fmt, recursive, copy, keep_filename, cb), daemon=True).start()
+        # Run as a job so the UI doesn't freeze
+        job_engine.get_engine().submit("Organize photos", self._thread_photo, directory, fmt, rename_fmt, recursive, copy,
+                                       keep_filename, dry_run, resource=job_engine.IO)
 
-    def _thread_photo(self, d, f, rename_fmt, recursive, copy, keep_filename, cb):
-        success, msg = photo_organizer.organize_by_date(d, structure=f, progress_cb=cb, rename_format=rename_fmt, recursive=recursive, copy_files=copy, keep_filename=keep_filename)
-        self.after(0, lambda: self._finish_photo_sort(msg))
+    def _thread_photo(self, d, f, rename_fmt, recursive, copy, keep_filename, dry_run, job):
+        cb = job.progress(self.events.progress(self._update_progress), raise_on_cancel=False)
+        success, msg = photo_organizer.organize_by_date(d, structure=f, progress_cb=cb, rename_format=rename_fmt, recursive=recursive, copy_files=copy, test=dry_run, keep_filename=keep_filename,
+                                                        stop_event=job.stop_event)
+        self.events.call(self._finish_photo_sort, msg)
 
     def _finish_photo_sort(self, msg):
         self.run_photo_sort_btn.config(state="normal")
@@ -326,3 +551,74 @@ class SortingToolsTab(ttk.Frame):
             self.main_window.progress_label.config(text="Ready.")
             self.main_window.progress_bar.config(value=0)
         messagebox.showinfo("Result", msg)
+
+    # --- Hot Folder Methods ---
+    def _toggle_watch(self):
+        if self._watch_stop:
+            self._watch_stop.set()
+            self.watch_btn.config(state="disabled", text="Stopping...")
+            return
+
+        directory = self.watch_dir.get()
+        if not directory: return messagebox.showerror("Error", "Select a folder.")
+        steps = [step for step, var in ((watch_folder.COMPRESS_PDFS, self.watch_compress),
+                                        (watch_folder.ORGANIZE_PHOTOS, self.watch_photos),
+                                        (watch_folder.SORT_EXTENSIONS, self.watch_extensions)) if var.get()]
+        if not steps: return messagebox.showerror("Error", "Choose at least one pipeline step.")
+
+        pipeline = watch_folder.WatchPipeline(steps, photo_options={'structure': self.photo_fmt.get()})
+        watcher = watch_folder.FolderWatcher([directory], recursive=self.watch_recursive.get())
+        self._watch_stop = threading.Event()
+        self.watch_btn.config(text="Stop Watching")
+        self.watch_log.write(f"Watching {directory}")
+        # The watcher mostly sleeps on events, so it gets its own thread; each batch runs as a job
+        threading.Thread(target=self._thread_watch, args=(watcher, pipeline, self._watch_stop), daemon=True).start()
+
+    def _thread_watch(self, watcher, pipeline, stop):
+        def on_batch(root, files):
+            self.watch_log.write(f"{len(files)} new files in {root}")
+            job = job_engine.get_engine().submit(f"Hot folder {os.path.basename(root)}", pipeline.run, root, files,
+                                                 resource=job_engine.IO)
+            job.wait()
+            if job.result:
+                self.watch_log.write(job.result[1])
+            return pipeline.produced
+
+        try:
+            _, msg = watcher.run(on_batch, stop)
+        except OSError as e:
+            msg = f"Watch Error: {e}"
+        self.watch_log.write(msg)
+        self.events.call(self._finish_watch)
+
+    # --- Duplicate Methods ---
+    def _run_dedupe(self):
+        d = self.dedupe_dir.get()
+        if not d: return messagebox.showerror("Error", "Select a folder.")
+        action = self.dedupe_action.get()
+        dry_run = self.dedupe_dry_run.get()
+        if action == dedupe.DELETE and not dry_run:
+            if not messagebox.askyesno("Confirm", "Permanently delete every duplicate except the kept copy? This cannot be undone."):
+                return
+
+        self.run_dedupe_btn.config(state="disabled")
+        job_engine.get_engine().submit("Find duplicates", self._thread_dedupe, d, action, self.dedupe_keep.get(), dry_run,
+                                       resource=job_engine.IO)
+
+    def _thread_dedupe(self, d, action, keep, dry_run, job):
+        cb = job.progress(self.events.progress(self._update_progress), raise_on_cancel=False)
+        success, msg = dedupe.dedupe([d], action=action, keep=keep, dry_run=dry_run, progress_callback=cb,
+                                     stop_event=job.stop_event)
+        self.dedupe_log.write(msg)
+        self.events.call(self._finish_dedupe, success, msg)
+
+    def _finish_dedupe(self, success, msg):
+        self.run_dedupe_btn.config(state="normal")
+        if self.main_window:
+            self.main_window.progress_label.config(text="Ready.")
+            self.main_window.progress_bar.config(value=0)
+        messagebox.showinfo("Result", msg) if success else messagebox.showerror("Error", msg)
+
+    def _finish_watch(self):
+        self._watch_stop = None
+        self.watch_btn.config(state="normal", text="Start Watching")
@@ -4,6 +4,12 @@ from core import svg_processor
 from ui.ui_utils import DirectorySelector
 
 class SVGToolsTab(ttk.Frame):
+    LAYOUTS = {
+        "Fit to Cell": "fit",
+        "Fixed Grid": "grid",
+        "Packed (Smallest Canvas)": "pack"
+    }
+
     def __init__(self, parent, main_window=None):
         super().__init__(parent, padding=10)
         self.main_window = main_window
@@ -19,9 +25,18 @@ class SVGToolsTab(ttk.Frame):
         self.dir_selector = DirectorySelector(frame, "Target Folder (Containing .svg files):")
         self.dir_selector.grid(row=1, column=0, sticky="ew", pady=(0, 10))
         
-        ttk.Separator(frame, orient="horizontal").grid(row=2, column=0, sticky="ew", pady=10)
+        opts_frame = ttk.Frame(frame)
+        opts_frame.grid(row=2, column=0, sticky="ew")
+        ttk.Label(opts_frame, text="Layout:").pack(side=tk.LEFT)
+        self.layout_var = tk.StringVar(value="Fit to Cell")
+        ttk.Combobox(opts_frame, textvariable=self.layout_var, values=list(self.LAYOUTS.keys()), state="readonly", width=25).pack(side=tk.LEFT, padx=5)
+
+        self.dedupe_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(opts_frame, text="Share Duplicate Definitions", variable=self.dedupe_var).pack(side=tk.LEFT, padx=10)
+
+        ttk.Separator(frame, orient="horizontal").grid(row=3, column=0, sticky="ew", pady=10)
         
-        ttk.Button(frame, text="Merge SVGs to Grid", command=self._run_svg_merge).grid(row=3, column=0, sticky="ew", pady=(10, 0))
+        ttk.Button(frame, text="Merge SVGs to Grid", command=self._run_svg_merge).grid(row=4, column=0, sticky="ew", pady=(10, 0))
 
             
     def _run_svg_merge(self):
@@ -32,7 +47,9 @@ class SVGToolsTab(ttk.Frame):
         if self.main_window:
             self.main_window.progress_label.config(text="Merging SVGs...")
         
-        success, msg = svg_processor.merge_svgs_to_grid(path)
+        success, msg = svg_processor.merge_svgs_to_grid(
+            path, dedupe_defs=self.dedupe_var.get(), layout=self.LAYOUTS[self.layout_var.get()]
+        )
         
         if self.main_window:
             self.main_window.progress_label.config(text="Ready.")
@@ -1,4 +1,5 @@
 import tkinter as tk
+import time
 from tkinter import ttk, filedialog
 
 class DirectorySelector(ttk.Frame):
@@ -26,3 +27,39 @@ class DirectorySelector(ttk.Frame):
 
     def set(self, path):
         self.path.set(path)
+
+
+class LazyNotebook(ttk.Notebook):
+    """
+    Notebook whose tabs are built the first time they are selected.
+    add_lazy() takes a factory(parent) that returns the tab widget; until then
+    the tab is an empty placeholder frame. build_times records how long each
+    tab took to import and build (used by the startup report).
+    """
+
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+        self._factories = {}
+        self.build_times = {}
+        self.bind("<<NotebookTabChanged>>", self._build_selected, add="+")
+
+    def add_lazy(self, factory, text):
+        placeholder = ttk.Frame(self)
+        self._factories[str(placeholder)] = (factory, text)
+        self.add(placeholder, text=text)
+        # The first tab is selected on add, possibly before the event is bound to fire
+        if self.select() == str(placeholder):
+            self.after_idle(self._build_selected)
+        return placeholder
+
+    def _build_selected(self, event=None):
+        selected = self.select()
+        entry = self._factories.pop(selected, None)
+        if entry is None:
+            return
+        factory, text = entry
+        placeholder = self.nametowidget(selected)
+        start = time.perf_counter()
+        widget = factory(placeholder)
+        widget.pack(fill=tk.BOTH, expand=True)
+        self.build_times[text] = time.perf_counter() - start